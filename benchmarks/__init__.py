@@ -0,0 +1,12 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Performance benchmarks for rag-scan (not shipped with the package).
+
+    python -m benchmarks generate /tmp/corpus --files 2000
+    python -m benchmarks run /tmp/corpus --jobs 1,4 -o results.json
+    python -m benchmarks compare base.json results.json
+
+bench_engine.py compares the combined RuleEngine with a per-rule loop.
+"""
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Command line for the benchmark suite; see benchmarks/__init__.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+from rag_hygiene_scan.scanner import load_config
+
+from .corpus import DEFAULT_DENSITY, DEFAULT_MIX, CorpusSpec, generate
+from .harness import compare, run
+from .startup import DEFAULT_BUDGET_MS, check, measure
+
+
+def _kv(text: str) -> Dict[str, float]:
+    """Parse 'a=1,b=2.5' into a dict."""
+    out: Dict[str, float] = {}
+    for part in filter(None, text.split(",")):
+        key, _, val = part.partition("=")
+        out[key.strip()] = float(val)
+    return out
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("generate", help="Write a synthetic corpus")
+    g.add_argument("out", help="Output directory")
+    g.add_argument("--files", type=int, default=1000)
+    g.add_argument("--mean-kb", type=float, default=8.0)
+    g.add_argument(
+        "--size-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal"
+    )
+    g.add_argument(
+        "--mix",
+        default=",".join(f"{k.lstrip('.')}={v}" for k, v in DEFAULT_MIX.items()),
+        help="Extension weights, e.g. md=5,html=3,txt=2",
+    )
+    g.add_argument(
+        "--density",
+        default=",".join(f"{k}={v}" for k, v in DEFAULT_DENSITY.items()),
+        help="Expected hits per KiB per rule family " "(injection, html, pii, secret)",
+    )
+    g.add_argument("--seed", type=int, default=1)
+
+    r = sub.add_parser("run", help="Benchmark a corpus")
+    r.add_argument("corpus")
+    r.add_argument("-c", "--config", default=None, help="YAML with custom rules")
+    r.add_argument("--jobs", default="1", help="Comma-separated job counts")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("-o", "--out", default="-", help="Results JSON (default: stdout)")
+
+    c = sub.add_parser("compare", help="Compare two result files")
+    c.add_argument("base")
+    c.add_argument("new")
+
+    s = sub.add_parser("startup", help="Measure CLI startup against a budget")
+    s.add_argument("-c", "--config", default=None, help="YAML with custom rules")
+    s.add_argument("--repeat", type=int, default=10)
+    s.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Max median overhead over a bare interpreter "
+        f"(default: {DEFAULT_BUDGET_MS:.0f}); exit 1 if exceeded",
+    )
+
+    args = ap.parse_args(argv)
+    if args.cmd == "generate":
+        spec = CorpusSpec(
+            files=args.files,
+            mean_kb=args.mean_kb,
+            size_dist=args.size_dist,
+            mix={f".{k.lstrip('.')}": v for k, v in _kv(args.mix).items()},
+            density=_kv(args.density),
+            seed=args.seed,
+        )
+        print(json.dumps(generate(args.out, spec), indent=2))
+    elif args.cmd == "run":
+        jobs = [int(j) for j in args.jobs.split(",")]
+        results = run(args.corpus, load_config(args.config), jobs, args.repeat)
+        text = json.dumps(results, indent=2)
+        if args.out == "-":
+            print(text)
+        else:
+            with open(args.out, "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+    elif args.cmd == "startup":
+        results = measure(args.config, args.repeat)
+        print(json.dumps(results, indent=2))
+        problems = check(results, args.budget_ms)
+        for msg in problems:
+            print(f"over budget: {msg}", file=sys.stderr)
+        return 1 if problems else 0
+    else:
+        with (
+            open(args.base, encoding="utf-8") as fa,
+            open(args.new, encoding="utf-8") as fb,
+        ):
+            print(compare(json.load(fa), json.load(fb)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
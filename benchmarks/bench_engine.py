@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Compare the per-rule finditer loop with the combined RuleEngine as the
+number of custom rules grows.
+
+    python benchmarks/bench_engine.py [--words 200000] [--counts 0,15,60,120]
+
+Findings from both paths are checked for equality before timing is reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+
+from rag_hygiene_scan.patterns import load_rules_from_config
+
+VOCAB = [
+    "comply",
+    "note",
+    "below",
+    "secret",
+    "internal",
+    "password",
+    "token",
+    "confidential",
+    "bypass",
+    "disregard",
+]
+
+
+def make_text(words: int, seed: int = 1, clean: bool = False) -> str:
+    rnd = random.Random(seed)
+    body = " ".join(
+        "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(2, 9)))
+        for _ in range(words)
+    )
+    if clean:
+        return body
+    return body + " alice@example.com (415) 555-1212 override policy <script>"
+
+
+def make_cfg(n: int, seed: int = 2) -> dict:
+    rnd = random.Random(seed)
+    rules = []
+    for i in range(n):
+        a, b = rnd.sample(VOCAB, 2)
+        rules.append(
+            {
+                "code": f"USR{i:03d}",
+                "pattern": rf"\b{a}\s+(the\s+)?{b}{i}\b",
+                "severity": "med",
+            }
+        )
+    return {"rules": rules}
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--words", type=int, default=200_000)
+    ap.add_argument("--counts", default="0,15,30,60,120")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument(
+        "--clean",
+        action="store_true",
+        help="No rule literals in the document (exercises the prefilter)",
+    )
+    args = ap.parse_args()
+
+    text = make_text(args.words, clean=args.clean)
+    print(f"document: {len(text) / 1e6:.1f} MB")
+    print(f"{'rules':>6} {'per-rule s':>11} {'engine s':>9} {'speedup':>8}")
+    for n in (int(c) for c in args.counts.split(",")):
+        engine = load_rules_from_config(make_cfg(n))
+
+        def per_rule():
+            return [
+                (r.code, m.span()) for r in engine for m in r.pattern.finditer(text)
+            ]
+
+        def combined():
+            return [(r.code, m.span()) for r, m in engine.matches(text)]
+
+        assert per_rule() == combined(), "engine findings differ from per-rule loop"
+        a = _best_of(per_rule, args.repeat)
+        b = _best_of(combined, args.repeat)
+        print(f"{len(engine):>6} {a:>11.3f} {b:>9.3f} {a / b:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
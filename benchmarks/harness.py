@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Benchmark harness: time each pipeline stage and end-to-end throughput on a
+corpus, and compare result files between releases.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import pathlib
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from rag_hygiene_scan import __version__
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.report import WRITERS
+from rag_hygiene_scan.scanner import iter_files, iter_findings, scan_text
+
+SCHEMA = 1
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Peak resident set size of this process and of reaped children."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {"self": None, "children": None}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def staged(corpus: str, cfg: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Serial pass with separate walk / read / scan / report timings."""
+    rules = load_rules_from_config(cfg)
+
+    t0 = time.perf_counter()
+    files = list(iter_files(pathlib.Path(corpus)))
+    walk = time.perf_counter() - t0
+
+    read = scan = 0.0
+    nbytes = 0
+    findings: List[Dict[str, Any]] = []
+    for f in files:
+        t0 = time.perf_counter()
+        text = f.read_text(encoding="utf-8", errors="ignore")
+        t1 = time.perf_counter()
+        findings.extend(scan_text(text, f.as_posix(), rules))
+        t2 = time.perf_counter()
+        read += t1 - t0
+        scan += t2 - t1
+        nbytes += f.stat().st_size
+
+    report: Dict[str, float] = {}
+    for fmt, write in sorted(WRITERS.items()):
+        t0 = time.perf_counter()
+        write(findings, io.StringIO())
+        report[fmt] = time.perf_counter() - t0
+
+    return {
+        "files": len(files),
+        "bytes": nbytes,
+        "findings": len(findings),
+        "rules": len(rules),
+        "walk_s": walk,
+        "read_s": read,
+        "scan_s": scan,
+        "report_s": report,
+    }
+
+
+def end_to_end(
+    corpus: str, cfg: Optional[Dict[str, Any]], jobs: int, repeat: int, nbytes: int
+) -> Dict[str, Any]:
+    """Best-of-'repeat' wall time for a full iter_findings() pass."""
+    best = float("inf")
+    nfiles = sum(1 for _ in iter_files(pathlib.Path(corpus)))
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _f in iter_findings(corpus, cfg, jobs=jobs):
+            pass
+        best = min(best, time.perf_counter() - t0)
+    return {
+        "jobs": jobs,
+        "seconds": best,
+        "files_per_s": nfiles / best if best else None,
+        "mb_per_s": nbytes / 1e6 / best if best else None,
+    }
+
+
+def run(
+    corpus: str,
+    cfg: Optional[Dict[str, Any]] = None,
+    jobs: Sequence[int] = (1,),
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    stages = staged(corpus, cfg)
+    return {
+        "schema": SCHEMA,
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "corpus": os.path.abspath(corpus),
+        "stages": stages,
+        "end_to_end": [
+            end_to_end(corpus, cfg, j, repeat, stages["bytes"]) for j in jobs
+        ],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    st = results["stages"]
+    for key in ("walk_s", "read_s", "scan_s"):
+        flat[key] = st[key]
+    for fmt, secs in st["report_s"].items():
+        flat[f"report_{fmt}_s"] = secs
+    for row in results["end_to_end"]:
+        flat[f"e2e_jobs{row['jobs']}_s"] = row["seconds"]
+        flat[f"e2e_jobs{row['jobs']}_mb_per_s"] = row["mb_per_s"]
+    for k, v in results["peak_rss_mb"].items():
+        if v is not None:
+            flat[f"peak_rss_{k}_mb"] = v
+    return flat
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> str:
+    """Side-by-side table of two result files (ratio = new / base)."""
+    a, b = _flatten(base), _flatten(new)
+    lines = [
+        f"base {base['version']} vs new {new['version']}",
+        f"{'metric':<24} {'base':>12} {'new':>12} {'ratio':>7}",
+    ]
+    for key in sorted(set(a) | set(b)):
+        x, y = a.get(key), b.get(key)
+        ratio = f"{y / x:>6.2f}x" if x and y is not None else "      -"
+        fx = f"{x:>12.4f}" if x is not None else f"{'-':>12}"
+        fy = f"{y:>12.4f}" if y is not None else f"{'-':>12}"
+        lines.append(f"{key:<24} {fx} {fy} {ratio}")
+    return "\n".join(lines)
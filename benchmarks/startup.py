@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Startup-time budget for short CLI runs (pre-commit hooks on a few files).
+
+Each measurement spawns a fresh interpreter running `rag-scan` on a tiny
+tree, so import time, config loading and rule compilation are all counted.
+The figure that is checked against the budget is the overhead over a bare
+`python -c pass`, which keeps it comparable across machines.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from rag_hygiene_scan.ruleset import write_ruleset
+from rag_hygiene_scan.scanner import load_config
+
+# Median overhead of `rag-scan <3 files>` over a bare interpreter start:
+# the 0.1.1 CLI measured ~85 ms here (77-97 across runs), plus a ~10 ms margin
+DEFAULT_BUDGET_MS = 95.0
+
+DOCS = {
+    "a.md": "# Title\n\nNothing to see here.\n",
+    "b.txt": "mail alice@example.com\n",
+    "c.html": "<p>hello</p>\n",
+}
+
+
+def _median_ms(cmd: List[str], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def measure(cfg_path: Optional[str] = None, repeat: int = 10) -> Dict[str, Any]:
+    """Median wall times (ms) for a bare interpreter and for rag-scan runs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = os.path.join(tmp, "docs")
+        os.mkdir(docs)
+        for name, text in DOCS.items():
+            with open(os.path.join(docs, name), "w", encoding="utf-8") as fh:
+                fh.write(text)
+        artifact = os.path.join(tmp, "rules.json")
+        write_ruleset(artifact, load_config(cfg_path))
+
+        scan = [sys.executable, "-m", "rag_hygiene_scan.cli", docs, "--fail-on", "high"]
+        results: Dict[str, Any] = {
+            "python_ms": _median_ms([sys.executable, "-c", "pass"], repeat),
+            "defaults_ms": _median_ms(scan, repeat),
+            "artifact_ms": _median_ms(scan + ["-c", artifact], repeat),
+        }
+        if cfg_path:
+            results["yaml_ms"] = _median_ms(scan + ["-c", cfg_path], repeat)
+    base = results["python_ms"]
+    results["overhead_ms"] = {
+        k[: -len("_ms")]: v - base for k, v in results.items() if k != "python_ms"
+    }
+    return results
+
+
+def check(results: Dict[str, Any], budget_ms: float = DEFAULT_BUDGET_MS) -> List[str]:
+    """Runs whose overhead exceeds the budget, as messages (empty = within)."""
+    return [
+        f"{name}: {ms:.1f} ms over a bare interpreter (budget {budget_ms:.0f} ms)"
+        for name, ms in results["overhead_ms"].items()
+        if ms > budget_ms
+    ]
@@ -3,7 +3,58 @@
 
 """
 rag_hygiene_scan: RAG Corpus Hygiene Scanner
+
+Library use: build a Scanner once and reuse it for every document.
+The names below are imported on first access, so `import rag_hygiene_scan`
+(and every submodule import, e.g. the CLI's) stays cheap.
 """
 
-__all__ = []
+from importlib import import_module
+
+TYPE_CHECKING = False  # not typing's: importing typing costs more than the rest
+if TYPE_CHECKING:
+    from .scanner import (
+        Finding,
+        Scanner,
+        ScanOptions,
+        ScanResult,
+        SeverityTally,
+        exit_code_for_findings,
+        iter_findings,
+        load_config,
+        scan_path,
+        scan_text,
+    )
+    from .stats import ScanStats
+
+__all__ = [
+    "Finding",
+    "ScanOptions",
+    "ScanResult",
+    "ScanStats",
+    "Scanner",
+    "SeverityTally",
+    "exit_code_for_findings",
+    "iter_findings",
+    "load_config",
+    "scan_path",
+    "scan_text",
+]
 __version__ = "0.1.1"
+
+# public name -> submodule that defines it
+_EXPORTS = {name: ".scanner" for name in __all__}
+_EXPORTS["ScanStats"] = ".stats"
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Read documents straight out of zip, tar, tar.gz and .gz files.
+
+Members are visited in archive order and opened as binary streams; nothing
+is extracted to disk. Tar archives are read in stream mode, so a .tar.gz is
+decompressed once, front to back, however many members it holds.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import pathlib
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import tarfile
+
+MEMBER_SEP = "!/"  # doc_id of a member: "<archive path>!/<member name>"
+
+
+def archive_kind(name: str) -> Optional[str]:
+    """'zip', 'tar' or 'gz' for archive file names, else None."""
+    low = name.lower()
+    if low.endswith(".zip"):
+        return "zip"
+    if low.endswith((".tar", ".tar.gz", ".tgz")):
+        return "tar"
+    if low.endswith(".gz"):
+        return "gz"
+    return None
+
+
+@dataclass(frozen=True)
+class Member:
+    name: str  # path inside the archive, '/'-separated
+    size: Optional[int]  # uncompressed size when the archive records it
+    open: Callable[[], IO[bytes]]  # only valid while the member is current
+
+
+def iter_members(path: str | os.PathLike) -> Iterator[Member]:
+    """
+    Yield the regular-file members of the archive at 'path'. Each member
+    must be read before advancing to the next one (tar streams cannot seek
+    back). Raises the archive library's error for corrupt files.
+    """
+    import gzip
+    import tarfile
+    import zipfile
+
+    path = pathlib.Path(path)
+    kind = archive_kind(path.name)
+    if kind == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                yield Member(info.filename, info.file_size, lambda i=info: zf.open(i))
+    elif kind == "tar":
+        with tarfile.open(path, "r|*") as tf:
+            for m in tf:
+                if not m.isfile():
+                    continue
+                yield Member(m.name, m.size, lambda m=m: _extract(tf, m))
+    elif kind == "gz":
+        # The gzip trailer only holds the size modulo 2**32, so it is not used
+        yield Member(path.name[: -len(".gz")], None, lambda: gzip.open(path, "rb"))
+    else:
+        raise ValueError(f"not an archive: {path}")
+
+
+class _RawReader(io.RawIOBase):
+    """Present a bare read(n) stream (tar stream-mode members) as raw I/O."""
+
+    def __init__(self, fh: IO[bytes]) -> None:
+        self._fh = fh
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore[override]
+        data = self._fh.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+def _extract(tf: tarfile.TarFile, m: tarfile.TarInfo) -> IO[bytes]:
+    fh = tf.extractfile(m)
+    if fh is None:  # pragma: no cover - isfile() members always have data
+        raise OSError(f"no data for tar member {m.name}")
+    return io.BufferedReader(_RawReader(fh))
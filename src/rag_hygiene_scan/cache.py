@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Persistent scan cache: findings per file content, keyed by a content hash
+and the ruleset fingerprint.
+
+Layout under the cache directory:
+  objects/<key[:2]>/<key>.json   findings (without doc_id) for one content
+                                 digest under one ruleset
+  index/<h[:2]>/<h>.json         path -> size, mtime and content digest, so
+                                 unchanged files skip hashing entirely
+  usage                          bytes held at the last prune, then one line
+                                 per flush of bytes written since; the
+                                 entries are only walked once it passes the
+                                 size limit
+
+Every file is written to a temp file and renamed into place, so concurrent
+writers (parallel workers, overlapping CI jobs) never see partial entries.
+
+ContentMemo is the in-memory counterpart for a single run: byte-identical
+documents (mirrors, versioned folders) are scanned once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+FORMAT_VERSION = 2  # 2: findings carry line/col/offset
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Files modified this recently are not recorded in the stat index: another
+# write within the same mtime tick would go unnoticed ("racy" entries).
+RACY_NS = 2_000_000_000
+MEMO_MAX_ENTRIES = 65536  # contents remembered per run (least recently used go)
+MEMO_MAX_FINDINGS = 1000  # noisier contents are not remembered
+USAGE_FILE = "usage"
+USAGE_MAX_LINES = 256  # the usage file is folded into one line past this
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ScanCache:
+    """Content-addressed findings cache bound to one ruleset fingerprint."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        fingerprint: str,
+    ):
+        self.root = pathlib.Path(root)
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.written = 0  # bytes written since the last flush_usage()
+
+    # -------- paths --------
+    def _object_path(self, digest: str) -> pathlib.Path:
+        key = _sha256(str(FORMAT_VERSION), self.fingerprint, digest)
+        return self.root / "objects" / key[:2] / f"{key}.json"
+
+    def _index_path(self, f: pathlib.Path) -> pathlib.Path:
+        key = _sha256(str(FORMAT_VERSION), str(f.resolve()))
+        return self.root / "index" / key[:2] / f"{key}.json"
+
+    # -------- I/O helpers --------
+    @staticmethod
+    def _read_json(p: pathlib.Path) -> Optional[Any]:
+        try:
+            with open(p, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(p: pathlib.Path, data: Any) -> int:
+        """Write 'data' to 'p' atomically; returns the bytes written (0: failed)."""
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return _write_atomic(p, payload.encode("utf-8"))
+
+    # -------- lookups --------
+    def digest_for(self, f: pathlib.Path, st: os.stat_result) -> Optional[str]:
+        """Content digest recorded for 'f' if its size and mtime are unchanged."""
+        entry = self._read_json(self._index_path(f))
+        if (
+            isinstance(entry, dict)
+            and entry.get("size") == st.st_size
+            and entry.get("mtime_ns") == st.st_mtime_ns
+        ):
+            return entry.get("digest")
+        return None
+
+    def get(self, digest: str, doc_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached findings for 'digest', re-labelled with 'doc_id'."""
+        p = self._object_path(digest)
+        data = self._read_json(p)
+        if not isinstance(data, list):
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(p)  # recency for eviction
+        except OSError:
+            pass
+        return [{"doc_id": doc_id, **f} for f in data]
+
+    # -------- updates --------
+    def remember(self, f: pathlib.Path, st: os.stat_result, digest: str) -> None:
+        """Record the content digest of 'f' for the size/mtime pre-check."""
+        if time.time_ns() - st.st_mtime_ns < RACY_NS:
+            return
+        self.written += self._write_json(
+            self._index_path(f),
+            {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest},
+        )
+
+    def put(self, digest: str, findings: List[Dict[str, Any]]) -> None:
+        stripped = [{k: v for k, v in f.items() if k != "doc_id"} for f in findings]
+        self.written += self._write_json(self._object_path(digest), stripped)
+
+    def flush_usage(self) -> None:
+        """
+        Add the bytes written so far to the usage file, for prune_cache().
+        Lines are appended, so concurrent writers (workers, other runs) do
+        not need a lock. Replaced entries are counted again: the sum only
+        errs high, which just makes the next prune walk the cache.
+        """
+        if not self.written:
+            return
+        try:
+            fd = os.open(
+                self.root / USAGE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                os.write(fd, f"{self.written}\n".encode("ascii"))
+            finally:
+                os.close(fd)
+        except OSError:
+            return
+        self.written = 0
+
+
+class ContentMemo:
+    """
+    Findings per content digest for the current run. A document whose
+    digest was seen before gets a copy of those findings under its own
+    doc_id instead of being scanned again; 'collapsed' counts such copies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MEMO_MAX_ENTRIES,
+        max_findings: int = MEMO_MAX_FINDINGS,
+    ):
+        self.max_entries = max_entries
+        self.max_findings = max_findings
+        self.collapsed = 0
+        self._entries: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+
+    def get(self, digest: str, doc_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Findings of an earlier document with this digest, re-labelled."""
+        found = self._entries.get(digest)
+        if found is None:
+            return None
+        self._entries.move_to_end(digest)
+        self.collapsed += 1
+        return [{**f, "doc_id": doc_id} for f in found]
+
+    def put(self, digest: str, findings: List[Dict[str, Any]]) -> None:
+        if len(findings) > self.max_findings:
+            return
+        self._entries[digest] = findings
+        self._entries.move_to_end(digest)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _write_atomic(p: pathlib.Path, payload: bytes) -> int:
+    import tempfile  # only needed on cache writes; keeps startup lean
+
+    tmp = None
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, p)
+        return len(payload)
+    except OSError:
+        # A cache that cannot be written only costs speed
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        return 0
+
+
+def _read_usage(root: pathlib.Path) -> Optional[int]:
+    """Bytes the usage file accounts for; None when missing or unreadable."""
+    p = root / USAGE_FILE
+    try:
+        lines = p.read_bytes().split()
+        total = sum(int(n) for n in lines)
+    except (OSError, ValueError):
+        return None
+    if len(lines) > USAGE_MAX_LINES:
+        # appends racing this rewrite are lost: the next walk recounts them
+        _write_atomic(p, f"{total}\n".encode("ascii"))
+    return total
+
+
+def prune_cache(root: str | os.PathLike, max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+    """
+    Evict least recently used entries (hits refresh an object's mtime) until
+    the cache under 'root' is below 90% of 'max_bytes'. Returns the number
+    of files removed. The entries are only walked when the usage file (see
+    ScanCache.flush_usage) is missing or over 'max_bytes'; the walk then
+    records the exact size there.
+    """
+    root = pathlib.Path(root)
+    usage = _read_usage(root)
+    if usage is not None and usage <= max_bytes:
+        return 0
+    entries = []
+    total = 0
+    for p in root.glob("*/*/*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue  # removed by a concurrent prune
+        entries.append((st.st_mtime, st.st_size, p))
+        total += st.st_size
+    removed = 0
+    if total > max_bytes:
+        target = max_bytes * 0.9
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+    if root.is_dir():
+        _write_atomic(root / USAGE_FILE, f"{total}\n".encode("ascii"))
+    return removed
@@ -8,19 +8,75 @@ CLI entrypoint. Accepts args and calls the (stub) scanner.
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
 import json
+import os
 import pathlib
 import sys
-from typing import Dict, Optional
+import time
+from typing import Iterable, Optional
 
-from .scanner import exit_code_for_findings, load_config, scan_path
+from .report import WRITERS, to_csv
+from .scanner import (
+    CHUNK_SIZE,
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_RULE_TIMEOUT,
+    IGNORE_FILES,
+    READ_AHEAD_BYTES,
+    READ_AHEAD_DEPTH,
+    ScanOptions,
+    SeverityTally,
+    iter_findings,
+    load_config,
+    parse_shard,
+    read_file_list,
+)
+from .stats import ScanStats, timed
+from .store import AGGREGATE_FIELDS, DEFAULT_SAMPLES
 
 EPILOG = """examples:
   rag-scan examples/ --format json --fail-on med
   rag-scan docs/ -c rules.yaml -o findings.csv --format csv
+  rag-scan kb-export/ --jobs 0 --fail-on high
+  rag-scan kb-export/ --format ndjson -o findings.ndjson
+  rag-scan docs/ --fail-on high --fail-fast
+  rag-scan kb-export/ --stats --stats-json stats.json
+  rag-scan kb-export/ --aggregate --samples 2 --format ndjson
+  rag-scan exports/kb-2025-06.tar.gz --archives
+  rag-scan chunks/ --jsonl --id-field chunk_id --text-field payload.text
+  rag-scan docs/ --changed-since origin/main --changed-lines
+  git ls-files -z -- '*.md' | rag-scan --files-from - --fail-on high
+  rag-scan kb-export/ --shard 2/8 --format ndjson -o shard-2.ndjson
+
+commands (instead of a path):
+  rag-scan serve --port 8787 -c rules.yaml     long-running scan service
+  rag-scan compile-rules -c rules.yaml -o rules.json
+                                               precompiled ruleset for -c
+  rag-scan lint-rules -c rules.yaml --corpus docs/
+                                               ReDoS and throughput checks
+  rag-scan merge shard-*.ndjson -o findings.json
+                                               combine --shard outputs
+  rag-scan watch docs/ -c rules.yaml           rescan files as they change
 """
 
 
+def _shard_arg(spec: str) -> tuple[int, int]:
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _print_summary(tally: SeverityTally, fail_on: str, note: str = "") -> None:
+    counts = tally.counts
+    print(
+        f"summary: low={counts['low']} med={counts['med']} high={counts['high']} "
+        f"(threshold: >= {fail_on}){note}",
+        file=sys.stderr,
+    )
+
+
 def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     ap = argparse.ArgumentParser(
         prog="rag-scan",
@@ -28,14 +84,23 @@ def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         epilog=EPILOG,
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    ap.add_argument("path", help="File or directory to scan")
+    ap.add_argument(
+        "paths", nargs="*", metavar="PATH", help="Files or directories to scan"
+    )
+    ap.add_argument(
+        "--files-from",
+        default=None,
+        metavar="FILE",
+        help="Also scan the paths listed in FILE ('-' = stdin), NUL- or "
+        "newline-separated (e.g. git ls-files -z); read as they arrive",
+    )
     ap.add_argument("-c", "--config", help="YAML with custom rules", default=None)
     ap.add_argument("-o", "--out", help="Output file (default: stdout)", default="-")
     ap.add_argument(
         "--format",
-        choices=["json", "csv"],
+        choices=sorted(WRITERS),
         default="json",
-        help="Output format (default: json)",
+        help="Output format (default: json); ndjson = one finding per line",
     )
     ap.add_argument(
         "--fail-on",
@@ -43,6 +108,166 @@ def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         default="med",
         help="Exit nonzero if any finding >= this severity (default: med)",
     )
+    ap.add_argument(
+        "--no-ignore-files",
+        action="store_true",
+        help="Do not honor .gitignore / .ragscanignore when walking directories",
+    )
+    ap.add_argument(
+        "--archives",
+        action="store_true",
+        help="Also scan documents inside .zip, .tar, .tar.gz/.tgz and .gz files, "
+        "without extracting them (doc_id: bundle.zip!/path/doc.md)",
+    )
+    ap.add_argument(
+        "--changed-since",
+        default=None,
+        metavar="REF",
+        help="Scan only files added or modified since the merge base of REF and "
+        "HEAD (plus uncommitted and untracked ones), e.g. origin/main",
+    )
+    ap.add_argument(
+        "--changed-lines",
+        action="store_true",
+        help="With --changed-since, report only findings on added/modified lines",
+    )
+    ap.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="PATH holds chunked JSONL dumps (.jsonl/.ndjson): scan each record's "
+        "text as a document with doc_id file:line:id",
+    )
+    ap.add_argument(
+        "--id-field",
+        default="id",
+        metavar="FIELD",
+        help="Record id field for --jsonl; dots reach nested fields (default: id)",
+    )
+    ap.add_argument(
+        "--text-field",
+        default="text",
+        metavar="FIELD",
+        help="Record text field for --jsonl, e.g. payload.content (default: text)",
+    )
+    ap.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="INDEX/COUNT",
+        help="Scan only this slice of the files (e.g. 2/8; stable hash of the "
+        "path under PATH); combine the outputs with 'rag-scan merge'",
+    )
+    ap.add_argument(
+        "--rule-timeout",
+        type=float,
+        default=DEFAULT_RULE_TIMEOUT,
+        metavar="SECONDS",
+        help="Abandon a rule still searching one file after this long and report "
+        f"it as RULETIMEOUT (default: {DEFAULT_RULE_TIMEOUT:g}; 0 = no limit)",
+    )
+    ap.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Scan every copy of identical content; by default each content "
+        "is scanned once per run and its findings copied to the duplicates",
+    )
+    ap.add_argument(
+        "--no-sniff",
+        action="store_true",
+        help="Scan every file as text; by default binary content (NUL or "
+        "control bytes, UTF-16) is skipped with a SKIPPED finding",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for scanning (default: 1; 0 = one per CPU)",
+    )
+    ap.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        metavar="BYTES",
+        help="Scan files larger than this in chunks of this size, bounding "
+        f"memory per file (default: {CHUNK_SIZE})",
+    )
+    ap.add_argument(
+        "--read-ahead",
+        type=int,
+        default=READ_AHEAD_DEPTH,
+        metavar="N",
+        help="Read up to N files ahead of the one being scanned, on a few "
+        "threads, once the first few files are done "
+        f"(default: {READ_AHEAD_DEPTH}; 0 = off)",
+    )
+    ap.add_argument(
+        "--read-ahead-bytes",
+        type=int,
+        default=READ_AHEAD_BYTES,
+        metavar="BYTES",
+        help="Content that files read ahead may hold at once "
+        f"(default: {READ_AHEAD_BYTES})",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        metavar="DIR",
+        help="Reuse findings for files whose content and ruleset are unchanged",
+    )
+    ap.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        metavar="BYTES",
+        help="Evict old cache entries above this size "
+        f"(default: {DEFAULT_CACHE_MAX_BYTES})",
+    )
+    ap.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first file with a finding >= --fail-on (gate mode); "
+        "output and summary then cover only what was scanned",
+    )
+    ap.add_argument(
+        "--no-evidence",
+        action="store_true",
+        help="Leave 'evidence' empty: no snippets are built, and matched "
+        "text (e.g. secrets) stays out of the report; line/col are kept",
+    )
+    ap.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="One record per (file, rule): count, first/last offset and a few "
+        "evidence samples, instead of one record per match",
+    )
+    ap.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        metavar="N",
+        help=f"Evidence samples per --aggregate record (default: {DEFAULT_SAMPLES})",
+    )
+    ap.add_argument(
+        "--max-per-rule",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Report at most N findings per rule per file "
+        "(ignored with --aggregate, whose counts cover every match)",
+    )
+    ap.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-rule cost, per-stage time and the slowest files to "
+        "stderr (rules are timed one by one, so the scan runs slower)",
+    )
+    ap.add_argument(
+        "--stats-json",
+        default=None,
+        metavar="FILE",
+        help="Write the --stats data as JSON to FILE (implies collecting stats)",
+    )
     ap.add_argument(
         "--summary",
         action="store_true",
@@ -52,52 +277,421 @@ def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     return ap.parse_args(argv)
 
 
-def _count_by_severity(findings) -> Dict[str, int]:
-    counts = {"low": 0, "med": 0, "high": 0}
-    for f in findings:
-        sev = (f.get("severity") or "med").lower()
-        if sev in counts:
-            counts[sev] += 1
-    return counts
+def _serve_main(argv: list[str]) -> None:
+    from .server import DEFAULT_HOST, DEFAULT_PORT, serve
+
+    ap = argparse.ArgumentParser(
+        prog="rag-scan serve",
+        description="Serve scans over HTTP/JSON with a warm, auto-reloaded ruleset "
+        "(POST /scan, GET /stats, GET /healthz).",
+    )
+    ap.add_argument("-c", "--config", help="YAML with custom rules", default=None)
+    ap.add_argument("--host", default=DEFAULT_HOST, help="Bind address")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port")
+    ap.add_argument(
+        "--socket", default=None, metavar="PATH", help="Listen on a Unix socket"
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes (default: 1 = scan in the request thread; "
+        "0 = one per CPU)",
+    )
+    ap.add_argument(
+        "--root",
+        default=None,
+        metavar="DIR",
+        help="Only scan request 'paths' under DIR (default: current directory)",
+    )
+    ap.add_argument("--no-evidence", action="store_true", help="Omit snippets")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Log requests")
+    args = ap.parse_args(argv)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"rag-scan serving on {where}", file=sys.stderr)
+    try:
+        serve(
+            config_path=args.config,
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+            options=ScanOptions(evidence=not args.no_evidence),
+            verbose=args.verbose,
+            root=args.root,
+        )
+    except FileExistsError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+def _compile_rules_main(argv: list[str]) -> None:
+    from .ruleset import write_ruleset
+
+    ap = argparse.ArgumentParser(
+        prog="rag-scan compile-rules",
+        description="Validate rules.yaml and write a precompiled ruleset artifact "
+        "(JSON) that loads faster; use it with -c like a YAML config.",
+    )
+    ap.add_argument("-c", "--config", help="YAML with custom rules", default=None)
+    ap.add_argument("-o", "--out", required=True, help="Artifact path (.json)")
+    args = ap.parse_args(argv)
+    if not args.out.lower().endswith(".json"):
+        print("error: the artifact path must end in .json", file=sys.stderr)
+        sys.exit(2)
+    try:
+        engine = write_ruleset(args.out, load_config(args.config))
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(
+        f"compiled {len(engine)} rules to {args.out} "
+        f"(fingerprint {engine.fingerprint()[:12]})",
+        file=sys.stderr,
+    )
+
+
+def _lint_rules_main(argv: list[str]) -> None:
+    from .lint import DEFAULT_BUDGET, DEFAULT_SAMPLE_BYTES, format_report, lint_rules
+    from .patterns import load_rules_from_config
+    from .scanner import iter_files
+
+    ap = argparse.ArgumentParser(
+        prog="rag-scan lint-rules",
+        description="Check custom rules for catastrophic backtracking (static "
+        "analysis plus timed stress inputs) and, with --corpus, measure each "
+        "rule's throughput. Exits 1 if any rule has an error.",
+    )
+    ap.add_argument("-c", "--config", help="YAML with custom rules", default=None)
+    ap.add_argument(
+        "--corpus", metavar="PATH", help="Sample files for throughput (MB/s)"
+    )
+    ap.add_argument(
+        "--sample-bytes",
+        type=int,
+        default=DEFAULT_SAMPLE_BYTES,
+        metavar="BYTES",
+        help=f"Read at most this much of --corpus (default: {DEFAULT_SAMPLE_BYTES})",
+    )
+    ap.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        metavar="SECONDS",
+        help="Time limit per stress input and sample file "
+        f"(default: {DEFAULT_BUDGET:g})",
+    )
+    ap.add_argument("--all", action="store_true", help="Also lint the built-in rules")
+    ap.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = ap.parse_args(argv)
+    try:
+        rules = load_rules_from_config(load_config(args.config))
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(2)
+    texts = []
+    if args.corpus:
+        left = args.sample_bytes
+        for f in iter_files(pathlib.Path(args.corpus)):
+            if left <= 0:
+                break
+            try:
+                with open(f, "r", encoding="utf-8", errors="ignore") as fh:
+                    texts.append(fh.read(left))
+            except OSError:
+                continue
+            left -= len(texts[-1])
+    report = lint_rules(rules, texts, max(args.budget, 0.001), builtin=args.all)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    sys.exit(1 if report["errors"] else 0)
+
+
+def _merge_main(argv: list[str]) -> None:
+    from .merge import merge_reports
+
+    ap = argparse.ArgumentParser(
+        prog="rag-scan merge",
+        description="Combine JSON/NDJSON outputs of 'rag-scan --shard' runs into "
+        "one report in single-run order; summary and exit code are recomputed "
+        "from the merged findings.",
+    )
+    ap.add_argument("reports", nargs="+", metavar="REPORT", help="Shard outputs")
+    ap.add_argument("-o", "--out", help="Output file (default: stdout)", default="-")
+    ap.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        default="json",
+        help="Output format (default: json)",
+    )
+    ap.add_argument(
+        "--fail-on",
+        choices=["low", "med", "high"],
+        default="med",
+        help="Exit nonzero if any finding >= this severity (default: med)",
+    )
+    ap.add_argument(
+        "--summary", action="store_true", help="Always print counts by severity"
+    )
+    args = ap.parse_args(argv)
+    try:
+        findings, overlaps = merge_reports(args.reports)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(2)
+    if overlaps:
+        print(
+            f"warning: {len(overlaps)} document(s) appear in several reports "
+            f"(overlapping shards?), e.g. {overlaps[0]}",
+            file=sys.stderr,
+        )
+
+    tally = SeverityTally()
+    write = WRITERS[args.format]
+    if args.format == "csv" and findings and "count" in findings[0]:
+        write = functools.partial(to_csv, fieldnames=AGGREGATE_FIELDS)
+    if args.out == "-":
+        write(tally.track(findings), sys.stdout)
+        if args.format == "json":
+            sys.stdout.write("\n")
+    else:
+        with open(args.out, "w", encoding="utf-8", newline="") as fh:
+            write(tally.track(findings), fh)
+
+    exit_code = tally.exit_code(args.fail_on)
+    if args.summary or exit_code != 0:
+        _print_summary(tally, args.fail_on)
+    sys.exit(exit_code)
+
+
+def _print_update(update: dict, fmt: str) -> None:
+    for path, findings in update.items():
+        if fmt == "ndjson":
+            rec = {"path": path, "removed": findings is None}
+            rec["findings"] = findings or []
+            print(json.dumps(rec, ensure_ascii=False))
+        elif findings is None:
+            print(f"{path}: removed")
+        elif not findings:
+            print(f"{path}: clean")
+        else:
+            print(f"{path}: {len(findings)} finding(s)")
+            for f in findings:
+                where = f"{f['line']}:{f['col']}" if f.get("line") else "-"
+                print(f"  {where} {f['severity']} {f['code']} {f['desc']}")
+    sys.stdout.flush()
+
+
+def _watch_main(argv: list[str]) -> None:
+    from .watch import DEBOUNCE, POLL_INTERVAL, PollSource, Watcher, open_source, run
+
+    ap = argparse.ArgumentParser(
+        prog="rag-scan watch",
+        description="Scan PATH once, then rescan only files that are created, "
+        "changed or deleted, printing what changed and an updated summary; "
+        "rules are reloaded when the -c file changes. Stop with Ctrl-C.",
+    )
+    ap.add_argument("path", metavar="PATH", help="File or directory to watch")
+    ap.add_argument("-c", "--config", help="YAML with custom rules", default=None)
+    ap.add_argument(
+        "--format",
+        choices=["text", "ndjson"],
+        default="text",
+        help="text (default), or ndjson: one {path, removed, findings} record "
+        "per changed file",
+    )
+    ap.add_argument(
+        "--fail-on",
+        choices=["low", "med", "high"],
+        default="med",
+        help="Threshold shown in the summary (default: med)",
+    )
+    ap.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE,
+        metavar="SECONDS",
+        help=f"Wait this long without changes before rescanning (default: {DEBOUNCE})",
+    )
+    ap.add_argument(
+        "--poll",
+        action="store_true",
+        help="Compare file mtimes periodically instead of using inotify",
+    )
+    ap.add_argument(
+        "--interval",
+        type=float,
+        default=POLL_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between polls (default: {POLL_INTERVAL})",
+    )
+    ap.add_argument(
+        "--no-ignore-files",
+        action="store_true",
+        help="Do not honor .gitignore / .ragscanignore",
+    )
+    ap.add_argument(
+        "--archives", action="store_true", help="Also scan inside zip/tar/gz files"
+    )
+    ap.add_argument("--no-evidence", action="store_true", help="Omit snippets")
+    args = ap.parse_args(argv)
+    if not pathlib.Path(args.path).exists():
+        print(f"error: path not found: {args.path}", file=sys.stderr)
+        sys.exit(2)
+    opts = ScanOptions(
+        ignore_files=() if args.no_ignore_files else IGNORE_FILES,
+        archives=args.archives,
+        # the text format prints no snippets: do not build them
+        evidence=args.format == "ndjson" and not args.no_evidence,
+        read_ahead=0,  # rescans touch a few files
+    )
+    watcher = Watcher(args.path, args.config, opts)
+    source = open_source(watcher, args.poll, max(args.interval, 0.05))
+    how = "polling" if isinstance(source, PollSource) else "inotify"
+
+    def emit(update: dict, seconds: float) -> None:
+        _print_update(update, args.format)
+        note = f" files={len(watcher.findings)} rescan={seconds * 1000:.0f}ms"
+        _print_summary(watcher.tally(), args.fail_on, note)
+
+    def on_error(e: Exception) -> None:
+        print(f"error: reloading rules from {args.config}: {e}", file=sys.stderr)
+
+    print(f"rag-scan watching {args.path} ({how})", file=sys.stderr)
+    try:
+        run(watcher, source, emit, max(args.debounce, 0.0), on_error=on_error)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+
+# Subcommands take the place of the path; scan "./serve" to scan a folder so named
+COMMANDS = {
+    "serve": _serve_main,
+    "compile-rules": _compile_rules_main,
+    "lint-rules": _lint_rules_main,
+    "merge": _merge_main,
+    "watch": _watch_main,
+}
 
 
 def main(argv: Optional[list[str]] = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
     args = _parse_args(argv)
 
-    p = pathlib.Path(args.path)
-    if not p.exists():
-        print(f"error: path not found: {p}", file=sys.stderr)
+    if not args.paths and args.files_from is None:
+        print("error: give a PATH to scan or --files-from", file=sys.stderr)
         sys.exit(2)
+    for path in args.paths:
+        if not pathlib.Path(path).exists():
+            print(f"error: path not found: {path}", file=sys.stderr)
+            sys.exit(2)
+    if args.changed_lines and not args.changed_since:
+        print("error: --changed-lines needs --changed-since", file=sys.stderr)
+        sys.exit(2)
+    if args.changed_since and args.files_from is not None:
+        print(
+            "error: --changed-since works on PATHs, not --files-from", file=sys.stderr
+        )
+        sys.exit(2)
+    changes = None
+    if args.changed_since:
+        from .gitdiff import GitError, changed_lines
+
+        changes = {}
+        try:
+            for path in args.paths:
+                changes.update(changed_lines(path, args.changed_since))
+        except GitError as e:
+            print(f"error: --changed-since: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    roots: Iterable[str] = args.paths
+    if args.files_from is not None:
+        try:
+            listing = (
+                sys.stdin.buffer
+                if args.files_from == "-"
+                else open(args.files_from, "rb")  # closed at exit
+            )
+        except OSError as e:
+            print(f"error: --files-from: {e}", file=sys.stderr)
+            sys.exit(2)
+        # listed paths stream into the scan while the producer still writes
+        roots = itertools.chain(args.paths, read_file_list(listing))
 
+    opts = ScanOptions(
+        jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+        chunk_size=max(args.chunk_size, 1),
+        read_ahead=max(args.read_ahead, 0),
+        read_ahead_bytes=max(args.read_ahead_bytes, 1),
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_size,
+        ignore_files=() if args.no_ignore_files else IGNORE_FILES,
+        fail_fast=args.fail_on if args.fail_fast else None,
+        evidence=not args.no_evidence,
+        max_per_rule=args.max_per_rule,
+        aggregate=args.aggregate,
+        samples=max(args.samples, 0),
+        archives=args.archives,
+        sniff=not args.no_sniff,
+        dedup=not args.no_dedup,
+        rule_timeout=args.rule_timeout if args.rule_timeout > 0 else None,
+        shard=args.shard,
+        jsonl=args.jsonl,
+        id_field=args.id_field,
+        text_field=args.text_field,
+        changes=changes,
+        changed_lines_only=args.changed_lines,
+    )
     cfg = load_config(args.config)
-    result = scan_path(str(p), cfg)
-    findings = result["findings"]
 
-    # Write output
+    # Findings stream from the scanner straight into the writer; the tally
+    # keeps the summary and exit code without holding them in memory.
+    tally = SeverityTally()
+    stats = ScanStats() if args.stats or args.stats_json else None
+    totals: dict[str, int] = {}
+    findings = tally.track(iter_findings(roots, cfg, opts, stats=stats, totals=totals))
+    waited = {"scan": 0.0}
+    if stats is not None:
+        findings = timed(findings, waited, "scan")
+    write = WRITERS[args.format]
+    if args.aggregate and args.format == "csv":
+        write = functools.partial(to_csv, fieldnames=AGGREGATE_FIELDS)
+    t0 = time.perf_counter()
     if args.out == "-":
+        write(findings, sys.stdout)
         if args.format == "json":
-            print(json.dumps(findings, indent=2, ensure_ascii=False))
-        else:
-            # lazy import to avoid circular
-            from .report import to_csv
-
-            to_csv(findings, sys.stdout)
+            sys.stdout.write("\n")
     else:
-        from .report import to_csv, to_json
-
         with open(args.out, "w", encoding="utf-8", newline="") as fh:
-            (to_json if args.format == "json" else to_csv)(findings, fh)
+            write(findings, fh)
+
+    if stats is not None:
+        # Writing time is what the writer spent apart from waiting on findings
+        stats.stages["report"] = max(time.perf_counter() - t0 - waited["scan"], 0.0)
+        if args.stats:
+            print(stats.format(), file=sys.stderr)
+        if args.stats_json:
+            with open(args.stats_json, "w", encoding="utf-8") as fh:
+                json.dump(stats.to_dict(), fh, indent=2)
 
-    exit_code = exit_code_for_findings(findings, args.fail_on)
+    exit_code = tally.exit_code(args.fail_on)
 
     # Human-friendly summary to stderr
-    counts = _count_by_severity(findings)
     if args.summary or exit_code != 0:
-        print(
-            f"summary: low={counts['low']} med={counts['med']} high={counts['high']} "
-            f"(threshold: >= {args.fail_on})",
-            file=sys.stderr,
-        )
+        note = " [partial: --fail-fast]" if args.fail_fast and exit_code else ""
+        if totals.get("duplicates"):
+            note += f" duplicates={totals['duplicates']} (scanned once)"
+        _print_summary(tally, args.fail_on, note)
 
     sys.exit(exit_code)
 
@@ -0,0 +1,625 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Compiled rule engine: one combined pass over a document for the whole ruleset.
+
+Rules that share regex flags are merged into a single zero-width "locator"
+pattern. Branches are factored by their literal prefix (a trie), so most text
+positions are rejected after one or two character checks instead of one
+attempt per rule. Every position the locator reports is then confirmed
+with the individual rule patterns, which keeps the findings identical to
+running ``rule.pattern.finditer`` once per rule.
+
+Plain ASCII buffers can be scanned without decoding: bytes_plan() maps each
+rule to an equivalent bytes pattern where one exists (see to_bytes_pattern),
+and plain_matches() runs those on the raw buffer or an mmap.
+
+bounded_matches() gives each rule a time budget per document (deadline()),
+so one catastrophically backtracking pattern cannot stall a scan.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+import warnings
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    overload,
+)
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+if TYPE_CHECKING:
+    from .patterns import Rule
+
+_META = set(".^$*+?{}[]()|")
+_QUANTIFIERS = set("*+?{")
+
+PREFILTER = "(prefilter)"  # pseudo rule code for the required-literal pass
+# Below this many patterns, searching each one on its own beats compiling a
+# combined locator (compiles are cached, but short runs pay for every one)
+LOCATOR_MIN = 4
+
+
+# ---------------- Time budgets ----------------
+class RuleTimeout(Exception):
+    """A rule's regex search ran past its time budget (see deadline())."""
+
+
+def _on_alarm(signum, frame) -> None:
+    raise RuleTimeout()
+
+
+def interruptible() -> bool:
+    """
+    True if deadline() can stop a search here: it needs SIGALRM timers
+    (not on Windows) and the main thread, where signal handlers run.
+    """
+    import signal
+    import threading
+
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise RuleTimeout inside the block once 'seconds' have passed. The regex
+    engine checks for pending signals while it backtracks, so this stops a
+    runaway search. A no-op when 'seconds' is None or not interruptible()
+    (e.g. `rag-scan serve` request threads; its worker processes are covered).
+    """
+    import signal
+
+    if not seconds or not interruptible():
+        yield
+        return
+    old = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+# ---------------- Pattern analysis ----------------
+def is_mergeable(pattern: Pattern) -> bool:
+    """
+    True if 'pattern' can be embedded in a combined locator without changing
+    what it matches: no named groups or backreferences (group numbers shift
+    when embedded), no inline global flags, and no empty matches (finditer
+    treats those specially).
+    """
+    if pattern.groupindex:
+        return False
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+        if parsed.getwidth()[0] == 0 or _has_groupref(parsed):
+            return False
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            re.compile(f"(?=(?:{pattern.pattern}))", pattern.flags)
+    except Exception:
+        return False
+    return True
+
+
+def _has_groupref(parsed) -> bool:
+    for op, av in parsed:
+        if str(op).startswith("GROUPREF"):
+            return True
+        for item in av if isinstance(av, (list, tuple)) else ():
+            if isinstance(item, _sre_parse.SubPattern) and _has_groupref(item):
+                return True
+            if isinstance(item, (list, tuple)):
+                for sub in item:
+                    if isinstance(sub, _sre_parse.SubPattern) and _has_groupref(sub):
+                        return True
+    return False
+
+
+def required_literal(pattern: Pattern) -> Optional[str]:
+    """
+    Return the longest run of literal characters that every match of
+    'pattern' must contain (compared under the pattern's own flags), or
+    None if no such literal can be derived.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    runs: List[str] = []
+    cur: List[str] = []
+    _literal_runs(parsed, runs, cur)
+    runs.append("".join(cur))
+    best = max(runs, key=len, default="")
+    return best or None
+
+
+def _literal_runs(parsed, runs: List[str], cur: List[str]) -> None:
+    """Collect runs of consecutive required LITERAL ops into 'runs'."""
+    for op, av in parsed:
+        name = str(op)
+        if name == "LITERAL":
+            cur.append(chr(av))
+            continue
+        if name == "SUBPATTERN" and not av[1] and not av[2]:
+            # plain group: its content is inline with what surrounds it
+            _literal_runs(av[3], runs, cur)
+            continue
+        runs.append("".join(cur))
+        cur.clear()
+
+
+def _has_top_level_bar(src: str) -> bool:
+    depth = 0
+    i = 0
+    in_class = False
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+            # a leading ']' (or '^]') is a literal member of the class
+            if src[i + 1 : i + 2] == "^":
+                i += 1
+            if src[i + 1 : i + 2] == "]":
+                i += 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def split_literal_prefix(src: str, flags: int = 0) -> Tuple[bool, Tuple[str, ...], str]:
+    """
+    Split a pattern source into (leading \\b?, literal prefix tokens, rest)
+    such that ``\\b`` + ``"".join(tokens)`` + ``(?:rest)`` is equivalent to
+    'src'. Returns (False, (), src) when the pattern cannot be split safely.
+    """
+    if flags & re.X or _has_top_level_bar(src):
+        return False, (), src
+    i = 0
+    boundary = src.startswith(r"\b")
+    if boundary:
+        i = 2
+    tokens: List[str] = []
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            nxt = src[i + 1 : i + 2]
+            if not nxt or nxt.isalnum() or nxt == "_":
+                break
+            tok = src[i : i + 2]
+        elif c in _META:
+            break
+        else:
+            tok = c
+        after = src[i + len(tok) : i + len(tok) + 1]
+        if after and after in _QUANTIFIERS:
+            break
+        tokens.append(tok)
+        i += len(tok)
+    return boundary, tuple(tokens), src[i:]
+
+
+def analyze(pattern: Pattern) -> Tuple[bool, Optional[str]]:
+    """(is_mergeable, required_literal) for one pattern."""
+    return is_mergeable(pattern), required_literal(pattern)
+
+
+def to_bytes_pattern(pattern: Pattern) -> Optional[Pattern]:
+    """
+    Bytes version of the str 'pattern', matching the same spans on plain
+    text (ASCII without \\r or \\x1c-\\x1f, where str and bytes \\s
+    differ), or None when the pattern needs Unicode semantics: non-ASCII
+    source, \\u/\\N escapes, (?u) and the like.
+    """
+    src = pattern.pattern
+    if not isinstance(src, str) or not src.isascii():
+        return None
+    try:
+        return re.compile(src.encode("ascii"), pattern.flags & ~re.UNICODE)
+    except (re.error, ValueError):
+        return None
+
+
+# ---------------- Prefix trie ----------------
+class _Node:
+    __slots__ = ("children", "rests")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.rests: List[str] = []
+
+    def insert(self, tokens: Sequence[str], rest: str) -> None:
+        node = self
+        for tok in tokens:
+            node = node.children.setdefault(tok, _Node())
+        node.rests.append(rest)
+
+    def render(self) -> str:
+        if "" in self.rests:
+            return ""  # the prefix alone is a match; nothing below can add to it
+        alts = [tok + child.render() for tok, child in self.children.items()]
+        alts.extend(f"(?:{rest})" for rest in self.rests)
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+
+@lru_cache(maxsize=256)
+def build_locator(
+    sources: Tuple[str, ...], flags: int, binary: bool = False
+) -> Pattern:
+    """
+    Compile a zero-width pattern matching wherever any of 'sources' matches;
+    with 'binary', as a bytes pattern (the sources must be ASCII).
+    """
+    bounded, unbounded = _Node(), _Node()
+    for src in sources:
+        boundary, tokens, rest = split_literal_prefix(src, flags)
+        (bounded if boundary else unbounded).insert(tokens, rest)
+    alts = []
+    if bounded.children or bounded.rests:
+        alts.append(r"\b" + bounded.render())
+    if unbounded.children or unbounded.rests:
+        alts.append(unbounded.render())
+    src = "(?=" + "|".join(alts) + ")"
+    return re.compile(src.encode("ascii") if binary else src, flags)
+
+
+# ---------------- Engine ----------------
+class BytesPlan(NamedTuple):
+    """How a RuleEngine runs on a plain ASCII buffer (see bytes_plan())."""
+
+    binary: "RuleEngine"  # bytes patterns, run on the raw buffer
+    binary_index: Tuple[int, ...]  # their positions in the original engine
+    text: "RuleEngine"  # rules that need the decoded str
+    text_index: Tuple[int, ...]
+
+
+class RuleEngine(Sequence["Rule"]):
+    """
+    Immutable, ordered ruleset compiled for single-pass scanning.
+
+    Behaves like a sequence of Rule objects, so it can be used anywhere a
+    list of rules was accepted before.
+
+    Each document is first checked for the rules' required literals (one
+    combined pass per flag group); rules whose literals are all absent are
+    skipped, so a clean document usually costs one cheap literal scan plus
+    the few rules without a literal.
+
+    Rules with bytes patterns (as built by bytes_plan()) scan bytes-like
+    buffers; an engine cannot mix str and bytes patterns.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable["Rule"],
+        analysis: Optional[Sequence[Tuple[bool, Optional[str]]]] = None,
+    ):
+        """
+        'analysis' optionally supplies analyze() output for 'rules' (e.g. from
+        a compiled ruleset artifact) so the patterns are not re-analyzed.
+        It is required for bytes patterns.
+        """
+        self._rules: Tuple["Rule", ...] = tuple(rules)
+        kinds = {isinstance(r.pattern.pattern, bytes) for r in self._rules}
+        if len(kinds) > 1:
+            raise ValueError("cannot mix str and bytes patterns in one engine")
+        self._binary = kinds == {True}
+        self._plan: Optional[BytesPlan] = None
+        if analysis is None:
+            if self._binary:
+                raise ValueError("bytes patterns need their str analysis")
+            analysis = [analyze(r.pattern) for r in self._rules]
+        elif len(analysis) != len(self._rules):
+            raise ValueError("analysis does not match the rules")
+        self._analysis = tuple((bool(m), lit) for m, lit in analysis)
+
+        self._by_flags: Dict[int, List[int]] = {}
+        self._solo: List[int] = []
+        for i, r in enumerate(self._rules):
+            if self._analysis[i][0]:
+                self._by_flags.setdefault(r.pattern.flags, []).append(i)
+            else:
+                self._solo.append(i)
+
+        # literal (escaped source) -> rule indices, grouped by regex flags
+        self._literals: Dict[int, Dict[str, List[int]]] = {}
+        self._literal_res: Dict[Tuple[int, str], Pattern] = {}
+        self._always: Set[int] = set()
+        for i, r in enumerate(self._rules):
+            lits = r.literals or tuple(filter(None, [self._analysis[i][1]]))
+            if not lits:
+                self._always.add(i)
+                continue
+            by_lit = self._literals.setdefault(r.pattern.flags, {})
+            for lit in lits:
+                src = re.escape(lit)
+                by_lit.setdefault(src, []).append(i)
+                self._literal_res[(r.pattern.flags, src)] = re.compile(
+                    src.encode("ascii") if self._binary else src, r.pattern.flags
+                )
+
+    # Sequence protocol
+    @overload
+    def __getitem__(self, idx: int) -> "Rule": ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> Tuple["Rule", ...]: ...
+
+    def __getitem__(self, idx):
+        return self._rules[idx]
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __iter__(self) -> Iterator["Rule"]:
+        return iter(self._rules)
+
+    def __repr__(self) -> str:
+        return (
+            f"RuleEngine(rules={len(self._rules)}, "
+            f"merged_groups={len(self._by_flags)}, unmerged={len(self._solo)})"
+        )
+
+    @property
+    def rules(self) -> Tuple["Rule", ...]:
+        return self._rules
+
+    @property
+    def analysis(self) -> Tuple[Tuple[bool, Optional[str]], ...]:
+        """Per rule: (mergeable, required literal), as from analyze()."""
+        return self._analysis
+
+    def fingerprint(self) -> str:
+        """
+        Stable digest of everything that affects findings: rule order,
+        codes, descriptions, severities, pattern sources, flags and literals.
+        """
+        spec = [
+            [r.code, r.desc, r.severity, r.pattern.pattern, r.pattern.flags]
+            + list(r.literals)
+            for r in self._rules
+        ]
+        blob = json.dumps(spec, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _source(self, i: int) -> str:
+        src = self._rules[i].pattern.pattern
+        return src.decode("ascii") if self._binary else src
+
+    def get(self, code: str) -> Optional["Rule"]:
+        return next((r for r in self._rules if r.code == code), None)
+
+    def candidates(self, text: str) -> Set[int]:
+        """
+        Return indices of rules that can match 'text': rules without a
+        required literal plus rules whose literal occurs in the text.
+        """
+        active = set(self._always)
+        for flags, by_lit in self._literals.items():
+            remaining: FrozenSet[str] = frozenset(by_lit)
+            pos = 0
+            while len(remaining) >= LOCATOR_MIN:
+                locator = build_locator(tuple(sorted(remaining)), flags, self._binary)
+                loc = locator.search(text, pos)
+                if loc is None:
+                    break
+                pos = loc.start()
+                found = {
+                    lit
+                    for lit in remaining
+                    if self._literal_res[(flags, lit)].match(text, pos) is not None
+                }
+                for lit in found:
+                    active.update(by_lit[lit])
+                remaining -= found
+                pos += 1
+            else:
+                for lit in remaining:
+                    if self._literal_res[(flags, lit)].search(text, pos) is not None:
+                        active.update(by_lit[lit])
+        return active
+
+    def matches(self, text: str) -> List[Tuple["Rule", Match]]:
+        """
+        Return (rule, match) pairs for 'text', ordered by rule then position:
+        the same order and matches as a per-rule finditer loop.
+        """
+        return [(self._rules[i], m) for i, m in self.indexed_matches(text)]
+
+    def indexed_matches(
+        self, text: str, starts: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, Match]]:
+        """
+        Like matches(), but yields rule indices. 'starts' optionally gives,
+        per rule, the offset to start searching from (as finditer's 'pos':
+        text before it is still visible to \b and lookbehinds).
+        """
+        if starts is None:
+            starts = [0] * len(self._rules)
+        active = self.candidates(text)
+        hits: List[Tuple[int, Match]] = []
+        solo = [i for i in self._solo if i in active]
+        for flags, members in self._by_flags.items():
+            live = [i for i in members if i in active]
+            if len(live) < LOCATOR_MIN:
+                solo.extend(live)
+                continue
+            sources = tuple(self._source(i) for i in live)
+            resume = {i: starts[i] for i in live}
+            locator = build_locator(sources, flags, self._binary)
+            for loc in locator.finditer(text, min(resume.values())):
+                pos = loc.start()
+                for i in live:
+                    if pos < resume[i]:
+                        continue
+                    m = self._rules[i].pattern.match(text, pos)
+                    if m is not None:
+                        hits.append((i, m))
+                        resume[i] = m.end()
+        for i in solo:
+            pattern = self._rules[i].pattern
+            hits.extend((i, m) for m in pattern.finditer(text, starts[i]))
+
+        hits.sort(key=lambda h: (h[0], h[1].start()))
+        return hits
+
+    def profiled_matches(
+        self, text: str, record: Callable[[str, float, int, int], None]
+    ) -> List[Tuple["Rule", Match]]:
+        """
+        Like matches(), but runs every candidate rule on its own and calls
+        record(code, seconds, matches, chars) for it (and once for the
+        PREFILTER pass), so the cost of each rule can be measured. Slower
+        than matches(); used for --stats.
+        """
+        return [(self._rules[i], m) for i, m in self._run_each(text, record)[0]]
+
+    def bounded_matches(
+        self,
+        text,
+        budget: Optional[float],
+        starts: Optional[Sequence[int]] = None,
+        record: Optional[Callable[[str, float, int, int], None]] = None,
+    ) -> Tuple[List[Tuple[int, Match]], List[int]]:
+        """
+        indexed_matches() (or, with 'record', the per-rule runs of
+        profiled_matches()) giving each rule at most 'budget' seconds on
+        'text'. Returns (hits, indices of rules abandoned over budget).
+
+        The combined pass runs under a single budget; if that runs out,
+        every candidate rule is rerun on its own with its own budget, so
+        only the runaway rules are dropped. budget=None means no limit.
+        """
+        if record is None:
+            try:
+                with deadline(budget):
+                    return self.indexed_matches(text, starts), []
+            except RuleTimeout:
+                pass
+        return self._run_each(text, record, budget, starts)
+
+    def _run_each(
+        self,
+        text,
+        record: Optional[Callable[[str, float, int, int], None]] = None,
+        budget: Optional[float] = None,
+        starts: Optional[Sequence[int]] = None,
+    ) -> Tuple[List[Tuple[int, Match]], List[int]]:
+        t0 = time.perf_counter()
+        active = self.candidates(text)
+        if record is not None:
+            record(PREFILTER, time.perf_counter() - t0, 0, len(text))
+        hits: List[Tuple[int, Match]] = []
+        abandoned: List[int] = []
+        for i, r in enumerate(self._rules):
+            if i not in active:
+                continue
+            t0 = time.perf_counter()
+            try:
+                with deadline(budget):
+                    found = list(r.pattern.finditer(text, starts[i] if starts else 0))
+            except RuleTimeout:
+                abandoned.append(i)
+                found = []
+            if record is not None:
+                record(r.code, time.perf_counter() - t0, len(found), len(text))
+            hits.extend((i, m) for m in found)
+        return hits, abandoned
+
+    # -------- plain ASCII buffers --------
+    def bytes_plan(self) -> BytesPlan:
+        """
+        Split the ruleset for plain buffers: rules with a bytes equivalent
+        (to_bytes_pattern() and ASCII literals) and the rest. Built once.
+        """
+        if self._plan is None:
+            binary, binary_index, text_index = [], [], []
+            for i, r in enumerate(self._rules):
+                pattern = to_bytes_pattern(r.pattern)
+                # the literals the prefilter uses: declared, else derived (an
+                # ASCII source such as caf\xe9 can still require a non-ASCII one)
+                lits = r.literals or tuple(filter(None, [self._analysis[i][1]]))
+                if pattern is not None and all(lit.isascii() for lit in lits):
+                    binary.append(replace(r, pattern=pattern))
+                    binary_index.append(i)
+                else:
+                    text_index.append(i)
+            self._plan = BytesPlan(
+                RuleEngine(binary, [self._analysis[i] for i in binary_index]),
+                tuple(binary_index),
+                RuleEngine(
+                    [self._rules[i] for i in text_index],
+                    [self._analysis[i] for i in text_index],
+                ),
+                tuple(text_index),
+            )
+        return self._plan
+
+    def plain_matches(
+        self,
+        buf,
+        record: Optional[Callable[[str, float, int, int], None]] = None,
+        budget: Optional[float] = None,
+    ) -> Tuple[List[Tuple["Rule", Match]], List["Rule"]]:
+        """
+        bounded_matches() for a plain buffer: bytes, or an mmap, holding
+        ASCII without \\r or \\x1c-\\x1f. Bytes patterns run on the buffer
+        itself; it is decoded only if some rule has no bytes equivalent.
+        Match spans are offsets into the buffer, which equal character
+        offsets in its text. Returns ((rule, match) pairs, abandoned rules).
+        """
+        plan = self.bytes_plan()
+        hits, abandoned = plan.binary.bounded_matches(buf, budget, record=record)
+        hits = [(plan.binary_index[i], m) for i, m in hits]
+        abandoned = [plan.binary_index[i] for i in abandoned]
+        if len(plan.text):
+            text = str(buf, "ascii")
+            more, late = plan.text.bounded_matches(text, budget, record=record)
+            hits.extend((plan.text_index[i], m) for i, m in more)
+            abandoned.extend(plan.text_index[i] for i in late)
+            hits.sort(key=lambda h: (h[0], h[1].start()))
+        return [(self._rules[i], m) for i, m in hits], [
+            self._rules[i] for i in sorted(abandoned)
+        ]
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Changed files and line ranges from the local git repository, for
+`rag-scan --changed-since REF`.
+
+Changes are taken against the merge base of REF and HEAD (what a pull
+request adds, whatever happened on REF since), including uncommitted edits
+and untracked files that are not ignored, so the same command works in CI
+and before a push.
+"""
+
+from __future__ import annotations
+
+import pathlib
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+LineRanges = Tuple[Tuple[int, int], ...]  # 1-based inclusive (first, last)
+
+_HUNK = re.compile(r"^@@ -\S+ \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(RuntimeError):
+    """git is missing, the path is not in a work tree, or the ref is unknown."""
+
+
+def _git(cwd: str, *args: str) -> str:
+    try:
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            check=True,
+        )
+    except FileNotFoundError:
+        raise GitError("git executable not found") from None
+    except subprocess.CalledProcessError as e:
+        msg = e.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed"
+        raise GitError(msg) from None
+    return proc.stdout.decode("utf-8", "surrogateescape")
+
+
+def _unquote(name: str) -> str:
+    """Undo git's C-style quoting of unusual path names."""
+    if len(name) < 2 or not (name.startswith('"') and name.endswith('"')):
+        return name
+    raw = name[1:-1].encode("utf-8", "surrogateescape").decode("unicode_escape")
+    return raw.encode("latin-1").decode("utf-8", "surrogateescape")
+
+
+def _hunks(diff: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Added/modified line ranges per file from 'git diff -U0' output."""
+    out: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            current = None
+        elif line.startswith("+++ "):
+            # git ends the name with a TAB when it contains a space
+            name = _unquote(line[4:].removesuffix("\t"))
+            current = out.setdefault(name[2:], []) if name.startswith("b/") else None
+        elif line.startswith("@@") and current is not None:
+            m = _HUNK.match(line)
+            if m:
+                first, count = int(m[1]), int(m[2] or 1)
+                if count:  # count 0: lines were only removed here
+                    current.append((first, first + count - 1))
+    return out
+
+
+def changed_lines(path: str, ref: str) -> Dict[str, Optional[LineRanges]]:
+    """
+    Files under 'path' (a directory or one file) added or modified since
+    the merge base of 'ref' and HEAD, mapped to their changed line ranges.
+    Keys are paths as the scanner names them (doc_id: 'path' joined with
+    the file's path below it). Untracked files and files without a line
+    diff (binary) map to None: every line counts as changed. Deleted files
+    are left out. Raises GitError when git cannot answer.
+    """
+    p = pathlib.Path(path)
+    cwd, spec = (p, ".") if p.is_dir() else (p.parent, p.name)
+    base = _git(str(cwd), "merge-base", ref, "HEAD").strip()
+    common = ["--relative", "-M", "--diff-filter=ACMR", base, "--", spec]
+    names = _git(str(cwd), "diff", "--name-only", "-z", *common).split("\0")
+    diff = _git(
+        str(cwd),
+        "-c",
+        "core.quotepath=off",
+        "diff",
+        "--no-color",
+        "--no-ext-diff",
+        "-U0",
+        *common,
+    )
+    untracked = _git(
+        str(cwd), "ls-files", "-z", "--others", "--exclude-standard", "--", spec
+    ).split("\0")
+
+    hunks = _hunks(diff)
+    changes: Dict[str, Optional[LineRanges]] = {}
+    for name in names:
+        if name:
+            ranges = hunks.get(name)
+            changes[(cwd / name).as_posix()] = None if ranges is None else tuple(ranges)
+    for name in untracked:
+        if name:
+            changes[(cwd / name).as_posix()] = None
+    return changes
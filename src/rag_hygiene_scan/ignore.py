@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+.gitignore-style ignore files (.gitignore, .ragscanignore).
+
+Supports the gitignore pattern syntax that matters for doc trees: comments,
+negation (!), directory-only patterns (trailing /), anchored patterns
+(containing /), *, ?, [...] and **. As in git, the last matching pattern
+wins and patterns in deeper directories take precedence.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Pattern, Sequence, Tuple
+
+IGNORE_FILES = (".gitignore", ".ragscanignore")
+
+
+@dataclass(frozen=True)
+class IgnorePattern:
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pat: str) -> str:
+    """Translate one gitignore glob (without !, trailing / or leading /)."""
+    out: List[str] = []
+    i, n = 0, len(pat)
+    while i < n:
+        c = pat[i]
+        if pat.startswith("**/", i) and (i == 0 or pat[i - 1] == "/"):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pat.startswith("**", i) and i + 2 == n and (i == 0 or pat[i - 1] == "/"):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pat.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pat[i + 1 : j]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pat[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_ignore_lines(lines: Sequence[str]) -> List[IgnorePattern]:
+    patterns: List[IgnorePattern] = []
+    for raw in lines:
+        line = raw.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        body = _translate(line)
+        if not anchored:
+            body = "(?:.*/)?" + body
+        patterns.append(IgnorePattern(re.compile(f"^{body}$"), negate, dir_only))
+    return patterns
+
+
+def load_ignore_patterns(
+    dirpath: str, names: Sequence[str] = IGNORE_FILES
+) -> List[IgnorePattern]:
+    """Patterns from the ignore files present in 'dirpath', in order."""
+    patterns: List[IgnorePattern] = []
+    for name in names:
+        try:
+            with open(
+                os.path.join(dirpath, name), "r", encoding="utf-8", errors="ignore"
+            ) as fh:
+                patterns.extend(parse_ignore_lines(fh.readlines()))
+        except OSError:
+            continue
+    return patterns
+
+
+# (absolute base directory, patterns loaded from it), outermost first
+IgnoreChain = Tuple[Tuple[str, Tuple[IgnorePattern, ...]], ...]
+
+
+def is_ignored(chain: IgnoreChain, abspath: str, is_dir: bool) -> bool:
+    """
+    Evaluate the absolute 'abspath' against every ignore file in 'chain';
+    the last matching pattern wins.
+    """
+    ignored = False
+    for base, patterns in chain:
+        prefix = base.rstrip(os.sep) + os.sep
+        if not abspath.startswith(prefix):
+            continue
+        rel = abspath[len(prefix) :]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        for p in patterns:
+            if p.dir_only and not is_dir:
+                continue
+            if p.regex.match(rel):
+                ignored = not p.negate
+    return ignored
+
+
+def ancestor_chain(root: str, names: Sequence[str] = IGNORE_FILES) -> IgnoreChain:
+    """
+    Ignore files that apply to 'root' from its parent directories, up to and
+    including the enclosing git work tree (the first ancestor with .git).
+    """
+    root = os.path.abspath(root)
+    if os.path.exists(os.path.join(root, ".git")):
+        return ()
+    found = []
+    cur = os.path.dirname(root)
+    while True:
+        pats = load_ignore_patterns(cur, names)
+        if pats:
+            found.append((cur, tuple(pats)))
+        if os.path.exists(os.path.join(cur, ".git")):
+            break
+        parent = os.path.dirname(cur)
+        if parent == cur:
+            # not inside a git work tree: only the scan root's own files apply
+            return ()
+        cur = parent
+    return tuple(reversed(found))
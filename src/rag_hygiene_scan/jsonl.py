@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Read chunked JSONL exports (one JSON record per line) as documents.
+
+A dump is cut into byte ranges (JsonlSlice) that start and end on line
+boundaries, so workers can scan parts of one large file independently.
+Records are read one line at a time: memory is bounded by the longest
+record, not by the size of the dump. Each record is one document with
+doc_id "<file>:<line>:<id>".
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Tuple
+
+JSONL_EXTS = {".jsonl", ".ndjson"}
+COUNT_BLOCK = 1024 * 1024
+
+# doc_id of a record; used to keep merged reports in file/line order
+DOC_ID_RE = re.compile(r"^(.*?\.(?:jsonl|ndjson)):(\d+)(?::|$)", re.IGNORECASE)
+
+
+class JsonlSlice(NamedTuple):
+    """Byte range [start, end) of a JSONL file, 'line' = number of its first line."""
+
+    path: str
+    start: int
+    end: Optional[int]  # None: to the end of the file
+    line: int
+
+
+def jsonl_slices(path: str, size: int) -> Iterator[JsonlSlice]:
+    """
+    Cut 'path' into slices of about 'size' bytes, each ending after a
+    newline. Line numbers come from counting newlines, one sequential read
+    that is cheap next to scanning. An unreadable file is one slice; the
+    error is reported when it is scanned.
+    """
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        yield JsonlSlice(path, 0, None, 1)
+        return
+    with fh:
+        total = os.fstat(fh.fileno()).st_size
+        start, line = 0, 1
+        while start < total:
+            fh.seek(start + max(size, 1) - 1)
+            fh.readline()  # finish the line that crosses the boundary
+            end = min(fh.tell(), total)
+            yield JsonlSlice(path, start, end, line)
+            fh.seek(start)
+            left = end - start
+            while left > 0:
+                block = fh.read(min(COUNT_BLOCK, left))
+                if not block:
+                    break
+                line += block.count(b"\n")
+                left -= len(block)
+            start = end
+
+
+def field_getter(dotted: str) -> Callable[[Any], Any]:
+    """Getter for a dotted field path, e.g. "metadata.chunk_id"; None if absent."""
+    keys = dotted.split(".")
+
+    def get(record: Any) -> Any:
+        for key in keys:
+            if not isinstance(record, dict):
+                return None
+            record = record.get(key)
+        return record
+
+    return get
+
+
+def iter_records(
+    sl: JsonlSlice, id_field: str = "id", text_field: str = "text"
+) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+    """
+    Yield (doc_id, text, None) for each record of the slice, or
+    (doc_id, None, error) for a line that is not a JSON object with a string
+    at 'text_field' (and (path, None, error) if the file cannot be read).
+    Blank lines are skipped. Records without an id get doc_id "<file>:<line>".
+    """
+    get_id, get_text = field_getter(id_field), field_getter(text_field)
+    try:
+        fh = open(sl.path, "rb")
+    except OSError as e:
+        yield sl.path, None, e
+        return
+    with fh:
+        fh.seek(sl.start)
+        pos, n = sl.start, sl.line
+        while sl.end is None or pos < sl.end:
+            raw = fh.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            line, n = n, n + 1
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                yield f"{sl.path}:{line}", None, ValueError(f"invalid JSON: {e}")
+                continue
+            rid = get_id(record)
+            doc_id = f"{sl.path}:{line}" if rid is None else f"{sl.path}:{line}:{rid}"
+            text = get_text(record)
+            if isinstance(text, str):
+                yield doc_id, text, None
+            else:
+                yield doc_id, None, ValueError(f"no string field {text_field!r}")
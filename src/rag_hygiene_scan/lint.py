@@ -0,0 +1,428 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Rule linting (`rag-scan lint-rules`).
+
+Three checks per rule:
+  - static: the parsed pattern is searched for shapes prone to catastrophic
+    backtracking (nested quantifiers whose repetitions can split the same
+    text several ways, overlapping alternatives under a quantifier,
+    adjacent quantifiers over overlapping characters);
+  - stress: the rule is timed on inputs built to trigger backtracking
+    (long runs of one character followed by one that breaks the match),
+    under a time budget;
+  - throughput: with a sample corpus, each rule's MB/s on its own.
+
+Static findings are warnings unless the pattern also blows the budget on a
+stress input, which is an error. Errors make `lint-rules` exit 1.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+from .engine import RuleTimeout, _sre_parse, deadline, interruptible
+from .patterns import _compose_default_rules
+
+# Characters are modelled as ASCII code points plus one stand-in for all
+# non-ASCII characters, which is enough to tell whether two sets overlap.
+_OTHER = 128
+_ALL = frozenset(range(_OTHER + 1))
+_CATEGORIES = {
+    "CATEGORY_DIGIT": r"\d",
+    "CATEGORY_NOT_DIGIT": r"\D",
+    "CATEGORY_SPACE": r"\s",
+    "CATEGORY_NOT_SPACE": r"\S",
+    "CATEGORY_WORD": r"\w",
+    "CATEGORY_NOT_WORD": r"\W",
+}
+_REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+# Repeats with at least this many allowed iterations count as unbounded
+UNBOUNDED = 64
+
+DEFAULT_BUDGET = 1.0  # seconds per stress input
+STRESS_LENGTHS = (32, 20_000)  # short runs expose exponential, long polynomial
+GENERIC_STRESS = "a0 .\n_-@/"  # characters tried for every rule
+SLOW_MB_PER_S = 1.0  # throughput below this is flagged
+DEFAULT_SAMPLE_BYTES = 16 * 1024 * 1024
+
+
+# ---------------- Static analysis ----------------
+def _category(cat: Any) -> FrozenSet[int]:
+    probe = _CATEGORIES.get(str(cat))
+    if probe is None:
+        return _ALL
+    rx = re.compile(probe)
+    chars = {c for c in range(_OTHER) if rx.match(chr(c))}
+    if rx.match("é"):
+        chars.add(_OTHER)
+    return frozenset(chars)
+
+
+def _fold(chars: FrozenSet[int]) -> FrozenSet[int]:
+    out = set(chars)
+    for c in chars:
+        if c < _OTHER and chr(c).isalpha():
+            out.update((ord(chr(c).lower()), ord(chr(c).upper())))
+    return frozenset(out)
+
+
+def _charset(op: str, av: Any, flags: int) -> Optional[FrozenSet[int]]:
+    """Characters a single-character op matches, or None for other ops."""
+    if op == "LITERAL":
+        chars = frozenset([min(av, _OTHER)])
+    elif op == "NOT_LITERAL":
+        chars = _ALL - {av} if av < _OTHER else _ALL
+    elif op == "ANY":
+        chars = _ALL if flags & re.S else _ALL - {10}
+    elif op == "IN":
+        acc: set = set()
+        negate = False
+        for item_op, item_av in av:
+            name = str(item_op)
+            if name == "NEGATE":
+                negate = True
+            elif name == "LITERAL":
+                acc.add(min(item_av, _OTHER))
+            elif name == "RANGE":
+                lo, hi = item_av
+                acc.update(range(min(lo, _OTHER), min(hi, _OTHER - 1) + 1))
+                if hi >= _OTHER:
+                    acc.add(_OTHER)
+            elif name == "CATEGORY":
+                acc |= _category(item_av)
+            else:
+                acc |= _ALL
+        chars = _ALL - acc if negate else frozenset(acc)
+    else:
+        return None
+    return _fold(chars) if flags & re.I else chars
+
+
+class _Info:
+    """What a (sub)pattern can start with, end with and consume at all."""
+
+    __slots__ = ("first", "last", "chars", "nullable", "repeats")
+
+    def __init__(self, first, last, chars, nullable, repeats=False) -> None:
+        self.first: FrozenSet[int] = first
+        self.last: FrozenSet[int] = last
+        self.chars: FrozenSet[int] = chars
+        self.nullable: bool = nullable
+        self.repeats: bool = repeats  # contains an unbounded repeat
+
+
+_EMPTY = frozenset()
+
+
+def _item_info(op: str, av: Any, flags: int) -> _Info:
+    chars = _charset(op, av, flags)
+    if chars is not None:
+        return _Info(chars, chars, chars, False)
+    if op == "SUBPATTERN":
+        _, add, remove, sub = av
+        return _seq_info(sub, (flags | add) & ~remove)
+    if op == "ATOMIC_GROUP":
+        info = _seq_info(av, flags)
+        return _Info(info.first, info.last, info.chars, info.nullable)
+    if op in _REPEATS:
+        lo, hi, sub = av
+        info = _seq_info(sub, flags)
+        unbounded = op != "POSSESSIVE_REPEAT" and hi >= UNBOUNDED
+        return _Info(
+            info.first,
+            info.last,
+            info.chars,
+            lo == 0 or info.nullable,
+            info.repeats or unbounded,
+        )
+    if op == "BRANCH":
+        alts = [_seq_info(alt, flags) for alt in av[1]]
+        return _Info(
+            frozenset().union(*(a.first for a in alts)),
+            frozenset().union(*(a.last for a in alts)),
+            frozenset().union(*(a.chars for a in alts)),
+            any(a.nullable for a in alts),
+            any(a.repeats for a in alts),
+        )
+    if op in ("AT", "ASSERT", "ASSERT_NOT"):
+        return _Info(_EMPTY, _EMPTY, _EMPTY, True)
+    # backreferences, conditionals: assume anything
+    return _Info(_ALL, _ALL, _ALL, True)
+
+
+def _seq_info(seq: Iterable[Tuple[Any, Any]], flags: int) -> _Info:
+    infos = [_item_info(str(op), av, flags) for op, av in seq]
+    first: set = set()
+    for info in infos:
+        first |= info.first
+        if not info.nullable:
+            break
+    last: set = set()
+    for info in reversed(infos):
+        last |= info.last
+        if not info.nullable:
+            break
+    return _Info(
+        frozenset(first),
+        frozenset(last),
+        frozenset().union(*(i.chars for i in infos)),
+        all(i.nullable for i in infos),
+        any(i.repeats for i in infos),
+    )
+
+
+def _sample(chars: FrozenSet[int]) -> str:
+    """A representative character from 'chars', preferring alphanumerics."""
+    ascii_chars = sorted(
+        (c for c in chars if c < _OTHER),
+        key=lambda c: (
+            not chr(c).islower(),
+            not chr(c).isalnum(),
+            not chr(c).isprintable(),
+            c,
+        ),
+    )
+    return chr(ascii_chars[0]) if ascii_chars else "é"
+
+
+def _alternatives(seq: Any) -> List[Any]:
+    """Branches of 'seq' if it is one alternation (possibly in a group)."""
+    items = list(seq)
+    while len(items) == 1 and str(items[0][0]) == "SUBPATTERN":
+        items = list(items[0][1][3])
+    if len(items) == 1 and str(items[0][0]) == "BRANCH":
+        return list(items[0][1][1])
+    return []
+
+
+def _walk(seq: Any, flags: int, risks: List[Tuple[str, str]]) -> None:
+    prev: Optional[_Info] = None  # last unbounded repeat, if only nullables since
+    for op, av in seq:
+        op = str(op)
+        info = _item_info(op, av, flags)
+        if op in _REPEATS and op != "POSSESSIVE_REPEAT" and av[1] >= UNBOUNDED:
+            body = _seq_info(av[2], flags)
+            overlap = body.last & body.first
+            if body.repeats and overlap:
+                risks.append(
+                    (
+                        _sample(overlap),
+                        "nested quantifier: a repeated group contains a repeat "
+                        "and its repetitions can split the same text several "
+                        f"ways (e.g. runs of {_sample(overlap)!r}); exponential "
+                        "backtracking when the match fails",
+                    )
+                )
+            firsts = [_seq_info(alt, flags).first for alt in _alternatives(av[2])]
+            for i, a in enumerate(firsts):
+                shared = next((a & b for b in firsts[i + 1 :] if a & b), None)
+                if shared:
+                    risks.append(
+                        (
+                            _sample(shared),
+                            "overlapping alternatives: in a repeated group "
+                            f"{_sample(shared)!r} can start more than one "
+                            "branch; exponential backtracking when the match fails",
+                        )
+                    )
+                    break
+            if prev is not None and prev.last & body.first:
+                shared = prev.last & body.first
+                risks.append(
+                    (
+                        _sample(shared),
+                        "adjacent quantifiers: both can match runs of "
+                        f"{_sample(shared)!r}; polynomial backtracking on long "
+                        "runs",
+                    )
+                )
+            prev = body
+            _walk(av[2], flags, risks)
+            continue
+        if op == "SUBPATTERN":
+            _walk(av[3], (flags | av[1]) & ~av[2], risks)
+        elif op == "BRANCH":
+            for alt in av[1]:
+                _walk(alt, flags, risks)
+        elif op in _REPEATS or op == "ATOMIC_GROUP":
+            _walk(av[2] if op in _REPEATS else av, flags, risks)
+        if not info.nullable:
+            prev = None
+
+
+def backtracking_risks(pattern: Pattern) -> List[Tuple[str, str]]:
+    """
+    Static check of 'pattern' for shapes prone to catastrophic backtracking.
+    Returns (witness character, message) pairs; the witness is a character
+    whose long runs are likely to trigger the problem.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+    risks: List[Tuple[str, str]] = []
+    _walk(parsed, pattern.flags, risks)
+    return risks
+
+
+# ---------------- Stress and throughput ----------------
+def stress_inputs(rule: Any, witnesses: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """
+    (label, text) inputs that make backtracking patterns do the most work:
+    long runs of one character (the static witnesses, then a generic set)
+    ended by a character the pattern cannot consume, so the match fails
+    only at the very end. Runs are also tried after each declared literal.
+    """
+    try:
+        parsed = _sre_parse.parse(rule.pattern.pattern, rule.pattern.flags)
+        used = _seq_info(parsed, rule.pattern.flags).chars
+    except Exception:
+        used = _ALL
+    end = next((c for c in "!#~\x00" if ord(c) not in used), "!")
+    prefixes = [""] + [lit for lit in rule.literals if lit]
+    inputs = []
+    for c in dict.fromkeys([*witnesses, *GENERIC_STRESS]):
+        for n in STRESS_LENGTHS:
+            for prefix in prefixes:
+                label = f"{prefix}{c!r} x {n} + {end!r}"
+                inputs.append((label, prefix + c * n + end))
+    return inputs
+
+
+def stress_rule(
+    rule: Any, witnesses: Iterable[str] = (), budget: float = DEFAULT_BUDGET
+) -> Tuple[float, Optional[str]]:
+    """
+    Time 'rule' on its stress inputs. Returns (slowest seconds, label of
+    the first input that ran past 'budget' or None).
+    """
+    slowest = 0.0
+    for label, text in stress_inputs(rule, witnesses):
+        t0 = time.perf_counter()
+        try:
+            with deadline(budget):
+                for _ in rule.pattern.finditer(text):
+                    pass
+        except RuleTimeout:
+            return budget, label
+        slowest = max(slowest, time.perf_counter() - t0)
+    return slowest, None
+
+
+def rule_throughput(
+    rule: Any, texts: List[str], budget: float = DEFAULT_BUDGET
+) -> Optional[float]:
+    """MB/s of 'rule' alone over 'texts', or None if it ran past 'budget'."""
+    chars = sum(len(t) for t in texts)
+    t0 = time.perf_counter()
+    try:
+        for text in texts:
+            with deadline(budget):
+                for _ in rule.pattern.finditer(text):
+                    pass
+    except RuleTimeout:
+        return None
+    secs = time.perf_counter() - t0
+    return chars / 1e6 / secs if secs > 0 else float("inf")
+
+
+def lint_rules(
+    rules: Iterable[Any],
+    texts: Optional[List[str]] = None,
+    budget: float = DEFAULT_BUDGET,
+    min_mb_per_s: float = SLOW_MB_PER_S,
+    builtin: bool = False,
+) -> Dict[str, Any]:
+    """
+    Lint each rule (static, stress and, with sample 'texts', throughput).
+    Stress runs need deadline() support (main thread, setitimer); without
+    it they are skipped, since a runaway pattern could not be stopped.
+    Built-in rules are left out unless 'builtin' (they are linted upstream;
+    PII001, for one, is quadratic on very long runs of address characters).
+    Returns {"rules": [{code, issues, stress_ms, mb_per_s}], "errors": n,
+    "warnings": n, "stress": whether stress runs happened}.
+    """
+    can_stress = interruptible()
+    defaults = {(r.code, r.pattern.pattern) for r in _compose_default_rules()}
+    report: List[Dict[str, Any]] = []
+    for rule in rules:
+        if not builtin and (rule.code, rule.pattern.pattern) in defaults:
+            continue
+        issues: List[Dict[str, str]] = []
+        risks = backtracking_risks(rule.pattern)
+        for _, message in risks:
+            issues.append({"level": "warning", "check": "static", "message": message})
+        stress_ms = None
+        if can_stress:
+            secs, label = stress_rule(rule, [w for w, _ in risks], budget)
+            stress_ms = secs * 1000
+            if label is not None:
+                issues.append(
+                    {
+                        "level": "error",
+                        "check": "stress",
+                        "message": f"ran past the {budget:g}s budget on {label}",
+                    }
+                )
+        mb_per_s = None
+        if texts:
+            mb_per_s = rule_throughput(rule, texts, budget)
+            if mb_per_s is None:
+                issues.append(
+                    {
+                        "level": "error",
+                        "check": "throughput",
+                        "message": f"ran past the {budget:g}s budget on a sample file",
+                    }
+                )
+            elif mb_per_s < min_mb_per_s:
+                issues.append(
+                    {
+                        "level": "warning",
+                        "check": "throughput",
+                        "message": f"{mb_per_s:.2f} MB/s on the sample corpus "
+                        f"(below {min_mb_per_s:g})",
+                    }
+                )
+        report.append(
+            {
+                "code": rule.code,
+                "issues": issues,
+                "stress_ms": stress_ms,
+                "mb_per_s": mb_per_s,
+            }
+        )
+    levels = [i["level"] for r in report for i in r["issues"]]
+    return {
+        "rules": report,
+        "errors": levels.count("error"),
+        "warnings": levels.count("warning"),
+        "stress": can_stress,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable lint report."""
+    lines = []
+    for r in report["rules"]:
+        figures = []
+        if r["stress_ms"] is not None:
+            figures.append(f"stress {r['stress_ms']:.1f} ms")
+        if r["mb_per_s"] is not None:
+            figures.append(f"{r['mb_per_s']:.1f} MB/s")
+        levels = {i["level"] for i in r["issues"]}
+        status = "error" if "error" in levels else "warning" if levels else "ok"
+        lines.append(f"{r['code']:<12} {status:<8} {', '.join(figures)}".rstrip())
+        for issue in r["issues"]:
+            lines.append(f"  {issue['level']}: [{issue['check']}] {issue['message']}")
+    if not report["stress"]:
+        lines.append("note: stress runs skipped (no SIGALRM timer on this platform)")
+    lines.append(
+        f"{len(report['rules'])} rules, {report['errors']} errors, "
+        f"{report['warnings']} warnings"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Combine the reports of a sharded scan (rag-scan --shard INDEX/COUNT) into
+one, as if a single machine had scanned everything.
+
+Shard outputs may be JSON arrays or NDJSON, in any mix. Findings are put in
+the order a single-node scan writes them (scanner.walk_order), whatever the
+order of the inputs, so the merged report is deterministic and diffable.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from .scanner import walk_order
+
+Finding = Dict[str, Any]
+
+
+def read_report(path: str) -> Iterator[Finding]:
+    """
+    Yield the findings of a JSON (array) or NDJSON report file. Raises
+    ValueError, naming the file (and line for NDJSON), on malformed input.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        head = fh.read(1)
+        while head.isspace():
+            head = fh.read(1)
+        if not head:
+            return
+        if head == "[":
+            try:
+                items = json.loads(head + fh.read())
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: invalid JSON report: {e}") from None
+            lines: List[Tuple[int, Any]] = [(0, item) for item in items]
+        else:
+            fh.seek(0)
+            lines = []
+            for n, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    lines.append((n, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{n}: invalid NDJSON line: {e}") from None
+    for n, f in lines:
+        if not isinstance(f, dict) or not isinstance(f.get("doc_id"), str):
+            where = f"{path}:{n}" if n else path
+            raise ValueError(f"{where}: not a finding (object with a doc_id)")
+        yield f
+
+
+def merge_reports(paths: Sequence[str]) -> Tuple[List[Finding], List[str]]:
+    """
+    Read every report in 'paths' and return (findings, overlaps): all
+    findings in single-node scan order, and the doc_ids that appear in more
+    than one report (shards should be disjoint; overlapping ones are kept,
+    in the order of 'paths').
+    """
+    findings: List[Finding] = []
+    seen: Counter[str] = Counter()
+    for path in paths:
+        docs = set()
+        for f in read_report(path):
+            findings.append(f)
+            docs.add(f["doc_id"])
+        seen.update(docs)
+    # Stable: findings of one document keep their in-report order
+    findings.sort(key=lambda f: walk_order(f["doc_id"]))
+    overlaps = sorted(d for d, n in seen.items() if n > 1)
+    return findings, overlaps
@@ -8,8 +8,10 @@ Pattern / rule definitions for the RAG hygiene scanner.
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Pattern
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Pattern, Tuple
+
+from .engine import RuleEngine
 
 # Severity helpers
 ALLOWED_SEVERITIES = {"low", "med", "high"}
@@ -36,6 +38,9 @@ class Rule:
     desc: str
     pattern: Pattern
     severity: str  # "low" | "med" | "high"
+    # Plain-text strings, at least one of which must occur for the rule to
+    # match. Empty means "derive from the pattern" (see engine.required_literal).
+    literals: Tuple[str, ...] = ()
 
 
 # Core indirect-injection indicators
@@ -106,9 +111,11 @@ def _compose_default_rules() -> List[Rule]:
     return [*INJECTION_RULES, *HTML_RULES, *PII_SECRET_RULES]
 
 
-def load_rules_from_config(cfg: Dict[str, Any] | None) -> List[Rule]:
+def load_rules_from_config(cfg: Dict[str, Any] | None) -> RuleEngine:
     """
     Build the active ruleset from defaults and an optional config dict.
+    Returns a RuleEngine (an ordered, read-only sequence of Rule objects
+    compiled for single-pass scanning).
     Supported config keys:
       - disable: [ "CODE1", "CODE2" ]
       - severity_overrides: { "CODE": "low|med|high" }
@@ -118,10 +125,18 @@ def load_rules_from_config(cfg: Dict[str, Any] | None) -> List[Rule]:
             pattern: "\\bcomply with the note below\\b"
             severity: "med"
             ignore_case: true
+            literals: ["comply"]   # optional; at least one must occur
+    A compiled ruleset artifact (see ruleset.py) is loaded as-is.
     """
+    if cfg and cfg.get("format"):
+        from .ruleset import is_ruleset, load_ruleset
+
+        if is_ruleset(cfg):
+            return load_ruleset(cfg)
+
     rules = _compose_default_rules()  # start with defaults
     if not cfg:
-        return rules
+        return RuleEngine(rules)
 
     # 1) disable by code
     disabled = set(cfg.get("disable", []))
@@ -136,7 +151,7 @@ def load_rules_from_config(cfg: Dict[str, Any] | None) -> List[Rule]:
             if r.code in sev_over:
                 new_sev = sev_over[r.code].lower()
                 severity_rank(new_sev)  # validate (raises if invalid)
-                new_rules.append(Rule(r.code, r.desc, r.pattern, new_sev))
+                new_rules.append(replace(r, severity=new_sev))
             else:
                 new_rules.append(r)
         rules = new_rules
@@ -154,6 +169,9 @@ def load_rules_from_config(cfg: Dict[str, Any] | None) -> List[Rule]:
         severity_rank(sev)  # validate
         ignore_case = bool(item.get("ignore_case", True))
         compiled = compile_re(pat, ignore_case)
-        by_code[code] = Rule(code, desc, compiled, sev)
+        literals = item.get("literals") or ()
+        if isinstance(literals, str):
+            literals = (literals,)
+        by_code[code] = Rule(code, desc, compiled, sev, tuple(map(str, literals)))
 
-    return list(by_code.values())
+    return RuleEngine(by_code.values())
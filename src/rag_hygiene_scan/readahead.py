@@ -0,0 +1,196 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Read files ahead of the scanner on a few threads, so that upcoming files
+are fetched from disk (or a network filesystem) while the current one is
+being scanned.
+
+read_ahead() keeps at most 'depth' files queued ahead of the consumer and
+at most 'max_bytes' of their content held at once, and hands them over in
+input order. Read errors are carried along and raised where the file is
+scanned, so they are reported exactly as without read-ahead.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import queue
+import stat
+import threading
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+READ_THREADS = 4  # at most; fewer when the queue is shallower
+
+T = TypeVar("T")
+
+
+class Prefetched(NamedTuple):
+    """What a reader thread found for one file."""
+
+    st: Optional[os.stat_result]
+    data: Optional[bytes]  # None: left for the scanner to read (e.g. large)
+    read_s: float  # seconds spent reading 'data'
+    error: Optional[Exception]  # raised by stat/read, for the scanner to report
+
+
+class _Done(NamedTuple):
+    """End of the input, or the exception that ended it."""
+
+    error: Optional[BaseException]
+
+
+class _ByteBudget:
+    """
+    Bytes reserved by files read ahead but not yet consumed. Reservations
+    are granted in input order: a later file never takes the room that an
+    earlier one (which the consumer waits for) is waiting for. A file larger
+    than the whole budget is admitted when nothing else is held.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self.turn = 0  # next ticket allowed to reserve
+        self.held: Dict[int, int] = {}
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def reserve(self, ticket: int, n: int) -> bool:
+        """Wait for 'ticket's turn and room for 'n' bytes; False once closed."""
+        with self.cond:
+            if ticket < self.turn:
+                return not self.closed  # already reserved
+            self.cond.wait_for(
+                lambda: self.closed
+                or (
+                    self.turn == ticket
+                    and (self.used == 0 or self.used + n <= self.limit)
+                )
+            )
+            if self.closed:
+                return False
+            self.used += n
+            self.held[ticket] = n
+            self.turn += 1
+            self.cond.notify_all()
+            return True
+
+    def release(self, ticket: int) -> None:
+        with self.cond:
+            self.used -= self.held.pop(ticket, 0)
+            self.cond.notify_all()
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+def _load(
+    f: pathlib.Path,
+    ticket: int,
+    budget: _ByteBudget,
+    max_size: int,
+    skip: Optional[Callable[[pathlib.Path, os.stat_result], bool]],
+) -> Prefetched:
+    st = None
+    try:
+        st = f.stat()
+        wanted = (
+            stat.S_ISREG(st.st_mode)  # never block on a FIFO or device
+            and st.st_size <= max_size
+            and not (skip is not None and skip(f, st))
+        )
+        if not budget.reserve(ticket, st.st_size if wanted else 0) or not wanted:
+            return Prefetched(st, None, 0.0, None)
+        t0 = time.perf_counter()
+        data = f.read_bytes()
+        return Prefetched(st, data, time.perf_counter() - t0, None)
+    except Exception as e:
+        budget.reserve(ticket, 0)  # let later files have their turn
+        return Prefetched(st, None, 0.0, e)
+
+
+def read_ahead(
+    items: Iterable[T],
+    wanted: Callable[[T], bool],
+    max_size: int,
+    depth: int,
+    max_bytes: int,
+    skip: Optional[Callable[[pathlib.Path, os.stat_result], bool]] = None,
+) -> Iterator[Tuple[T, Optional[Prefetched]]]:
+    """
+    Yield (item, Prefetched) for each of 'items' in order. Items for which
+    'wanted' is true must be pathlib.Path files; they are stat'ed and, up to
+    'max_size' bytes and unless 'skip(path, st)' says otherwise, read by a
+    thread pool while earlier items are consumed. Other items come back with
+    None. A file's bytes count against 'max_bytes' until the consumer asks
+    for the next item.
+
+    'items' is iterated on a feeder thread, so a slow producer (a directory
+    walk, a file list on a pipe) never holds back files that are ready.
+    Closing the generator stops the readers; a feeder still waiting for its
+    next item is left to finish on its own.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    budget = _ByteBudget(max_bytes)
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(depth, READ_THREADS)),
+        thread_name_prefix="rag-scan-read",
+    )
+    ready: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+
+    def feed() -> None:
+        tickets = 0
+        try:
+            for item in items:
+                ticket, fut = -1, None
+                if wanted(item):
+                    ticket, tickets = tickets, tickets + 1
+                    fut = pool.submit(_load, item, ticket, budget, max_size, skip)
+                ready.put((item, ticket, fut))  # blocks while 'depth' are queued
+                if stop.is_set():
+                    return
+        except BaseException as e:  # handed to the consumer
+            if not stop.is_set():
+                ready.put(_Done(e))
+        else:
+            ready.put(_Done(None))
+
+    feeder = threading.Thread(target=feed, name="rag-scan-feed", daemon=True)
+    feeder.start()
+    try:
+        while True:
+            entry = ready.get()
+            if isinstance(entry, _Done):
+                if entry.error is not None:
+                    raise entry.error
+                return
+            item, ticket, fut = entry
+            try:
+                yield item, (fut.result() if fut is not None else None)
+            finally:
+                budget.release(ticket)
+    finally:
+        stop.set()
+        budget.close()
+        while True:  # unblock a feeder waiting for room in the queue
+            try:
+                ready.get_nowait()
+            except queue.Empty:
+                break
+        pool.shutdown(wait=True, cancel_futures=True)
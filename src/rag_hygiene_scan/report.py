@@ -2,27 +2,71 @@
 # Copyright (c) 2025 Robert Schneider
 
 """
-Report writers (JSON/CSV). Writing logic is already useful even with empty results.
+Report writers (JSON/NDJSON/CSV). Writing logic is already useful even with empty results.
+
+Every writer accepts any iterable of findings and writes them one at a time,
+so a generator from scanner.iter_findings() never has to be materialized.
 """
 
 from __future__ import annotations
 
 import csv
 import json
-from typing import Any, Dict, List, TextIO
+from typing import Any, Callable, Dict, Iterable, Sequence, TextIO
+
+CSV_FIELDS = [
+    "doc_id",
+    "code",
+    "severity",
+    "desc",
+    "evidence",
+    "line",
+    "col",
+    "offset",
+]
+
+
+def to_json(findings: Iterable[Dict[str, Any]], fp: TextIO) -> None:
+    # Pretty, deterministic key order isn’t required, but nice for diffs.
+    # Output is byte-identical to json.dump(list(findings), fp, indent=2).
+    first = True
+    for f in findings:
+        item = json.dumps(f, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        fp.write(("[\n  " if first else ",\n  ") + item)
+        first = False
+    fp.write("[]" if first else "\n]")
 
 
-def to_json(findings: List[Dict[str, Any]], fp: TextIO) -> None:
-    # Pretty, deterministic key order isn’t required, but nice for diffs
-    json.dump(findings, fp, indent=2, ensure_ascii=False)
+def to_ndjson(findings: Iterable[Dict[str, Any]], fp: TextIO) -> None:
+    """One compact JSON object per line."""
+    for f in findings:
+        fp.write(json.dumps(f, ensure_ascii=False))
+        fp.write("\n")
 
 
-def to_csv(findings: List[Dict[str, Any]], fp: TextIO) -> None:
+def to_csv(
+    findings: Iterable[Dict[str, Any]],
+    fp: TextIO,
+    fieldnames: Sequence[str] = CSV_FIELDS,
+) -> None:
+    """List values (aggregate 'samples') are written as JSON arrays."""
     w = csv.DictWriter(
         fp,
-        fieldnames=["doc_id", "code", "severity", "desc", "evidence"],
+        fieldnames=fieldnames,
         lineterminator="\n",
     )
     w.writeheader()
     for f in findings:
-        w.writerow(f)
+        w.writerow(
+            {
+                k: json.dumps(v, ensure_ascii=False) if isinstance(v, list) else v
+                for k, v in f.items()
+            }
+        )
+
+
+WRITERS: Dict[str, Callable[[Iterable[Dict[str, Any]], TextIO], None]] = {
+    "json": to_json,
+    "ndjson": to_ndjson,
+    "csv": to_csv,
+}
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Compiled ruleset artifacts (`rag-scan compile-rules`).
+
+An artifact is a JSON file holding the fully resolved ruleset (defaults with
+disables, severity overrides and custom rules applied) together with the
+engine's pattern analysis. Loading one skips YAML parsing, config validation
+and pattern analysis; only the regexes themselves are compiled. Pass it
+wherever a config is accepted (`-c rules.json`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Dict
+
+from . import __version__
+from .engine import RuleEngine
+from .patterns import Rule, load_rules_from_config, severity_rank
+
+ARTIFACT_FORMAT = "rag-scan-ruleset"
+ARTIFACT_VERSION = 1
+
+
+def is_ruleset(cfg: Any) -> bool:
+    return isinstance(cfg, dict) and cfg.get("format") == ARTIFACT_FORMAT
+
+
+def compile_ruleset(cfg: Dict[str, Any] | None) -> Dict[str, Any]:
+    """
+    Resolve and validate 'cfg' (as load_rules_from_config() does, so invalid
+    severities or regexes raise here) and return the artifact as a dict.
+    """
+    engine = load_rules_from_config(cfg)
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "tool_version": __version__,
+        "fingerprint": engine.fingerprint(),
+        "rules": [
+            {
+                "code": r.code,
+                "desc": r.desc,
+                "severity": r.severity,
+                "pattern": r.pattern.pattern,
+                "flags": r.pattern.flags,
+                "literals": list(r.literals),
+                "mergeable": mergeable,
+                "required_literal": literal,
+            }
+            for r, (mergeable, literal) in zip(engine, engine.analysis)
+        ],
+    }
+
+
+def write_ruleset(path: str | os.PathLike, cfg: Dict[str, Any] | None) -> RuleEngine:
+    """Compile 'cfg' into an artifact at 'path'; returns the loaded engine."""
+    artifact = compile_ruleset(cfg)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(artifact, fh, ensure_ascii=False, indent=1)
+        fh.write("\n")
+    return load_ruleset(artifact)
+
+
+def load_ruleset(artifact: Dict[str, Any]) -> RuleEngine:
+    """Build a RuleEngine from an artifact dict; raises ValueError if invalid."""
+    if not is_ruleset(artifact):
+        raise ValueError("not a rag-scan ruleset artifact")
+    if artifact.get("version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"ruleset artifact version {artifact.get('version')!r} is not supported "
+            f"(expected {ARTIFACT_VERSION}); re-run rag-scan compile-rules"
+        )
+    rules = []
+    analysis = []
+    for item in artifact["rules"]:
+        severity_rank(item["severity"])
+        rules.append(
+            Rule(
+                item["code"],
+                item["desc"],
+                # flags as stored include re.UNICODE, which re.compile accepts
+                re.compile(item["pattern"], item["flags"]),
+                item["severity"],
+                tuple(item["literals"]),
+            )
+        )
+        analysis.append((item["mergeable"], item["required_literal"]))
+    engine = RuleEngine(rules, analysis)
+    if engine.fingerprint() != artifact.get("fingerprint"):
+        raise ValueError("ruleset artifact fingerprint mismatch (file edited?)")
+    return engine
@@ -7,12 +7,68 @@ Core scanning functions
 
 from __future__ import annotations
 
+import bisect
+import hashlib
+import io
+import json
+import mmap
+import os
 import pathlib
-from typing import Any, Dict, Iterable, List, Tuple, TypedDict
-
-import yaml
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from functools import lru_cache, partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    TypedDict,
+)
 
+from .archive import MEMBER_SEP, Member, archive_kind, iter_members
+from .cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES
+from .cache import ContentMemo, ScanCache, prune_cache
+from .engine import RuleEngine
+from .ignore import (
+    IGNORE_FILES,
+    IgnoreChain,
+    ancestor_chain,
+    is_ignored,
+    load_ignore_patterns,
+)
+from .jsonl import DOC_ID_RE, JSONL_EXTS, JsonlSlice, iter_records, jsonl_slices
 from .patterns import load_rules_from_config, severity_rank
+from .stats import ScanStats, timed
+from .store import (
+    DEFAULT_SAMPLES,
+    FindingStore,
+    aggregate_findings,
+    cap_findings,
+    start_group,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .gitdiff import LineRanges
+    from .readahead import Prefetched
+
+# yaml, multiprocessing and concurrent.futures are imported where used: they
+# dominate startup for short runs that need neither (see benchmarks startup).
 
 
 # ---------------- Types ----------------
@@ -22,17 +78,63 @@ class Finding(TypedDict):
     severity: str
     desc: str
     evidence: str
+    line: Optional[int]  # 1-based; None for file-level findings (READERR)
+    col: Optional[int]  # 1-based, in characters
+    offset: Optional[int]  # character offset of the match start
+
+
+# One file or directory, or several: any iterable of paths, consumed lazily
+# (e.g. read_file_list(sys.stdin.buffer))
+Paths = str | os.PathLike | Iterable[str]
 
 
 class ScanResult(TypedDict):
     files_scanned: int
-    findings: List[Finding]
+    # documents not scanned because an identical one was (ScanOptions.dedup);
+    # with jobs > 1 it depends on how files were split between the workers
+    duplicates: int
+    # a FindingStore with compact=True; FindingGroups with aggregate=True
+    findings: Sequence[Finding]
 
 
 # ---------------- Config ----------------
 ALLOWED_EXTS = {".md", ".markdown", ".txt", ".html", ".htm"}
-SKIP_DIRS = {".git", ".venv", "__pycache__", ".mypy_cache", ".pytest_cache"}
+SKIP_DIRS = {
+    ".git",
+    ".venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    "node_modules",
+}
 MAX_SNIPPET_LEN = 200
+SNIPPET_CTX = 40
+# Files larger than this are scanned in chunks of this many characters
+CHUNK_SIZE = 8 * 1024 * 1024
+# Characters carried over between chunks; matches longer than this that
+# straddle a chunk boundary may be truncated. Must be >= MAX_SNIPPET_LEN.
+STREAM_OVERLAP = 4096
+# Leading bytes checked for binary content (sniff_binary)
+SNIFF_BYTES = 8192
+# Share of control bytes in the sniffed block above which a file is binary
+CONTROL_RATIO = 0.3
+_CONTROL_BYTES = bytes(
+    [*range(0x00, 0x09), *range(0x0E, 0x1B), *range(0x1C, 0x20), 0x7F]
+)
+# Bytes that keep an ASCII buffer from being "plain" (see _is_plain)
+_NOT_PLAIN = (b"\r", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+PLAIN_BLOCK = 1024 * 1024
+# CLI default for ScanOptions.rule_timeout (seconds per rule and document)
+DEFAULT_RULE_TIMEOUT = 10.0
+# ScanOptions.read_ahead / read_ahead_bytes defaults: files read ahead of
+# the scanner, and the content they may hold at once
+READ_AHEAD_DEPTH = 16
+READ_AHEAD_BYTES = 64 * 1024 * 1024
+# Read-ahead starts once this many files (or bytes) went by without it, so
+# short runs never pay for its thread pool
+READ_AHEAD_MIN_FILES = 8
+READ_AHEAD_MIN_BYTES = 4 * 1024 * 1024
+LIST_READ_SIZE = 64 * 1024  # read_file_list(): bytes per read from the list
 
 
 def should_scan_file(p: pathlib.Path) -> bool:
@@ -41,120 +143,1822 @@ def should_scan_file(p: pathlib.Path) -> bool:
 
 
 # ---------------- File walking ----------------
-def iter_files(path: pathlib.Path) -> Iterable[pathlib.Path]:
+def iter_files(
+    path: pathlib.Path,
+    ignore_files: Sequence[str] = IGNORE_FILES,
+    archives: bool = False,
+    exts: AbstractSet[str] = ALLOWED_EXTS,
+) -> Iterable[pathlib.Path]:
     """
     Yield files to scan:
       - If 'path' is a file, yield it when extension is allowed
       - If 'path' is a directory, recurse and yield allowed files
-    Hidden/tooling dirs are ignored in practice by checking names, but
-    rglob() cannot be pruned; we simply skip matches.
+    Directories named in SKIP_DIRS are pruned without being entered, and
+    paths matched by the ignore files ('ignore_files', found in each
+    directory and in parent directories up to the git work tree root) are
+    skipped. Entries are visited in sorted order; directory symlinks are
+    not followed. With 'archives', zip/tar/gz files are yielded as well
+    (their members are filtered when scanned, see archive.py). 'exts' are
+    the extensions of files to yield (e.g. jsonl.JSONL_EXTS for dumps).
     """
     if path.is_file():
-        if should_scan_file(path):
+        if path.suffix.lower() in exts or (archives and archive_kind(path.name)):
             yield path
         return
 
-    for f in path.rglob("*"):
+    root_abs = os.path.abspath(path)
+    base_chain: IgnoreChain = (
+        ancestor_chain(root_abs, ignore_files) if ignore_files else ()
+    )
+    stack: List[Tuple[pathlib.Path, str, IgnoreChain]] = [(path, root_abs, base_chain)]
+    while stack:
+        dir_path, dir_abs, chain = stack.pop()
         try:
-            if f.is_dir():
-                # Can't prune rglob, but we can skip by name
-                if f.name in SKIP_DIRS:
+            with os.scandir(dir_abs) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            # Ignore unreadable directories quietly
+            continue
+        if ignore_files:
+            own = load_ignore_patterns(dir_abs, ignore_files)
+            if own:
+                chain = chain + ((dir_abs, tuple(own)),)
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if name in SKIP_DIRS:
+                        continue
+                    if chain and is_ignored(chain, entry.path, True):
+                        continue
+                    subdirs.append((dir_path / name, entry.path, chain))
                     continue
+                # Cheap name filter before anything that may need a stat()
+                if os.path.splitext(name)[1].lower() not in exts:
+                    if not (archives and archive_kind(name)):
+                        continue
+                if chain and is_ignored(chain, entry.path, False):
+                    continue
+                if entry.is_file():
+                    yield dir_path / name
+            except OSError:
                 continue
-            if should_scan_file(f):
-                yield f
-        except PermissionError:
-            # Ignore unreadable entries quietly
+        # LIFO stack: push in reverse so subdirectories are walked in order
+        stack.extend(reversed(subdirs))
+
+
+def select_files(
+    path: pathlib.Path,
+    candidates: Iterable[str],
+    ignore_files: Sequence[str] = IGNORE_FILES,
+    archives: bool = False,
+    exts: AbstractSet[str] = ALLOWED_EXTS,
+) -> Iterator[pathlib.Path]:
+    """
+    The files among 'candidates' (paths as iter_files(path) names them,
+    e.g. from gitdiff.changed_lines) that iter_files() would yield, in the
+    same order, without walking the tree: only their own directories are
+    checked against SKIP_DIRS and the ignore files.
+    """
+    wanted = set(candidates)
+    if path.is_file():
+        files = iter_files(path, ignore_files, archives, exts)
+        yield from (f for f in files if f.as_posix() in wanted)
+        return
+    root = path.as_posix()
+    root_abs = os.path.abspath(path)
+    chains: Dict[str, IgnoreChain | None] = {}
+
+    def chain_for(dir_abs: str, parent: IgnoreChain | None) -> IgnoreChain | None:
+        # None: the directory is pruned (SKIP_DIRS or ignored)
+        if dir_abs not in chains:
+            if parent is None:
+                chain: IgnoreChain | None = None
+            else:
+                chain = parent
+                own = (
+                    load_ignore_patterns(dir_abs, ignore_files) if ignore_files else []
+                )
+                if own:
+                    chain = chain + ((dir_abs, tuple(own)),)
+            chains[dir_abs] = chain
+        return chains[dir_abs]
+
+    base = ancestor_chain(root_abs, ignore_files) if ignore_files else ()
+    prefix = "" if root == "." else root.rstrip("/") + "/"
+    for doc in sorted(wanted, key=walk_order):
+        if not doc.startswith(prefix):
             continue
+        *dirs, name = doc[len(prefix) :].split("/")
+        chain = chain_for(root_abs, base)
+        dir_abs = root_abs
+        for d in dirs:
+            sub = os.path.join(dir_abs, d)
+            if chain is not None and sub not in chains:
+                if d in SKIP_DIRS or os.path.islink(sub):
+                    chains[sub] = None
+                elif chain and is_ignored(chain, sub, True):
+                    chains[sub] = None
+            chain = chain_for(sub, chain)
+            dir_abs = sub
+        if chain is None:
+            continue
+        if os.path.splitext(name)[1].lower() not in exts:
+            if not (archives and archive_kind(name)):
+                continue
+        f_abs = os.path.join(dir_abs, name)
+        if chain and is_ignored(chain, f_abs, False):
+            continue
+        if os.path.isfile(f_abs):
+            yield path / doc[len(prefix) :]
+
+
+def read_file_list(fh: io.BufferedIOBase) -> Iterator[str]:
+    """
+    Yield the paths listed in the binary stream 'fh' (e.g. from
+    `git ls-files -z` or a manifest) as they arrive, without waiting for
+    the end of the input. Entries are separated by NUL or by newlines,
+    whichever occurs first; empty entries are skipped.
+    A stream with a file descriptor is read through it directly, so a read
+    waiting for the producer does not hold the stream's lock (the scan may
+    end, and the stream be closed, while the list is still being written).
+    """
+    try:
+        fd = fh.fileno()
+        read = partial(os.read, fd)
+    except (AttributeError, OSError, ValueError):  # io.UnsupportedOperation
+        read = fh.read1
+    sep = None
+    buf = b""
+    while True:
+        chunk = read(LIST_READ_SIZE)  # whatever has arrived, up to the size
+        if not chunk:
+            break
+        buf += chunk
+        if sep is None:
+            nul, nl = buf.find(b"\0"), buf.find(b"\n")
+            if nul < 0 and nl < 0:
+                continue
+            sep = b"\0" if nl < 0 or 0 <= nul < nl else b"\n"
+        *names, buf = buf.split(sep)
+        for name in names:
+            if sep == b"\n":
+                name = name.rstrip(b"\r")
+            if name:
+                yield os.fsdecode(name)
+    if sep != b"\0":
+        buf = buf.rstrip(b"\r\n")
+    if buf:
+        yield os.fsdecode(buf)
+
+
+# ---------------- Sharding ----------------
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse "INDEX/COUNT" (1-based, e.g. "2/8") into (index, count)."""
+    index, sep, count = spec.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not sep or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(
+            f"shard must be INDEX/COUNT with 1 <= INDEX <= COUNT: {spec!r}"
+        )
+    return shard
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """
+    1-based shard of a file, from a hash of its path relative to the scan
+    root. Unlike hash() it is the same on every machine, checkout location
+    and Python version, so CI nodes agree on the split without talking.
+    """
+    digest = hashlib.sha1(rel_path.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def shard_files(
+    files: Iterable[pathlib.Path], root: pathlib.Path, shard: Tuple[int, int]
+) -> Iterator[pathlib.Path]:
+    """
+    Keep the files of 'files' (from iter_files(root)) that fall in 'shard'.
+    A file given as the root itself (e.g. one entry of --files-from) is
+    hashed by its path as given.
+    """
+    index, count = shard
+    for f in files:
+        rel = f.as_posix() if f == root else f.relative_to(root).as_posix()
+        if shard_of(rel, count) == index:
+            yield f
+
+
+def walk_order(doc_id: str) -> Tuple[Tuple[int, str], ...]:
+    """
+    Sort key putting doc_ids in the order iter_files() yields them: by name
+    within a directory, files before subdirectories. Archive members share
+    their archive's key (a stable sort keeps their in-archive order), and
+    JSONL records sort by line within their file.
+    """
+    record = DOC_ID_RE.match(doc_id)
+    if record:
+        return walk_order(record[1]) + ((int(record[2]), ""),)
+    parts = doc_id.split(MEMBER_SEP, 1)[0].split("/")
+    return tuple((1, d) for d in parts[:-1]) + ((0, parts[-1]),)
 
 
 # ---------------- Config loader ----------------
 def load_config(cfg_path: str | None) -> Dict[str, Any] | None:
-    """Load YAML into a dict, or return None if no path provided."""
+    """
+    Load YAML into a dict, or return None if no path provided. A ".json"
+    path is read as JSON, e.g. a ruleset artifact from compile-rules.
+    """
     if not cfg_path:
         return None
     with open(cfg_path, "r", encoding="utf-8") as fh:
+        if cfg_path.lower().endswith(".json"):
+            return json.load(fh)
+        import yaml
+
         return yaml.safe_load(fh)
 
 
 # ---------------- Text scanning ----------------
-def _make_snippet(text: str, span: Tuple[int, int], ctx: int = 40) -> str:
-    """Return a short, single-line context snippet around a match."""
+class LineIndex:
+    """
+    Newline offsets of one document, built once, so each match offset maps
+    to a (line, col) pair with a binary search instead of a rescan.
+    """
+
+    __slots__ = ("_nl",)
+
+    def __init__(self, text: str) -> None:
+        nl: List[int] = []
+        i = text.find("\n")
+        while i != -1:
+            nl.append(i)
+            i = text.find("\n", i + 1)
+        self._nl = nl
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, col) of the character at 'offset'."""
+        i = bisect.bisect_left(self._nl, offset)
+        line_start = self._nl[i - 1] + 1 if i else 0
+        return i + 1, offset - line_start + 1
+
+
+def _line_cols(buf, offsets: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    1-based (line, col) for each offset into a plain byte buffer, counting
+    newlines block by block: unlike LineIndex, memory does not grow with
+    the number of lines, which matters for mmapped files.
+    """
+    out: Dict[int, Tuple[int, int]] = {}
+    line, pos = 1, 0
+    for off in sorted(set(offsets)):
+        while pos < off:
+            end = min(off, pos + PLAIN_BLOCK)
+            line += buf[pos:end].count(b"\n")
+            pos = end
+        out[off] = line, off - (buf.rfind(b"\n", 0, off) + 1) + 1
+    return out
+
+
+def _make_snippet(text, span: Tuple[int, int], ctx: int = SNIPPET_CTX) -> str:
+    """
+    Return a short, single-line context snippet around a match. 'text' may
+    also be a plain byte buffer; only the snippet is decoded then.
+    """
     s, e = span
     start = max(s - ctx, 0)
     end = min(e + ctx, len(text))
-    snippet = text[start:end].replace("\n", " ")
-    return snippet[:MAX_SNIPPET_LEN]
+    snippet = text[start:end]
+    if not isinstance(snippet, str):
+        snippet = snippet.decode("ascii")
+    return snippet.replace("\n", " ")[:MAX_SNIPPET_LEN]
+
+
+class _Keep(NamedTuple):
+    """
+    What _postprocess() keeps of each rule's findings in one document,
+    applied in the match loop instead: the first 'limit' (max_per_rule),
+    or one FindingGroup with 'limit' samples that counts the rest
+    (aggregate). Hits past the limit get no position and no snippet.
+    """
+
+    limit: int
+    fold: bool
+
+    def located(self, n: int) -> bool:
+        """Whether the n-th hit (1-based) of a rule needs its line/col."""
+        return n == 1 if self.fold else n <= self.limit
+
+
+def _keep(max_per_rule: int | None, aggregate: bool, samples: int) -> _Keep | None:
+    if aggregate:
+        return _Keep(samples, True)
+    if max_per_rule is not None:
+        return _Keep(max_per_rule, False)
+    return None
+
+
+def _kept(pairs: List[Tuple[Any, Any]], keep: _Keep | None) -> Iterator[int]:
+    """Start offsets of the (rule, match) pairs _findings() locates."""
+    code, n = None, 0
+    for r, m in pairs:
+        n = n + 1 if r.code == code else 1
+        code = r.code
+        if keep is None or keep.located(n):
+            yield m.start()
+
+
+def _findings(
+    pairs: List[Tuple[Any, Any]],
+    text,
+    doc_id: str,
+    locate: Any,
+    evidence: bool,
+    keep: _Keep | None = None,
+) -> List[Any]:
+    """
+    Findings for (rule, match) pairs ordered by rule; with 'keep', capped
+    or folded into FindingGroups per rule as it says.
+    """
+    findings: List[Any] = []
+    code, n = None, 0
+    for r, m in pairs:
+        start = m.start()
+        n = n + 1 if r.code == code else 1
+        code = r.code
+        if keep is not None and not keep.located(n):
+            if keep.fold:
+                g = findings[-1]
+                g["count"] += 1
+                g["last_offset"] = start
+                if n <= keep.limit:
+                    sample = _make_snippet(text, m.span()) if evidence else ""
+                    g["samples"].append(sample)
+            continue
+        line, col = locate(start)
+        snippet = evidence and (keep is None or n <= keep.limit)
+        f = Finding(
+            doc_id=doc_id,
+            code=r.code,
+            severity=r.severity,
+            desc=r.desc,
+            evidence=_make_snippet(text, m.span()) if snippet else "",
+            line=line,
+            col=col,
+            offset=start,
+        )
+        findings.append(start_group(f, keep.limit) if keep and keep.fold else f)
+    return findings
+
+
+RULETIMEOUT = "RULETIMEOUT"
+
 
+def _rule_timeouts(doc_id: str, rules: Iterable[Any], seconds: float) -> List[Finding]:
+    return [
+        Finding(
+            doc_id=doc_id,
+            code=RULETIMEOUT,
+            severity="low",
+            desc=f"rule {r.code} abandoned after {seconds:g}s on this document "
+            "(catastrophic backtracking?); see rag-scan lint-rules",
+            evidence="",
+            line=None,
+            col=None,
+            offset=None,
+        )
+        for r in rules
+    ]
 
-def scan_text(text: str, doc_id: str, rules) -> List[Finding]:
+
+def scan_text(
+    text: str,
+    doc_id: str,
+    rules,
+    stats: ScanStats | None = None,
+    *,
+    evidence: bool = True,
+    rule_timeout: float | None = None,
+    max_per_rule: int | None = None,
+    aggregate: bool = False,
+    samples: int = DEFAULT_SAMPLES,
+) -> List[Finding]:
     """
     Apply compiled rules to a single text and return finding dicts.
-    Finding schema: { doc_id, code, severity, desc, evidence }
+    'rules' is a RuleEngine or any iterable of Rule objects.
+    With 'stats', each rule is run and timed on its own (same findings).
+    With evidence=False no snippets are built and 'evidence' is "".
+    'max_per_rule' keeps the first N findings of each rule, and aggregate
+    returns one store.FindingGroup per rule with 'samples' snippets, as
+    cap_findings()/aggregate_findings() would; matches past those are
+    counted without building a finding or snippet for them.
+    With 'rule_timeout', a rule still searching after that many seconds
+    is abandoned and reported as a RULETIMEOUT finding (after the others).
+    Finding schema: { doc_id, code, severity, desc, evidence, line, col, offset }
     """
-    findings: List[Finding] = []
-    for r in rules:
-        for m in r.pattern.finditer(text):
-            findings.append(
-                Finding(
-                    doc_id=doc_id,
-                    code=r.code,
-                    severity=r.severity,
-                    desc=r.desc,
-                    evidence=_make_snippet(text, m.span()),
-                )
-            )
+    engine = rules if isinstance(rules, RuleEngine) else RuleEngine(rules)
+    record = stats.add_rule if stats is not None else None
+    hits, abandoned = engine.bounded_matches(text, rule_timeout, record=record)
+    findings = []
+    if hits:
+        pairs = [(engine[i], m) for i, m in hits]
+        keep = _keep(max_per_rule, aggregate, samples)
+        locate = LineIndex(text).locate
+        findings = _findings(pairs, text, doc_id, locate, evidence, keep)
+    if abandoned:
+        rules_out = [engine[i] for i in abandoned]
+        findings.extend(_rule_timeouts(doc_id, rules_out, rule_timeout or 0))
+    return findings
+
+
+def _scan_plain(
+    buf,
+    doc_id: str,
+    rules,
+    stats: ScanStats | None = None,
+    *,
+    evidence: bool = True,
+    rule_timeout: float | None = None,
+    chunk_size: int | None = None,
+    max_per_rule: int | None = None,
+    aggregate: bool = False,
+    samples: int = DEFAULT_SAMPLES,
+) -> List[Finding]:
+    """
+    scan_text() for a plain byte buffer (see _is_plain), which may be an
+    mmap: rules run as bytes patterns on the raw bytes and only snippets are
+    decoded. Findings are identical to scan_text() on the decoded text.
+    Rules without a bytes equivalent need the text: with 'chunk_size', a
+    buffer larger than that is fed to them chunk by chunk (scan_stream)
+    instead of being decoded whole.
+    """
+    engine = rules if isinstance(rules, RuleEngine) else RuleEngine(rules)
+    record = stats.add_rule if stats is not None else None
+    keep = _keep(max_per_rule, aggregate, samples)
+    plan = engine.bytes_plan()
+    if len(plan.text) and chunk_size is not None and len(buf) > chunk_size:
+        return _scan_plain_streamed(
+            buf, doc_id, engine, record, evidence, rule_timeout, chunk_size, keep
+        )
+    pairs, abandoned = engine.plain_matches(buf, record, rule_timeout)
+    findings = []
+    if pairs:
+        lines = _line_cols(buf, _kept(pairs, keep))
+        findings = _findings(pairs, buf, doc_id, lines.__getitem__, evidence, keep)
+    if abandoned:
+        findings.extend(_rule_timeouts(doc_id, abandoned, rule_timeout or 0))
+    return findings
+
+
+class _PlainReader:
+    """A plain byte buffer read as text, one slice at a time."""
+
+    def __init__(self, buf) -> None:
+        self.buf, self.pos = buf, 0
+
+    def read(self, size: int) -> str:
+        data = self.buf[self.pos : self.pos + size]
+        self.pos += len(data)
+        return str(data, "ascii")
+
+
+def _scan_plain_streamed(
+    buf,
+    doc_id: str,
+    engine: RuleEngine,
+    record: Any,
+    evidence: bool,
+    rule_timeout: float | None,
+    chunk_size: int,
+    keep: _Keep | None,
+) -> List[Finding]:
+    """
+    _scan_plain() holding at most about 'chunk_size' characters of decoded
+    text: bytes rules run on the buffer, the others on a stream over it.
+    """
+    plan = engine.bytes_plan()
+    found, late = plan.binary.bounded_matches(buf, rule_timeout, record=record)
+    by_rule: Dict[int, List[Tuple[Any, Any]]] = {}
+    for i, m in found:
+        by_rule.setdefault(plan.binary_index[i], []).append((plan.binary[i], m))
+    lines = _line_cols(buf, (o for p in by_rule.values() for o in _kept(p, keep)))
+    out = {
+        i: _findings(pairs, buf, doc_id, lines.__getitem__, evidence, keep)
+        for i, pairs in by_rule.items()
+    }
+    more, late_text = _stream_hits(
+        _PlainReader(buf),  # type: ignore[arg-type]
+        doc_id,
+        plan.text,
+        chunk_size,
+        STREAM_OVERLAP,
+        evidence,
+        rule_timeout,
+        keep,
+    )
+    for i, _, f in more:
+        out.setdefault(plan.text_index[i], []).append(f)
+    findings = [f for i in sorted(out) for f in out[i]]
+    abandoned = [plan.binary_index[i] for i in late]
+    abandoned.extend(plan.text_index[i] for i in late_text)
+    if abandoned:
+        rules_out = [engine[i] for i in sorted(abandoned)]
+        findings.extend(_rule_timeouts(doc_id, rules_out, rule_timeout or 0))
     return findings
 
 
+# ---------------- Stream scanning ----------------
+def scan_stream(
+    fh: TextIO,
+    doc_id: str,
+    rules,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = STREAM_OVERLAP,
+    *,
+    evidence: bool = True,
+    rule_timeout: float | None = None,
+    max_per_rule: int | None = None,
+    aggregate: bool = False,
+    samples: int = DEFAULT_SAMPLES,
+) -> List[Finding]:
+    """
+    Scan a text stream chunk by chunk, holding at most about
+    chunk_size + overlap characters. Returns the same findings, in the same
+    order, as scan_text() on the whole content.
+
+    Each rule resumes where its own finditer would have: matches that start
+    in the last 'overlap' characters of the buffer, or that run into its end,
+    are left for the next round, and the characters before the resume point
+    are kept for \b checks and snippet context. Line numbers are carried
+    across the text dropped from the front of the buffer.
+
+    'rule_timeout' applies per rule and buffer; an abandoned rule keeps the
+    findings it had and is not run on the rest of the stream.
+    'max_per_rule', 'aggregate' and 'samples' work as for scan_text().
+    """
+    engine = rules if isinstance(rules, RuleEngine) else RuleEngine(rules)
+    hits, abandoned = _stream_hits(
+        fh,
+        doc_id,
+        engine,
+        chunk_size,
+        overlap,
+        evidence,
+        rule_timeout,
+        _keep(max_per_rule, aggregate, samples),
+    )
+    findings = [f for _, _, f in hits]
+    if abandoned:
+        rules_out = [engine[i] for i in abandoned]
+        findings.extend(_rule_timeouts(doc_id, rules_out, rule_timeout or 0))
+    return findings
+
+
+def _stream_hits(
+    fh: TextIO,
+    doc_id: str,
+    engine: RuleEngine,
+    chunk_size: int,
+    overlap: int,
+    evidence: bool,
+    rule_timeout: float | None,
+    per_rule: _Keep | None = None,
+) -> Tuple[List[Tuple[int, int, Any]], List[int]]:
+    """
+    scan_stream() before its findings are put together: (rule index,
+    offset, finding) triples sorted by rule and offset, and the indexes of
+    abandoned rules. With 'per_rule', findings are capped or folded per rule.
+    """
+    nxt = [0] * len(engine)  # absolute offset each rule resumes from
+    seen = [0] * len(engine)  # hits per rule so far
+    groups: Dict[int, Any] = {}  # rule index -> its FindingGroup, when folding
+    hits: List[Tuple[int, int, Any]] = []
+    abandoned: List[int] = []
+    buf, base, eof = "", 0, False
+    lines_before, line_start = 0, 0  # newlines before 'base'; current line start
+
+    while not eof:
+        chunk = fh.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+        end = base + len(buf)
+        limit = end if eof else end - overlap
+        if limit <= min(nxt, default=limit):
+            continue  # not enough lookahead yet
+
+        starts = [max(p - base, 0) for p in nxt]
+        held = set()
+        index: LineIndex | None = None
+        found, late = engine.bounded_matches(buf, rule_timeout, starts)
+        for i in late:
+            abandoned.append(i)
+            nxt[i] = sys.maxsize  # resumes past any input: never runs again
+        for i, m in found:
+            if i in held:
+                continue
+            s, e = base + m.start(), base + m.end()
+            truncated = not eof and e >= end and s >= limit - chunk_size
+            if s >= limit or truncated:
+                held.add(i)
+                nxt[i] = s
+                continue
+            nxt[i] = e if e > s else e + 1
+            seen[i] += 1
+            n = seen[i]
+            if per_rule is not None and not per_rule.located(n):
+                if per_rule.fold:
+                    g = groups[i]
+                    g["count"] += 1
+                    g["last_offset"] = s
+                    if n <= per_rule.limit:
+                        sample = _make_snippet(buf, m.span()) if evidence else ""
+                        g["samples"].append(sample)
+                continue
+            r = engine[i]
+            if index is None:
+                index = LineIndex(buf)
+            line, col = index.locate(m.start())
+            if line == 1:
+                col = s - line_start + 1
+            snippet = evidence and (per_rule is None or n <= per_rule.limit)
+            f = Finding(
+                doc_id=doc_id,
+                code=r.code,
+                severity=r.severity,
+                desc=r.desc,
+                evidence=_make_snippet(buf, m.span()) if snippet else "",
+                line=lines_before + line,
+                col=col,
+                offset=s,
+            )
+            if per_rule is not None and per_rule.fold:
+                groups[i] = start_group(f, per_rule.limit)
+                hits.append((i, s, groups[i]))
+            else:
+                hits.append((i, s, f))
+        for i in range(len(nxt)):
+            if i not in held:
+                nxt[i] = max(nxt[i], limit)
+
+        keep = max(min(min(nxt, default=limit), limit) - SNIPPET_CTX, base)
+        dropped = buf[: keep - base]
+        nl = dropped.rfind("\n")
+        if nl != -1:
+            lines_before += dropped.count("\n")
+            line_start = base + nl + 1
+        buf = buf[keep - base :]
+        base = keep
+
+    hits.sort(key=lambda h: (h[0], h[1]))
+    return hits, sorted(abandoned)
+
+
 # ---------------- Path scanning ----------------
-def scan_path(path: str, cfg: Dict[str, Any] | None) -> ScanResult:
+BATCH_SIZE = 64  # files per worker task when scanning in parallel
+
+
+def _file_digest(f: pathlib.Path, block: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(f, "rb") as fh:
+        for data in iter(lambda: fh.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
+
+
+def _decode(data: bytes) -> str:
+    """Decode exactly as Path.read_text(encoding="utf-8", errors="ignore")."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore").read()
+
+
+def sniff_binary(head: bytes) -> str | None:
     """
-    Read eligible files from 'path' and scan them with active rules.
-    Returns:
-      { "files_scanned": int, "findings": [Finding, ...] }
+    Why content starting with 'head' (its first SNIFF_BYTES) is not scanned
+    as UTF-8 text, or None if it looks like text: UTF-16/32 byte order
+    marks, NUL bytes, or mostly control bytes.
+    """
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "UTF-16/32 text (only UTF-8 is scanned)"
+    if b"\0" in head:
+        return "binary content (NUL bytes)"
+    control = len(head) - len(head.translate(None, _CONTROL_BYTES))
+    if head and control > len(head) * CONTROL_RATIO:
+        return "binary content (control bytes)"
+    return None
+
+
+def _is_plain(buf) -> bool:
+    """
+    True if 'buf' (bytes or an mmap) is ASCII without \\r or \\x1c-\\x1f:
+    such text decodes 1:1 (no newline translation) and bytes patterns match
+    it exactly like str patterns match the decoded text. Checked in blocks,
+    so an mmap is never copied whole.
+    """
+    for i in range(0, len(buf), PLAIN_BLOCK):
+        block = buf[i : i + PLAIN_BLOCK]
+        if not block.isascii() or any(b in block for b in _NOT_PLAIN):
+            return False
+    return True
+
+
+@dataclass(frozen=True)
+class ScanOptions:
+    """Tuning knobs for scan_path() / iter_findings(); all have safe defaults."""
+
+    jobs: int = 1  # worker processes; <= 1 scans in-process
+    chunk_size: int = CHUNK_SIZE  # larger files are streamed (scan_stream)
+    cache_dir: str | None = None  # persistent findings cache (cache.ScanCache)
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    ignore_files: Sequence[str] = IGNORE_FILES  # empty tuple disables
+    # "low"|"med"|"high": stop after the first file with a finding at or
+    # above this severity (gate mode); None scans everything
+    fail_fast: str | None = None
+    evidence: bool = True  # False: skip snippet building, 'evidence' is ""
+    max_per_rule: int | None = None  # keep at most N findings per rule per file
+    # one store.FindingGroup per (file, rule) instead of one finding per match
+    aggregate: bool = False
+    samples: int = DEFAULT_SAMPLES  # evidence snippets kept per FindingGroup
+    compact: bool = False  # scan_path(): collect into a columnar FindingStore
+    archives: bool = False  # scan members of zip/tar/tar.gz/gz files in place
+    # (index, count), 1-based: scan only the files shard_files() assigns to
+    # shard 'index' of 'count'; None scans everything
+    shard: Tuple[int, int] | None = None
+    # read files as JSONL chunk dumps: every record is a document with
+    # doc_id "<file>:<line>:<id>"; id/text are (dotted) field paths
+    jsonl: bool = False
+    id_field: str = "id"
+    text_field: str = "text"
+    # scan only these files (doc_id paths, see gitdiff.changed_lines), each
+    # mapped to its changed line ranges or None (all lines); None = walk
+    changes: Mapping[str, LineRanges | None] | None = None
+    # with 'changes': keep only findings that start on a changed line
+    changed_lines_only: bool = False
+    # skip binary content (sniff_binary) with a SKIPPED finding; False
+    # decodes every file as before
+    sniff: bool = True
+    # scan byte-identical documents once per run and copy the findings to
+    # the others (cache.ContentMemo); with jobs > 1 each worker dedups alone.
+    # Files above chunk_size take part only with a cache, which hashes them
+    # anyway: otherwise they would be read twice
+    dedup: bool = True
+    # seconds each rule may search one document (one chunk when streamed)
+    # before it is abandoned with a RULETIMEOUT finding; None = no limit
+    rule_timeout: float | None = None
+    # files read by a thread pool ahead of the one being scanned (see
+    # readahead.py), and the content they may hold at once; 0 disables
+    read_ahead: int = READ_AHEAD_DEPTH
+    read_ahead_bytes: int = READ_AHEAD_BYTES
+
+
+def _reduce(opts: ScanOptions) -> Dict[str, Any]:
+    """
+    scan_text() keywords that cap or fold each document's findings while
+    matching, as _postprocess() would after; none when a changed-lines
+    filter must first decide which findings remain.
+    """
+    if opts.changed_lines_only and opts.changes is not None:
+        return {}
+    return {
+        "max_per_rule": opts.max_per_rule,
+        "aggregate": opts.aggregate,
+        "samples": opts.samples,
+    }
+
+
+@lru_cache(maxsize=8)
+def _severity_tiers(engine: RuleEngine) -> Tuple[Tuple[int, RuleEngine], ...]:
+    """Split a ruleset into one engine per severity, most severe first."""
+    by_rank: Dict[int, List[Any]] = {}
+    for r in engine:
+        by_rank.setdefault(severity_rank(r.severity), []).append(r)
+    return tuple(
+        (rank, RuleEngine(rules))
+        for rank, rules in sorted(by_rank.items(), reverse=True)
+    )
+
+
+def _scan_text_fail_fast(
+    text: str | bytes,
+    doc_id: str,
+    engine: RuleEngine,
+    threshold: int,
+    stats: ScanStats | None = None,
+    evidence: bool = True,
+    rule_timeout: float | None = None,
+    **reduce: Any,
+) -> Tuple[List[Finding], bool]:
+    """
+    Scan 'text' one severity tier at a time, most severe first, stopping
+    after the first tier at/above 'threshold' that finds something.
+    Returns (findings in normal rule order, whether every tier ran).
     """
-    p = pathlib.Path(path)
-    rules = load_rules_from_config(cfg)
+    order = {r.code: i for i, r in enumerate(engine)}
     findings: List[Finding] = []
-    files_scanned = 0
+    tiers = _severity_tiers(engine)
+    complete = True
+    scan = scan_text if isinstance(text, str) else _scan_plain
+    for n, (rank, tier) in enumerate(tiers, 1):
+        found = scan(
+            text,
+            doc_id,
+            tier,
+            stats,
+            evidence=evidence,
+            rule_timeout=rule_timeout,
+            **reduce,
+        )
+        findings.extend(found)
+        if rank >= threshold and any(f["code"] != RULETIMEOUT for f in found):
+            complete = n == len(tiers)
+            break
+    findings.sort(key=lambda f: order.get(f["code"], len(order)))
+    return findings, complete
 
-    for f in iter_files(p):
-        files_scanned += 1
+
+def _trips(findings: List[Finding], threshold: int | None) -> bool:
+    return threshold is not None and any(
+        _severity_or_med(f) >= threshold for f in findings
+    )
+
+
+def _read_error(doc_id: str, e: Exception) -> Finding:
+    return Finding(
+        doc_id=doc_id,
+        code="READERR",
+        severity="low",
+        desc=f"read_error: {e}",
+        evidence="",
+        line=None,
+        col=None,
+        offset=None,
+    )
+
+
+def _skipped(doc_id: str, reason: str) -> Finding:
+    return Finding(
+        doc_id=doc_id,
+        code="SKIPPED",
+        severity="low",
+        desc=f"skipped: {reason}",
+        evidence="",
+        line=None,
+        col=None,
+        offset=None,
+    )
+
+
+def _scan_loaded(
+    text: str | bytes,
+    doc_id: str,
+    rules,
+    opts: ScanOptions,
+    stats: ScanStats | None,
+) -> Tuple[List[Finding], bool]:
+    """
+    Scan an in-memory document (str, or a plain byte buffer); returns
+    (findings, whether every rule ran).
+    """
+    if opts.fail_fast:
+        threshold = _threshold(opts.fail_fast)
+        return _scan_text_fail_fast(
+            text,
+            doc_id,
+            rules,
+            threshold,
+            stats,
+            opts.evidence,
+            opts.rule_timeout,
+            **_reduce(opts),
+        )
+    scan = scan_text if isinstance(text, str) else _scan_plain
+    findings = scan(
+        text,
+        doc_id,
+        rules,
+        stats,
+        evidence=opts.evidence,
+        rule_timeout=opts.rule_timeout,
+        **_reduce(opts),
+    )
+    return findings, True
+
+
+def _document(data: bytes) -> str | bytes:
+    """'data' itself when plain (scanned as bytes), else its decoded text."""
+    return data if _is_plain(data) else _decode(data)
+
+
+def _scan_large(
+    f: pathlib.Path,
+    doc_id: str,
+    rules,
+    opts: ScanOptions,
+    stats: ScanStats | None = None,
+) -> List[Finding]:
+    """
+    Scan a file larger than the chunk size without loading it: plain files
+    are mmapped and matched as bytes, others are streamed with scan_stream().
+    """
+    with open(f, "rb") as fh:
+        reason = sniff_binary(fh.read(SNIFF_BYTES)) if opts.sniff else None
+        if reason:
+            return [_skipped(doc_id, reason)]
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None  # no mmap support (some filesystems): stream instead
+        if mm is not None:
+            with mm:
+                if _is_plain(mm):
+                    return _scan_plain(
+                        mm,
+                        doc_id,
+                        rules,
+                        stats,
+                        evidence=opts.evidence,
+                        rule_timeout=opts.rule_timeout,
+                        chunk_size=opts.chunk_size,
+                        **_reduce(opts),
+                    )
+        fh.seek(0)
+        text = io.TextIOWrapper(fh, encoding="utf-8", errors="ignore")
+        return scan_stream(
+            text,
+            doc_id,
+            rules,
+            opts.chunk_size,
+            evidence=opts.evidence,
+            rule_timeout=opts.rule_timeout,
+            **_reduce(opts),
+        )
+
+
+def _scan_file(
+    f: pathlib.Path,
+    rules,
+    opts: ScanOptions = ScanOptions(),
+    cache: ScanCache | None = None,
+    stats: ScanStats | None = None,
+    memo: ContentMemo | None = None,
+    pre: Prefetched | None = None,
+) -> List[Finding]:
+    """
+    Read one file (or take what _prefetch() read for it as 'pre') and scan
+    it; read failures become a READERR finding and binary content
+    (sniff_binary) a SKIPPED one. Plain ASCII content is matched as bytes
+    without decoding; files larger than the chunk size are mmapped or
+    streamed (_scan_large). With a cache, files whose content was scanned
+    before under the same ruleset are not scanned again; with a memo,
+    neither are copies of a file already scanned in this run. With
+    'stats', the file's read and scan time, bytes read and per-rule costs
+    are recorded (large files count as scan time only, and streamed ones
+    are not profiled per rule).
+    """
+    doc_id = f.as_posix()
+    digest = known = None
+    complete = True
+    t_start = time.perf_counter()
+    read_s, nbytes = 0.0, 0
+    data = None
+    if pre is not None:
+        read_s, data = pre.read_s, pre.data
+        nbytes = len(data) if data is not None else 0
+    try:
         try:
-            text = f.read_text(encoding="utf-8", errors="ignore")
+            if pre is not None and pre.error is not None:
+                raise pre.error
+            st = pre.st if pre is not None and pre.st is not None else f.stat()
+            large = st.st_size > opts.chunk_size
+            if large and cache is None:
+                memo = None  # hashing it first would read it twice
+            if cache is not None or memo is not None:
+                if cache is not None:
+                    digest = known = cache.digest_for(f, st)
+                if digest is None:
+                    t0 = time.perf_counter()
+                    if large:
+                        digest = _file_digest(f)
+                        nbytes += st.st_size
+                    else:
+                        if data is None:
+                            data = f.read_bytes()
+                            nbytes += st.st_size
+                        digest = hashlib.sha256(data).hexdigest()
+                    read_s += time.perf_counter() - t0
+                copied = memo.get(digest, doc_id) if memo is not None else None
+                if copied is not None:
+                    return copied  # type: ignore[return-value]
+                cached = cache.get(digest, doc_id) if cache is not None else None
+                if cached is not None:
+                    if known is None:
+                        cache.remember(f, st, digest)  # type: ignore[union-attr]
+                    if memo is not None:
+                        memo.put(digest, cached)
+                    return cached  # type: ignore[return-value]
+
+            if large:
+                nbytes += st.st_size
+                findings = _scan_large(f, doc_id, rules, opts, stats)
+            else:
+                t0 = time.perf_counter()
+                if data is None:
+                    data = f.read_bytes()
+                    nbytes += st.st_size
+                reason = sniff_binary(data[:SNIFF_BYTES]) if opts.sniff else None
+                if reason:
+                    findings = [_skipped(doc_id, reason)]
+                else:
+                    text = _document(data)
+                    read_s += time.perf_counter() - t0
+                    findings, complete = _scan_loaded(text, doc_id, rules, opts, stats)
         except Exception as e:
-            findings.append(
-                Finding(
-                    doc_id=f.as_posix(),
-                    code="READERR",
-                    severity="low",
-                    desc=f"read_error: {e}",
-                    evidence="",
+            return [_read_error(doc_id, e)]
+
+        # timeouts depend on machine load, so those results are not kept
+        complete = complete and not any(f["code"] == RULETIMEOUT for f in findings)
+        if cache is not None and digest is not None and complete:
+            cache.put(digest, findings)  # type: ignore[arg-type]
+            if known is None:
+                cache.remember(f, st, digest)
+        if memo is not None and digest is not None and complete:
+            memo.put(digest, findings)  # type: ignore[arg-type]
+        return findings
+    finally:
+        if stats is not None:
+            # a file read ahead also counts the reader thread's time
+            elapsed = time.perf_counter() - t_start + (pre.read_s if pre else 0.0)
+            stats.add_file(doc_id, elapsed, nbytes, read_s)
+
+
+def _scan_member(
+    member: Member,
+    doc_id: str,
+    rules,
+    opts: ScanOptions,
+    stats: ScanStats | None = None,
+    memo: ContentMemo | None = None,
+) -> List[Finding]:
+    """
+    Scan one archive member. Members whose recorded size fits in the chunk
+    size are read whole; others (and .gz content, whose size is unknown)
+    are streamed with scan_stream(), so memory stays bounded. Binary
+    content is skipped as for files (streamed members are sniffed on
+    what the decompressor has buffered). With a memo, members read whole
+    are not scanned again when the same content was seen before.
+    """
+    t_start = time.perf_counter()
+    read_s, nbytes = 0.0, 0
+    try:
+        with member.open() as raw:
+            if member.size is not None and member.size <= opts.chunk_size:
+                t0 = time.perf_counter()
+                data = raw.read()
+                read_s, nbytes = time.perf_counter() - t0, len(data)
+                digest = hashlib.sha256(data).hexdigest() if memo is not None else ""
+                if memo is not None:
+                    copied = memo.get(digest, doc_id)
+                    if copied is not None:
+                        return copied  # type: ignore[return-value]
+                reason = sniff_binary(data[:SNIFF_BYTES]) if opts.sniff else None
+                if reason:
+                    findings = [_skipped(doc_id, reason)]
+                else:
+                    text = _document(data)
+                    findings, complete = _scan_loaded(text, doc_id, rules, opts, stats)
+                    if not complete or any(f["code"] == RULETIMEOUT for f in findings):
+                        return findings
+                if memo is not None:
+                    memo.put(digest, findings)  # type: ignore[arg-type]
+                return findings
+            nbytes = member.size or 0
+            head = raw.peek(SNIFF_BYTES)[:SNIFF_BYTES] if opts.sniff else b""
+            reason = sniff_binary(head)
+            if reason:
+                return [_skipped(doc_id, reason)]
+            fh = io.TextIOWrapper(raw, encoding="utf-8", errors="ignore")
+            return scan_stream(
+                fh,
+                doc_id,
+                rules,
+                opts.chunk_size,
+                evidence=opts.evidence,
+                rule_timeout=opts.rule_timeout,
+                **_reduce(opts),
+            )
+    except Exception as e:
+        return [_read_error(doc_id, e)]
+    finally:
+        if stats is not None:
+            stats.add_file(doc_id, time.perf_counter() - t_start, nbytes, read_s)
+
+
+def _member_wanted(name: str) -> bool:
+    parts = name.split("/")
+    return os.path.splitext(parts[-1])[1].lower() in ALLOWED_EXTS and not any(
+        p in SKIP_DIRS for p in parts[:-1]
+    )
+
+
+def _scan_archive(
+    f: pathlib.Path,
+    rules,
+    opts: ScanOptions,
+    stats: ScanStats | None = None,
+    memo: ContentMemo | None = None,
+) -> List[List[Finding]]:
+    """
+    Scan the members of an archive in place, one findings list per member
+    with an allowed extension; doc_ids look like 'bundle.zip!/dir/doc.md'.
+    An unreadable or corrupt archive becomes a READERR finding on the
+    archive itself. Archive members are not cached.
+    """
+    threshold = _threshold(opts.fail_fast) if opts.fail_fast else None
+    base = f.as_posix()
+    out: List[List[Finding]] = []
+    try:
+        for member in iter_members(f):
+            if not _member_wanted(member.name):
+                continue
+            doc_id = f"{base}{MEMBER_SEP}{member.name.lstrip('/')}"
+            findings = _scan_member(member, doc_id, rules, opts, stats, memo)
+            out.append(_postprocess(findings, opts))
+            if _trips(findings, threshold):
+                break
+    except Exception as e:
+        out.append(_postprocess([_read_error(base, e)], opts))
+    return out
+
+
+def _scan_jsonl(
+    sl: JsonlSlice,
+    rules,
+    opts: ScanOptions,
+    stats: ScanStats | None = None,
+    memo: ContentMemo | None = None,
+) -> Iterator[List[Finding]]:
+    """
+    Findings of each record in a slice of a JSONL dump, one list per record,
+    read and scanned one at a time. Malformed records get a READERR finding.
+    Dumps are not cached: a changed dump rarely repeats whole ranges. With a
+    memo, records repeating an earlier record's text are not scanned again.
+    """
+    for doc_id, text, err in iter_records(sl, opts.id_field, opts.text_field):
+        if text is None:
+            yield [_read_error(doc_id, err or ValueError("unreadable record"))]
+            continue
+        digest = ""
+        if memo is not None:
+            # a namespace of its own: 'text' need not be valid UTF-8 bytes
+            raw = text.encode("utf-8", "surrogatepass")
+            digest = "text:" + hashlib.sha256(raw).hexdigest()
+            copied = memo.get(digest, doc_id)
+            if copied is not None:
+                yield _postprocess(copied, opts)  # type: ignore[arg-type]
+                continue
+        findings, complete = _scan_loaded(text, doc_id, rules, opts, stats)
+        complete = complete and not any(f["code"] == RULETIMEOUT for f in findings)
+        if memo is not None and complete:
+            memo.put(digest, findings)  # type: ignore[arg-type]
+        yield _postprocess(findings, opts)
+
+
+def _scan_unit(
+    f: pathlib.Path | JsonlSlice,
+    rules,
+    opts: ScanOptions,
+    cache: ScanCache | None = None,
+    stats: ScanStats | None = None,
+    memo: ContentMemo | None = None,
+    pre: Prefetched | None = None,
+) -> Iterable[List[Finding]]:
+    """
+    Findings of one walked path: the file itself, or each archive member;
+    or of each record in a slice of a JSONL dump (lazily).
+    """
+    if isinstance(f, JsonlSlice):
+        return _scan_jsonl(f, rules, opts, stats, memo)
+    if opts.archives and archive_kind(f.name):
+        return _scan_archive(f, rules, opts, stats, memo)
+    return [_postprocess(_scan_file(f, rules, opts, cache, stats, memo, pre), opts)]
+
+
+def scan_file(
+    f: pathlib.Path,
+    rules,
+    opts: ScanOptions = ScanOptions(),
+    memo: ContentMemo | None = None,
+) -> List[Finding]:
+    """
+    Findings of one file as scan_path() reports them (READERR/SKIPPED
+    included; with opts.archives, those of every member of an archive).
+    'memo' shares findings between identical contents across calls.
+    """
+    findings: List[Finding] = []
+    for part in _scan_unit(f, rules, opts, memo=memo):
+        findings.extend(part)
+    return findings
+
+
+def _prefetch(
+    units: Iterable[pathlib.Path | JsonlSlice],
+    opts: ScanOptions,
+    cache: ScanCache | None = None,
+) -> Iterator[Tuple[pathlib.Path | JsonlSlice, Prefetched | None]]:
+    """
+    Pair each unit with its content read ahead (readahead.read_ahead) when
+    it is a plain file; with opts.read_ahead <= 0, every unit gets None.
+    The first READ_AHEAD_MIN_FILES units (or READ_AHEAD_MIN_BYTES of files)
+    get None too: read-ahead only starts when more follow. Files the cache
+    knows by size and mtime are only stat'ed.
+    """
+    units = iter(units)
+    nfiles = nbytes = 0
+    for u in units:
+        yield u, None
+        if opts.read_ahead <= 0:
+            continue
+        nfiles += 1
+        if isinstance(u, pathlib.Path):
+            try:
+                nbytes += u.stat().st_size
+            except OSError:
+                pass  # reported where it was scanned
+        if nfiles >= READ_AHEAD_MIN_FILES or nbytes >= READ_AHEAD_MIN_BYTES:
+            break
+    else:
+        return
+    first = next(units, None)
+    if first is None:
+        return
+    from itertools import chain
+
+    from .readahead import read_ahead
+
+    def wanted(u: pathlib.Path | JsonlSlice) -> bool:
+        return isinstance(u, pathlib.Path) and not (
+            opts.archives and archive_kind(u.name)
+        )
+
+    skip = None
+    if cache is not None:
+        skip = lambda f, st: cache.digest_for(f, st) is not None  # noqa: E731
+    yield from read_ahead(
+        chain([first], units),
+        wanted,
+        opts.chunk_size,
+        opts.read_ahead,
+        opts.read_ahead_bytes,
+        skip,
+    )
+
+
+# Per-process state, set up once by the pool initializer
+_WORKER_RULES: RuleEngine | None = None
+_WORKER_OPTS = ScanOptions()
+_WORKER_CACHE: ScanCache | None = None
+_WORKER_STOP: Any = None  # multiprocessing.Event set by the parent to stop early
+_WORKER_STATS_TOP: int | None = None  # collect ScanStats per batch when set
+_WORKER_MEMO: ContentMemo | None = None  # per-worker in-run dedup
+
+
+def _on_changed_line(f: Finding, changes: Mapping[str, LineRanges | None]) -> bool:
+    line = f["line"]
+    record = DOC_ID_RE.match(f["doc_id"])
+    if record:  # a JSONL record changed if its line in the dump did
+        doc, line = record[1], int(record[2])
+    else:
+        doc = f["doc_id"].split(MEMBER_SEP, 1)[0]
+    ranges = changes.get(doc, ())
+    if ranges is None or line is None:
+        return True
+    return any(first <= line <= last for first, last in ranges)
+
+
+def _postprocess(findings: List[Finding], opts: ScanOptions) -> List[Finding]:
+    """
+    Apply the changed-lines filter, then aggregation or the per-rule cap,
+    to one file's findings. Without the filter the match loop has already
+    capped or folded them (see _reduce()); this leaves them as they are.
+    """
+    if opts.changed_lines_only and opts.changes is not None:
+        changes = opts.changes
+        findings = [f for f in findings if _on_changed_line(f, changes)]
+    if opts.aggregate:
+        # counts and offsets cover every match; 'samples' bounds the evidence
+        return aggregate_findings(findings, opts.samples)  # type: ignore[return-value]
+    if opts.max_per_rule is not None:
+        return cap_findings(findings, opts.max_per_rule)
+    return findings
+
+
+def _open_cache(rules: RuleEngine, opts: ScanOptions) -> ScanCache | None:
+    if not opts.cache_dir:
+        return None
+    # Findings scanned without evidence (or sniffing), or capped or folded
+    # per rule while matching, must not be served to a run with more
+    fingerprint = rules.fingerprint()
+    fingerprint += "" if opts.evidence else ":no-evidence"
+    reduce = _reduce(opts)
+    keep = _keep(**reduce) if reduce else None
+    if keep is not None:
+        fingerprint += f":keep={keep.limit}" + ("/fold" if keep.fold else "")
+    fingerprint += "" if opts.sniff else ":no-sniff"
+    return ScanCache(opts.cache_dir, fingerprint)
+
+
+def _init_worker(
+    cfg: Dict[str, Any] | None,
+    opts: ScanOptions,
+    stop: Any,
+    stats_top: int | None = None,
+) -> None:
+    global _WORKER_RULES, _WORKER_OPTS, _WORKER_CACHE, _WORKER_STOP
+    global _WORKER_STATS_TOP, _WORKER_MEMO
+    _WORKER_RULES = load_rules_from_config(cfg)
+    _WORKER_OPTS = opts
+    _WORKER_CACHE = _open_cache(_WORKER_RULES, opts)
+    _WORKER_STOP = stop
+    _WORKER_STATS_TOP = stats_top
+    _WORKER_MEMO = ContentMemo() if opts.dedup else None
+
+
+def _scan_batch(
+    paths: List[str | JsonlSlice],
+) -> Tuple[List[List[Finding]], ScanStats | None, int]:
+    """Findings per unit, batch stats and the number of duplicates collapsed."""
+    stats = ScanStats(_WORKER_STATS_TOP) if _WORKER_STATS_TOP is not None else None
+    memo = _WORKER_MEMO
+    collapsed = memo.collapsed if memo is not None else 0
+    out: List[List[Finding]] = []
+    units = (p if isinstance(p, JsonlSlice) else pathlib.Path(p) for p in paths)
+    prefetched = _prefetch(units, _WORKER_OPTS, _WORKER_CACHE)
+    try:
+        for unit, pre in prefetched:
+            if _WORKER_STOP is not None and _WORKER_STOP.is_set():
+                break  # the parent has stopped consuming; results are discarded
+            out.extend(
+                _scan_unit(
+                    unit, _WORKER_RULES, _WORKER_OPTS, _WORKER_CACHE, stats, memo, pre
                 )
             )
+    finally:
+        prefetched.close()
+        if _WORKER_CACHE is not None:
+            _WORKER_CACHE.flush_usage()  # before the parent prunes
+    collapsed = memo.collapsed - collapsed if memo is not None else 0
+    return out, stats, collapsed
+
+
+def _scan_doc(
+    doc_id: str, data: str | bytes, rules, opts: ScanOptions
+) -> List[Finding]:
+    """Findings for one in-memory document; bytes are sniffed like files."""
+    if isinstance(data, str):
+        return _postprocess(_scan_loaded(data, doc_id, rules, opts, None)[0], opts)
+    reason = sniff_binary(data[:SNIFF_BYTES]) if opts.sniff else None
+    if reason:
+        return [_skipped(doc_id, reason)]
+    findings = _scan_loaded(_document(data), doc_id, rules, opts, None)[0]
+    return _postprocess(findings, opts)
+
+
+def _scan_docs(
+    docs: Sequence[Tuple[str, str | bytes]], rules, opts: ScanOptions
+) -> List[List[Finding]]:
+    """Findings for in-memory (doc_id, text) pairs, one list per document."""
+    return [_scan_doc(doc_id, data, rules, opts) for doc_id, data in docs]
+
+
+def _scan_doc_batch(docs: List[Tuple[str, str | bytes]]) -> List[List[Finding]]:
+    return _scan_docs(docs, _WORKER_RULES, _WORKER_OPTS)
+
+
+def _batches(
+    files: Iterable[pathlib.Path | JsonlSlice], size: int
+) -> Iterator[List[str | JsonlSlice]]:
+    batch: List[str | JsonlSlice] = []
+    for f in files:
+        if isinstance(f, JsonlSlice):
+            # a slice is already chunk_size bytes of records: a task of its own
+            yield [f]
             continue
-        findings.extend(scan_text(text, f.as_posix(), rules))
+        batch.append(str(f))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-    return ScanResult(files_scanned=files_scanned, findings=findings)
+
+def _iter_file_findings(
+    files: Iterable[pathlib.Path | JsonlSlice],
+    cfg: Dict[str, Any] | None,
+    opts: ScanOptions = ScanOptions(),
+    stats: ScanStats | None = None,
+    rules: RuleEngine | None = None,
+    totals: Dict[str, int] | None = None,
+) -> Iterator[List[Finding]]:
+    """
+    Yield the findings of each file in 'files', one list per file, in input
+    order (one per record for JSONL slices). A serial scan uses 'rules'
+    when given, else compiles 'cfg'.
+    With jobs > 1, batches of files are scanned by a process pool;
+    at most 2 * jobs batches are in flight so the walk stays lazy.
+    With opts.fail_fast, iteration ends after the first file holding a
+    finding at/above that severity; queued work is cancelled and running
+    workers stop at their next file.
+    With 'stats', time spent producing 'files' counts as the walk stage and
+    per-batch worker stats are merged into it.
+    With opts.read_ahead, upcoming files are read by threads (in each worker,
+    with jobs > 1) while the current one is scanned; see _prefetch().
+    With opts.dedup, documents whose content was already scanned in this run
+    (by the same worker, with jobs > 1) get copies of its findings; their
+    number is added to totals["duplicates"].
+    """
+    threshold = _threshold(opts.fail_fast) if opts.fail_fast else None
+    if totals is None:
+        totals = {}
+    totals.setdefault("duplicates", 0)
+    if stats is not None:
+        files = timed(files, stats.stages, "walk")
+    if opts.jobs <= 1:
+        if rules is None:
+            rules = load_rules_from_config(cfg)
+        cache = _open_cache(rules, opts)
+        memo = ContentMemo() if opts.dedup else None
+        prefetched = _prefetch(files, opts, cache)
+        try:
+            for f, pre in prefetched:
+                for file_findings in _scan_unit(
+                    f, rules, opts, cache, stats, memo, pre
+                ):
+                    yield file_findings
+                    if _trips(file_findings, threshold):
+                        return
+        finally:
+            prefetched.close()  # stops the reader threads
+            if cache is not None:
+                cache.flush_usage()
+            if memo is not None:
+                totals["duplicates"] += memo.collapsed
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    stop = multiprocessing.Event()
+    stats_top = stats.top if stats is not None else None
+    pool = ProcessPoolExecutor(
+        max_workers=opts.jobs,
+        initializer=_init_worker,
+        initargs=(cfg, opts, stop, stats_top),
+    )
+    pending: Deque[Future] = deque()
+
+    def collect(fut: Future) -> List[List[Finding]]:
+        out, part, collapsed = fut.result()
+        if stats is not None and part is not None:
+            stats.merge(part)
+        totals["duplicates"] += collapsed
+        return out
+
+    def results() -> Iterator[List[Finding]]:
+        for batch in _batches(files, BATCH_SIZE):
+            pending.append(pool.submit(_scan_batch, batch))
+            if len(pending) >= 2 * opts.jobs:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+
+    try:
+        for file_findings in results():
+            yield file_findings
+            if _trips(file_findings, threshold):
+                return
+    finally:
+        # Normal end, fail-fast stop, or the consumer closed us early
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _options(options: ScanOptions | None, overrides: Dict[str, Any]) -> ScanOptions:
+    return replace(options or ScanOptions(), **overrides)
+
+
+def _files(
+    root: pathlib.Path, opts: ScanOptions
+) -> Iterable[pathlib.Path | JsonlSlice]:
+    archives = opts.archives and not opts.jsonl
+    exts = JSONL_EXTS if opts.jsonl else ALLOWED_EXTS
+    if opts.changes is not None:
+        files = select_files(root, opts.changes, opts.ignore_files, archives, exts)
+    else:
+        files = iter_files(root, opts.ignore_files, archives, exts)
+    if opts.shard:
+        files = shard_files(files, root, opts.shard)
+    if opts.jsonl:
+        # records of a large dump are spread over workers by byte range
+        return (sl for f in files for sl in jsonl_slices(f.as_posix(), opts.chunk_size))
+    return files
+
+
+def _all_files(path: Paths, opts: ScanOptions) -> Iterator[pathlib.Path | JsonlSlice]:
+    if isinstance(path, (str, os.PathLike)):
+        yield from _files(pathlib.Path(path), opts)
+        return
+    for root in path:
+        p = pathlib.Path(root)
+        if not opts.jsonl and p.suffix.lower() in ALLOWED_EXTS and not p.exists():
+            # a stale entry in a file list: scan it anyway to get a READERR
+            yield from shard_files([p], p, opts.shard) if opts.shard else [p]
+            continue
+        yield from _files(p, opts)
+
+
+def iter_findings(
+    path: Paths,
+    cfg: Dict[str, Any] | None,
+    options: ScanOptions | None = None,
+    *,
+    stats: ScanStats | None = None,
+    totals: Dict[str, int] | None = None,
+    **overrides: Any,
+) -> Iterator[Finding]:
+    """
+    Generator version of scan_path(): yields findings file by file as the
+    scan progresses, so callers can write or count them without holding the
+    full list. Keyword arguments override fields of 'options'. Pass a dict
+    as 'totals' to get the number of collapsed duplicates ("duplicates")
+    once the generator is exhausted.
+    """
+    opts = _options(options, overrides)
+    files = _all_files(path, opts)
+    for file_findings in _iter_file_findings(files, cfg, opts, stats, totals=totals):
+        yield from file_findings
+    if opts.cache_dir:
+        prune_cache(opts.cache_dir, opts.cache_max_bytes)
+
+
+def scan_path(
+    path: Paths,
+    cfg: Dict[str, Any] | None,
+    options: ScanOptions | None = None,
+    *,
+    stats: ScanStats | None = None,
+    **overrides: Any,
+) -> ScanResult:
+    """
+    Read eligible files from 'path' (see Paths) and scan them with active
+    rules. Files listed by path are scanned if their extension is allowed;
+    directories are walked.
+    Options (see ScanOptions) may be passed as an object and/or keywords,
+    e.g. scan_path(p, cfg, jobs=4). With jobs > 1 findings still come back
+    in the same order as a serial scan (only "duplicates" may differ). Pass
+    a ScanStats as 'stats' to collect per-rule and per-stage timings (see
+    stats.py). With compact=True findings are collected in a FindingStore
+    (a read-only sequence of the same dicts, in a fraction of the memory).
+    Identical documents are scanned once per run (see ScanOptions.dedup);
+    "duplicates" counts the copies that reused another's findings. With
+    jobs > 1 each worker only collapses the copies it sees itself, so the
+    count is lower than a serial scan's (the findings are the same).
+    Returns:
+      { "files_scanned": int, "duplicates": int, "findings": [Finding, ...] }
+    """
+    return _collect(path, cfg, _options(options, overrides), stats)
+
+
+def _collect(
+    path: Paths,
+    cfg: Dict[str, Any] | None,
+    opts: ScanOptions,
+    stats: ScanStats | None = None,
+    rules: RuleEngine | None = None,
+) -> ScanResult:
+    findings: List[Finding] | FindingStore = (
+        FindingStore() if opts.compact and not opts.aggregate else []
+    )
+    files_scanned = 0
+    totals: Dict[str, int] = {}
+
+    files = _all_files(path, opts)
+    for file_findings in _iter_file_findings(files, cfg, opts, stats, rules, totals):
+        files_scanned += 1
+        findings.extend(file_findings)
+
+    if opts.cache_dir:
+        prune_cache(opts.cache_dir, opts.cache_max_bytes)
+
+    return ScanResult(
+        files_scanned=files_scanned,
+        duplicates=totals["duplicates"],
+        findings=findings,
+    )
+
+
+# ---------------- Library API ----------------
+Document = Tuple[str, str | bytes]  # (doc_id, text or raw bytes)
+
+
+class Scanner:
+    """
+    A ruleset compiled once, for scanning many in-memory documents (or
+    paths) from Python without re-reading the config or recompiling rules:
+
+        scanner = Scanner("rules.yaml", evidence=False)
+        findings = scanner.scan_text(chunk, "kb/123#4")
+        for doc_findings in scanner.scan_many(chunks):  # (doc_id, text) pairs
+            ...
+
+    'config' is a config dict (as from load_config) or a path to one;
+    options are a ScanOptions and/or keyword overrides, as for scan_path().
+    With jobs > 1, scan_many() and scan_batch() use a process pool whose
+    workers compile the rules once; it is kept for reuse until close() (or
+    the end of a 'with' block). scan_path() with jobs > 1 starts its own
+    pool per call.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any] | str | os.PathLike | None = None,
+        options: ScanOptions | None = None,
+        **overrides: Any,
+    ) -> None:
+        if isinstance(config, (str, os.PathLike)):
+            config = load_config(os.fspath(config))
+        self.config = config
+        self.options = _options(options, overrides)
+        self.rules = load_rules_from_config(config)
+        self._pool: Any = None
+        self._pool_lock = threading.Lock()  # scan_batch() may run on threads
+
+    def __enter__(self) -> "Scanner":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pool, if one was started. With wait=False,
+        work already submitted still finishes, in the background.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=wait)
+
+    def _worker_pool(self) -> Any:
+        with self._pool_lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.options.jobs,
+                    initializer=_init_worker,
+                    initargs=(self.config, self.options, None),
+                )
+            return self._pool
+
+    def scan_text(self, text: str, doc_id: str = "<text>") -> List[Finding]:
+        """Findings for one document held as text."""
+        return _scan_doc(doc_id, text, self.rules, self.options)
+
+    def scan_bytes(self, data: bytes, doc_id: str = "<bytes>") -> List[Finding]:
+        """
+        Findings for one document held as raw bytes, handled like a file's
+        content: binary data gets a SKIPPED finding (unless sniff=False),
+        plain ASCII is matched without decoding, the rest is decoded as UTF-8.
+        """
+        return _scan_doc(doc_id, data, self.rules, self.options)
+
+    def scan_many(self, docs: Iterable[Document]) -> Iterator[List[Finding]]:
+        """
+        Yield one findings list per (doc_id, text-or-bytes) pair of 'docs',
+        in input order. 'docs' is consumed lazily; with jobs > 1 batches of
+        BATCH_SIZE documents go to the worker pool, at most 2 * jobs batches
+        in flight. With fail_fast, iteration ends after the first document
+        with a finding at/above that severity.
+        """
+        opts = self.options
+        threshold = _threshold(opts.fail_fast) if opts.fail_fast else None
+        if opts.jobs <= 1:
+            for doc_id, data in docs:
+                found = _scan_doc(doc_id, data, self.rules, opts)
+                yield found
+                if _trips(found, threshold):
+                    return
+            return
+
+        pool = self._worker_pool()
+        pending: Deque[Future] = deque()
+
+        def results() -> Iterator[List[Finding]]:
+            it = iter(docs)
+            while batch := list(islice(it, BATCH_SIZE)):
+                pending.append(pool.submit(_scan_doc_batch, batch))
+                if len(pending) >= 2 * opts.jobs:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+        try:
+            for found in results():
+                yield found
+                if _trips(found, threshold):
+                    return
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    def scan_batch(
+        self, docs: Sequence[Document], files: Sequence[pathlib.Path] = ()
+    ) -> List[List[Finding]]:
+        """
+        Findings for each of 'docs', then for each of 'files' (one list per
+        file, or per archive member), in order. With jobs > 1 one call is
+        spread evenly over all workers, for latency rather than throughput
+        (e.g. one request to `rag-scan serve`).
+        """
+        opts = self.options
+        if opts.jobs <= 1:
+            out = _scan_docs(docs, self.rules, opts)
+            for f in files:
+                out.extend(_scan_unit(f, self.rules, opts))
+            return out
+
+        pool = self._worker_pool()
+        size = min(max(-(-len(docs) // opts.jobs), 1), BATCH_SIZE)
+        doc_futures = [
+            pool.submit(_scan_doc_batch, list(docs[i : i + size]))
+            for i in range(0, len(docs), size)
+        ]
+        size = min(max(-(-len(files) // opts.jobs), 1), BATCH_SIZE)
+        file_futures = [pool.submit(_scan_batch, b) for b in _batches(files, size)]
+        out = []
+        for fut in doc_futures:
+            out.extend(fut.result())
+        for fut in file_futures:
+            out.extend(fut.result()[0])
+        return out
+
+    def scan_path(self, path: Paths, stats: ScanStats | None = None) -> ScanResult:
+        """scan_path() with this scanner's rules and options."""
+        return _collect(path, self.config, self.options, stats, self.rules)
 
 
 # ---------------- Exit code logic ----------------
-def exit_code_for_findings(findings: List[Finding], min_sev: str) -> int:
+class SeverityTally:
     """
-    Return 1 if any finding severity >= min_sev (by rank); else 0.
-    - min_sev: "low"|"med"|"high"
+    Running per-severity counts and worst severity, for computing the
+    summary and exit code while findings stream past.
     """
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {"low": 0, "med": 0, "high": 0}
+        self.total = 0
+        self._worst = 0
+
+    def add(self, f: Finding) -> None:
+        self.total += 1
+        sev = (f.get("severity") or "med").lower()
+        if sev in self.counts:
+            self.counts[sev] += 1
+        self._worst = max(self._worst, _severity_or_med(f))
+
+    def track(self, findings: Iterable[Finding]) -> Iterator[Finding]:
+        """Pass 'findings' through unchanged, counting each one."""
+        for f in findings:
+            self.add(f)
+            yield f
+
+    def exit_code(self, min_sev: str) -> int:
+        """Same decision as exit_code_for_findings() on the findings seen."""
+        return 1 if self._worst >= _threshold(min_sev) else 0
+
+
+def _threshold(min_sev: str) -> int:
     try:
-        threshold = severity_rank(min_sev)
+        return severity_rank(min_sev)
     except Exception:
-        threshold = severity_rank("med")
+        return severity_rank("med")
 
-    def sev_of(f: Finding) -> int:
-        try:
-            return severity_rank(f.get("severity", "med"))
-        except Exception:
-            return severity_rank("med")
 
-    should_fail = any(sev_of(f) >= threshold for f in findings)
+def _severity_or_med(f: Finding) -> int:
+    try:
+        return severity_rank(f.get("severity", "med"))
+    except Exception:
+        return severity_rank("med")
+
+
+def exit_code_for_findings(findings: List[Finding], min_sev: str) -> int:
+    """
+    Return 1 if any finding severity >= min_sev (by rank); else 0.
+    - min_sev: "low"|"med"|"high"
+    """
+    threshold = _threshold(min_sev)
+    should_fail = any(_severity_or_med(f) >= threshold for f in findings)
     return 1 if should_fail else 0
@@ -0,0 +1,403 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+`rag-scan serve`: a long-running scan service with a warm ruleset.
+
+Speaks plain HTTP/JSON on localhost or on a Unix socket:
+
+  POST /scan     {"documents": [{"doc_id": ..., "text": ...}], "paths": [...],
+                  "fail_on": "med"}   (paths must lie under the served root)
+                 -> {"findings": [...], "files_scanned": n,
+                     "counts": {...}, "exit_code": 0|1}
+  GET  /stats    request/document/byte counters and latency percentiles
+  GET  /healthz  {"ok": true, "rules": n, "fingerprint": ...}
+
+Rules are compiled once and reloaded when the config file's mtime changes
+(checked at most once per RELOAD_CHECK seconds, on request). With jobs > 1
+requests are scanned by a process pool whose workers hold compiled rules.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import socketserver
+import stat
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from . import __version__
+from .scanner import (
+    Finding,
+    Scanner,
+    ScanOptions,
+    SeverityTally,
+    iter_files,
+    load_config,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+RELOAD_CHECK = 1.0  # seconds between config mtime checks
+MAX_BODY = 64 * 1024 * 1024
+LATENCY_WINDOW = 1024  # requests kept for latency percentiles
+
+
+class Counters:
+    """Thread-safe service counters for GET /stats."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.documents = 0
+        self.bytes = 0
+        self.findings = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.busy_seconds = 0.0
+        self._latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, documents: int, nbytes: int, findings: int):
+        with self._lock:
+            self.requests += 1
+            self.documents += documents
+            self.bytes += nbytes
+            self.findings += findings
+            self.busy_seconds += seconds
+            self._latency.append(seconds)
+
+    def error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def reloaded(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.reloads += 1
+            else:
+                self.reload_errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = sorted(self._latency)
+            busy = self.busy_seconds
+
+            def pct(q: float) -> float:
+                return lat[min(int(q * len(lat)), len(lat) - 1)] * 1000 if lat else 0.0
+
+            return {
+                "uptime_seconds": time.time() - self.started,
+                "requests": self.requests,
+                "errors": self.errors,
+                "documents": self.documents,
+                "bytes": self.bytes,
+                "findings": self.findings,
+                "reloads": self.reloads,
+                "reload_errors": self.reload_errors,
+                "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+                "docs_per_second": self.documents / busy if busy else 0.0,
+                "mb_per_second": self.bytes / 1e6 / busy if busy else 0.0,
+            }
+
+
+class ScanService:
+    """A Scanner (rules plus optional worker pool) shared by all requests."""
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        jobs: int = 1,
+        options: ScanOptions = ScanOptions(),
+        root: Optional[str] = None,
+    ) -> None:
+        self.config_path = config_path
+        self.jobs = jobs
+        self.options = options
+        # request paths are confined to this directory (default: the cwd)
+        self.root = pathlib.Path(root or os.getcwd()).resolve()
+        self.counters = Counters()
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = time.monotonic()
+        self.scanner: Optional[Scanner] = None
+        self._load()
+
+    @property
+    def rules(self):
+        return self.scanner.rules  # type: ignore[union-attr]
+
+    # -------- rules --------
+    def _config_mtime(self) -> Optional[float]:
+        if not self.config_path:
+            return None
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        mtime = self._config_mtime()
+        scanner = Scanner(load_config(self.config_path), self.options, jobs=self.jobs)
+        with self._lock:
+            old, self.scanner = self.scanner, scanner
+            self._mtime = mtime
+        if old is not None:
+            old.close(wait=False)  # requests already on it still finish
+
+    def maybe_reload(self) -> bool:
+        """Reload the rules if the config file changed; keep the old ones on error."""
+        now = time.monotonic()
+        if not self.config_path or now - self._checked < RELOAD_CHECK:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # another request is already checking
+        try:
+            self._checked = now
+            mtime = self._config_mtime()
+            if mtime is None or mtime == self._mtime:
+                return False
+            try:
+                self._load()
+            except Exception:
+                self.counters.reloaded(False)
+                self._mtime = mtime  # do not retry until the file changes again
+                return False
+            self.counters.reloaded(True)
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            scanner, self.scanner = self.scanner, None
+        if scanner is not None:
+            scanner.close()
+
+    # -------- scanning --------
+    def _inside(self, path: pathlib.Path) -> bool:
+        try:
+            return path.resolve().is_relative_to(self.root)
+        except (OSError, RuntimeError):
+            return False
+
+    def resolve_paths(self, paths: List[str]) -> List[pathlib.Path]:
+        """
+        Map request paths (relative ones are taken from the root) to paths
+        under the root; raise ValueError for any that resolve outside it.
+        """
+        out = []
+        for p in paths:
+            path = self.root / p
+            if not self._inside(path):
+                raise ValueError(f"path outside the served root: {p}")
+            out.append(path)
+        return out
+
+    def scan(
+        self, docs: List[Tuple[str, str]], paths: List[str]
+    ) -> Tuple[List[List[Finding]], int]:
+        """
+        Scan in-memory documents, then files under 'paths' (see
+        resolve_paths; file symlinks leading out of the root are skipped).
+        Returns one findings list per document/file, in request order, and
+        the number of bytes read from disk.
+        """
+        self.maybe_reload()
+        opts = self.options
+        files = [
+            f
+            for p in self.resolve_paths(paths)
+            for f in iter_files(p, opts.ignore_files, opts.archives)
+            if not f.is_symlink() or self._inside(f)
+        ]
+        nbytes = 0
+        for f in files:
+            try:
+                nbytes += f.stat().st_size
+            except OSError:
+                pass
+        while True:
+            with self._lock:
+                scanner = self.scanner
+            assert scanner is not None, "service is closed"
+            try:
+                return scanner.scan_batch(docs, files), nbytes
+            except RuntimeError:
+                # the pool was shut down by a reload between lookup and submit
+                if scanner is self.scanner:
+                    raise
+            finally:
+                if scanner is not self.scanner:
+                    scanner.close(wait=False)  # a pool it restarted meanwhile
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = f"rag-scan/{__version__}"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ScanService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, obj: Any) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            rules = self.service.rules
+            self._reply(
+                200,
+                {"ok": True, "rules": len(rules), "fingerprint": rules.fingerprint()},
+            )
+        elif self.path == "/stats":
+            self._reply(200, self.service.counters.snapshot())
+        else:
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/scan":
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        t0 = time.perf_counter()
+        counters = self.service.counters
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError("Content-Length must not be negative")
+            if length > MAX_BODY:
+                self.close_connection = True
+                self._reply(413, {"error": f"request body over {MAX_BODY} bytes"})
+                return
+            req = json.loads(self.rfile.read(length) or b"{}")
+            docs, paths, fail_on = _parse_request(req)
+            self.service.resolve_paths(paths)
+        except (ValueError, TypeError) as e:
+            counters.error()
+            self._reply(400, {"error": str(e)})
+            return
+        try:
+            per_doc, disk_bytes = self.service.scan(docs, paths)
+        except Exception as e:  # pragma: no cover - reported, never fatal
+            counters.error()
+            self._reply(500, {"error": f"scan failed: {e}"})
+            return
+
+        tally = SeverityTally()
+        findings = list(tally.track(f for fs in per_doc for f in fs))
+        nbytes = disk_bytes + sum(len(text.encode("utf-8")) for _, text in docs)
+        counters.record(time.perf_counter() - t0, len(per_doc), nbytes, len(findings))
+        self._reply(
+            200,
+            {
+                "findings": findings,
+                "files_scanned": len(per_doc),
+                "counts": tally.counts,
+                "exit_code": tally.exit_code(fail_on),
+            },
+        )
+
+
+def _parse_request(req: Any) -> Tuple[List[Tuple[str, str]], List[str], str]:
+    if not isinstance(req, dict):
+        raise ValueError("request body must be a JSON object")
+    docs: List[Tuple[str, str]] = []
+    for i, d in enumerate(req.get("documents") or []):
+        if not isinstance(d, dict) or not isinstance(d.get("text"), str):
+            raise ValueError(f"documents[{i}] needs a string 'text'")
+        docs.append((str(d.get("doc_id", f"doc-{i}")), d["text"]))
+    paths = req.get("paths") or []
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        raise ValueError("'paths' must be a list of strings")
+    fail_on = req.get("fail_on", "med")
+    if fail_on not in ("low", "med", "high"):
+        raise ValueError("'fail_on' must be one of low, med, high")
+    return docs, paths, fail_on
+
+
+def _remove_socket(path: str) -> None:
+    """Remove a stale Unix socket at 'path'; refuse to touch anything else."""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"--socket {path}: exists and is not a socket")
+    os.unlink(path)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: ScanService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    verbose: bool = False,
+) -> socketserver.BaseServer:
+    """
+    Bind an HTTP server for 'service' on host:port or a Unix socket. A
+    socket left at 'socket_path' by a previous run is replaced; any other
+    file there raises FileExistsError.
+    """
+    server: socketserver.BaseServer
+    if socket_path:
+        _remove_socket(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = service  # type: ignore[attr-defined]
+    server.verbose = verbose  # type: ignore[attr-defined]
+    return server
+
+
+def serve(
+    config_path: Optional[str] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    jobs: int = 1,
+    options: ScanOptions = ScanOptions(),
+    verbose: bool = False,
+    root: Optional[str] = None,
+) -> None:
+    """Run the service until interrupted."""
+    service = ScanService(config_path, jobs, options, root)
+    try:
+        server = make_server(service, host, port, socket_path, verbose)
+    except BaseException:
+        service.close()
+        raise
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path:
+            _remove_socket(socket_path)
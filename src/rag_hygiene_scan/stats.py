@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Scan instrumentation: per-rule cost and match counts, per-stage time,
+bytes/files read and the slowest files.
+
+A ScanStats object is filled by scanner.scan_path()/iter_findings() when
+passed as 'stats='. Worker processes fill their own and the parent merges
+them, so with --jobs > 1 the read/scan stage times add up across workers
+(CPU time rather than wall time).
+
+Per-rule figures come from RuleEngine.profiled_matches(), which runs each
+rule on its own; the combined single-pass engine is not used while stats
+are collected, so a profiled scan is slower than a normal one.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+STAGES = ("walk", "read", "scan", "report")
+
+
+class ScanStats:
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.files = 0
+        self.bytes_read = 0
+        self.stages: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        # code -> [seconds, matches, chars scanned]
+        self.rules: Dict[str, List[float]] = {}
+        self._slowest: List[Tuple[float, str]] = []  # min-heap of (seconds, doc_id)
+
+    # -------- recording --------
+    def add_rule(self, code: str, seconds: float, matches: int, chars: int) -> None:
+        row = self.rules.setdefault(code, [0.0, 0, 0])
+        row[0] += seconds
+        row[1] += matches
+        row[2] += chars
+
+    def add_file(
+        self, doc_id: str, seconds: float, nbytes: int, read_seconds: float = 0.0
+    ) -> None:
+        """Record one file; 'seconds' is its total time, split into read/scan."""
+        self.files += 1
+        self.bytes_read += nbytes
+        self.stages["read"] += read_seconds
+        self.stages["scan"] += seconds - read_seconds
+        item = (seconds, doc_id)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def merge(self, other: "ScanStats") -> None:
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        for stage, secs in other.stages.items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + secs
+        for code, (secs, matches, chars) in other.rules.items():
+            self.add_rule(code, secs, int(matches), int(chars))
+        for item in other._slowest:
+            if len(self._slowest) < self.top:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    # -------- reporting --------
+    def to_dict(self) -> Dict[str, Any]:
+        rules = []
+        for code, (secs, matches, chars) in self.rules.items():
+            mb = chars / 1e6
+            rules.append(
+                {
+                    "code": code,
+                    "seconds": secs,
+                    "matches": int(matches),
+                    "mb_scanned": mb,
+                    "ms_per_mb": (secs * 1000 / mb) if mb else 0.0,
+                }
+            )
+        rules.sort(key=lambda r: r["seconds"], reverse=True)
+        costliest = sorted(rules, key=lambda r: r["ms_per_mb"], reverse=True)
+        return {
+            "files": self.files,
+            "bytes_read": self.bytes_read,
+            "stages": dict(self.stages),
+            "rules": rules,
+            "costliest_rules": [r["code"] for r in costliest[: self.top]],
+            "slowest_files": [
+                {"doc_id": doc_id, "seconds": secs}
+                for secs, doc_id in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def format(self) -> str:
+        d = self.to_dict()
+        lines = [
+            f"stats: files={d['files']} bytes={d['bytes_read']} "
+            + " ".join(f"{k}={v:.3f}s" for k, v in d["stages"].items()),
+            f"  {'rule':<14} {'ms':>10} {'matches':>9} {'ms/MB':>10}",
+        ]
+        for r in d["rules"]:
+            lines.append(
+                f"  {r['code']:<14} {r['seconds'] * 1000:>10.3f} {r['matches']:>9} "
+                f"{r['ms_per_mb']:>10.2f}"
+            )
+        if d["slowest_files"]:
+            lines.append("  slowest files:")
+            lines.extend(
+                f"    {f['seconds']:.4f}s  {f['doc_id']}" for f in d["slowest_files"]
+            )
+        return "\n".join(lines)
+
+
+def timed(items: Iterable[T], into: Dict[str, float], key: str) -> Iterator[T]:
+    """Pass 'items' through, adding the time spent producing them to into[key]."""
+    it = iter(items)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            into[key] = into.get(key, 0.0) + time.perf_counter() - t0
+            return
+        into[key] = into.get(key, 0.0) + time.perf_counter() - t0
+        yield item
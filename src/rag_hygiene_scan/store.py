@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+Compact findings storage and per-document aggregation.
+
+FindingStore keeps findings column by column: doc ids and (code, severity,
+desc) triples are stored once in lookup tables and referenced by index, and
+positions live in typed arrays, so millions of findings cost a few machine
+words each plus their evidence text instead of one dict apiece.
+
+aggregate_findings() folds one document's findings into one record per rule:
+count, first/last offset and a few sample snippets.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from .scanner import Finding
+
+DEFAULT_SAMPLES = 3
+_NONE = -1  # stands for None in the position columns
+
+
+class FindingGroup(TypedDict):
+    doc_id: str
+    code: str
+    severity: str
+    desc: str
+    count: int
+    line: Optional[int]  # position of the first match
+    col: Optional[int]
+    offset: Optional[int]
+    last_offset: Optional[int]
+    samples: List[str]  # evidence of the first few matches
+
+
+AGGREGATE_FIELDS = list(FindingGroup.__annotations__)
+
+
+class FindingStore(Sequence["Finding"]):
+    """Append-only, columnar list of findings; reads back as Finding dicts."""
+
+    __slots__ = (
+        "_docs",
+        "_doc_ids",
+        "_kinds",
+        "_kind_ids",
+        "_doc",
+        "_kind",
+        "_line",
+        "_col",
+        "_offset",
+        "_evidence",
+    )
+
+    def __init__(self, findings: Iterable["Finding"] = ()) -> None:
+        self._docs: List[str] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._kinds: List[Tuple[str, str, str]] = []  # (code, severity, desc)
+        self._kind_ids: Dict[Tuple[str, str, str], int] = {}
+        self._doc = array("L")
+        self._kind = array("L")
+        self._line = array("q")
+        self._col = array("q")
+        self._offset = array("q")
+        self._evidence: List[str] = []
+        self.extend(findings)
+
+    def append(self, f: "Finding") -> None:
+        doc = self._doc_ids.get(f["doc_id"])
+        if doc is None:
+            doc = self._doc_ids[f["doc_id"]] = len(self._docs)
+            self._docs.append(f["doc_id"])
+        key = (f["code"], f["severity"], f["desc"])
+        kind = self._kind_ids.get(key)
+        if kind is None:
+            kind = self._kind_ids[key] = len(self._kinds)
+            self._kinds.append(key)
+        self._doc.append(doc)
+        self._kind.append(kind)
+        for column, value in (
+            (self._line, f.get("line")),
+            (self._col, f.get("col")),
+            (self._offset, f.get("offset")),
+        ):
+            column.append(_NONE if value is None else value)
+        self._evidence.append(f["evidence"])
+
+    def extend(self, findings: Iterable["Finding"]) -> None:
+        for f in findings:
+            self.append(f)
+
+    def __len__(self) -> int:
+        return len(self._kind)
+
+    @overload
+    def __getitem__(self, idx: int) -> "Finding": ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> List["Finding"]: ...
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._row(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("FindingStore index out of range")
+        return self._row(idx)
+
+    def __iter__(self) -> Iterator["Finding"]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __repr__(self) -> str:
+        return f"FindingStore(findings={len(self)}, docs={len(self._docs)})"
+
+    def _row(self, i: int) -> "Finding":
+        code, severity, desc = self._kinds[self._kind[i]]
+        line, col, offset = self._line[i], self._col[i], self._offset[i]
+        return {
+            "doc_id": self._docs[self._doc[i]],
+            "code": code,
+            "severity": severity,
+            "desc": desc,
+            "evidence": self._evidence[i],
+            "line": None if line == _NONE else line,
+            "col": None if col == _NONE else col,
+            "offset": None if offset == _NONE else offset,
+        }
+
+
+def start_group(f: "Finding", samples: int = DEFAULT_SAMPLES) -> FindingGroup:
+    """A FindingGroup holding just 'f', the first finding of its rule."""
+    return FindingGroup(
+        doc_id=f["doc_id"],
+        code=f["code"],
+        severity=f["severity"],
+        desc=f["desc"],
+        count=1,
+        line=f.get("line"),
+        col=f.get("col"),
+        offset=f.get("offset"),
+        last_offset=f.get("offset"),
+        samples=[f["evidence"]] if samples > 0 else [],
+    )
+
+
+def aggregate_findings(
+    findings: Iterable["Finding"], samples: int = DEFAULT_SAMPLES
+) -> List[FindingGroup]:
+    """
+    One FindingGroup per (doc_id, code), in order of first appearance.
+    Findings of one rule arrive ordered by position, so the first and last
+    offsets are those of the first and last finding in each group. Groups
+    already folded while matching (they have a 'count') pass through.
+    """
+    groups: Dict[Tuple[str, str], FindingGroup] = {}
+    for f in findings:
+        key = (f["doc_id"], f["code"])
+        if "count" in f:
+            groups[key] = f  # type: ignore[assignment]
+            continue
+        g = groups.get(key)
+        if g is None:
+            groups[key] = start_group(f, samples)
+            continue
+        g["count"] += 1
+        g["last_offset"] = f.get("offset")
+        if len(g["samples"]) < samples:
+            g["samples"].append(f["evidence"])
+    return list(groups.values())
+
+
+def cap_findings(findings: List["Finding"], max_per_rule: int) -> List["Finding"]:
+    """Keep at most 'max_per_rule' findings per rule (one document's list)."""
+    seen: Dict[str, int] = {}
+    kept: List["Finding"] = []
+    for f in findings:
+        n = seen.get(f["code"], 0)
+        if n < max_per_rule:
+            kept.append(f)
+        seen[f["code"]] = n + 1
+    return kept
@@ -0,0 +1,387 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Robert Schneider
+
+"""
+`rag-scan watch`: scan a tree once, then rescan only the files that change.
+
+Findings are kept per file in memory (Watcher). Changes come from inotify
+on Linux (via ctypes, one watch per directory the walk would enter) or,
+elsewhere or with --poll, from comparing size and mtime of the walked files
+every POLL_INTERVAL seconds. Bursts of events are debounced: a rescan starts
+once the tree has been quiet for 'debounce' seconds (or after MAX_DELAY
+under a steady stream of writes). Rules are reloaded, and every file
+rescanned, when the config file's mtime changes; a change to an ignore file
+(.gitignore, .ragscanignore) resynchronizes the whole tree.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import pathlib
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import ContentMemo
+from .patterns import load_rules_from_config
+from .scanner import (
+    SKIP_DIRS,
+    Finding,
+    ScanOptions,
+    SeverityTally,
+    iter_files,
+    load_config,
+    scan_file,
+    select_files,
+)
+
+DEBOUNCE = 0.2  # seconds without events before rescanning
+MAX_DELAY = 2.0  # rescan at the latest this long after the first event
+POLL_INTERVAL = 1.0  # seconds between snapshots when polling
+RELOAD_CHECK = 1.0  # seconds between config mtime checks
+
+# path -> new findings, or None when the file is gone (or no longer scanned)
+Update = Dict[str, Optional[List[Finding]]]
+# paths that changed; None: lost track (queue overflow), resynchronize
+Changed = Optional[Set[str]]
+
+
+class Watcher:
+    """Per-file findings for 'path', kept current by scan_all() / update()."""
+
+    def __init__(
+        self,
+        path: str,
+        config_path: Optional[str] = None,
+        options: ScanOptions = ScanOptions(),
+    ) -> None:
+        self.root = pathlib.Path(path)
+        self.config_path = config_path
+        self.options = options
+        self.findings: Dict[str, List[Finding]] = {}
+        self._mtime: Optional[int] = None
+        self._load()
+
+    # -------- rules --------
+    def _config_mtime(self) -> Optional[int]:
+        if not self.config_path:
+            return None
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        mtime = self._config_mtime()
+        self.rules = load_rules_from_config(load_config(self.config_path))
+        self._mtime = mtime
+        # copies must not outlive the rules that produced them
+        self.memo = ContentMemo() if self.options.dedup else None
+
+    def maybe_reload(self) -> bool:
+        """
+        Reload the rules if the config file changed. On error the old rules
+        stay (until the file changes again) and the error is raised.
+        """
+        mtime = self._config_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        self._load()
+        return True
+
+    # -------- scanning --------
+    def files(self) -> Iterable[pathlib.Path]:
+        """The files the walk of the root would scan."""
+        opts = self.options
+        return iter_files(self.root, opts.ignore_files, opts.archives)
+
+    def _scan(self, f: pathlib.Path) -> List[Finding]:
+        return scan_file(f, self.rules, self.options, self.memo)
+
+    def _apply(self, scanned: Dict[str, List[Finding]], gone: Iterable[str]) -> Update:
+        changed: Update = {}
+        for doc in gone:
+            if self.findings.pop(doc, None):
+                changed[doc] = None
+        for doc, findings in scanned.items():
+            old = self.findings.get(doc)
+            self.findings[doc] = findings
+            if old != findings and (old is not None or findings):
+                changed[doc] = findings
+        return changed
+
+    def scan_all(self) -> Update:
+        """
+        Walk and scan the whole tree; returns the files whose findings
+        differ from what was held (all files with findings, the first time).
+        """
+        scanned = {f.as_posix(): self._scan(f) for f in self.files()}
+        return self._apply(scanned, [d for d in self.findings if d not in scanned])
+
+    def update(self, paths: Iterable[str]) -> Update:
+        """
+        Rescan the files among 'paths' (as the walk names them; a directory
+        stands for everything below it) that the walk would scan, and drop
+        the findings of those that are gone or no longer scanned.
+        """
+        candidates: Set[str] = set()
+        for p in paths:
+            candidates.add(p)
+            if os.path.isdir(p):
+                candidates.update(
+                    os.path.join(d, n).replace(os.sep, "/")
+                    for d, _, names in os.walk(p)
+                    for n in names
+                )
+            prefix = p.rstrip("/") + "/"
+            candidates.update(d for d in self.findings if d.startswith(prefix))
+        opts = self.options
+        keep = select_files(self.root, candidates, opts.ignore_files, opts.archives)
+        scanned = {f.as_posix(): self._scan(f) for f in keep}
+        gone = [d for d in candidates if d in self.findings and d not in scanned]
+        return self._apply(scanned, gone)
+
+    def tally(self) -> SeverityTally:
+        tally = SeverityTally()
+        for findings in self.findings.values():
+            for f in findings:
+                tally.add(f)
+        return tally
+
+
+# ---------------- Change sources ----------------
+class PollSource:
+    """Changed files found by comparing (mtime, size) snapshots of the walk."""
+
+    def __init__(self, watcher: Watcher, interval: float = POLL_INTERVAL) -> None:
+        self.watcher = watcher
+        self.interval = interval
+        self.snapshot = self._snapshot()
+        self.due = time.monotonic() + interval
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snap: Dict[str, Tuple[int, int]] = {}
+        for f in self.watcher.files():
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            snap[f.as_posix()] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def wait(self, timeout: float) -> Changed:
+        """Paths changed by the next snapshot if due within 'timeout', else empty."""
+        now = time.monotonic()
+        if self.due - now > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(self.due - now, 0.0))
+        self.due = time.monotonic() + self.interval
+        old, self.snapshot = self.snapshot, self._snapshot()
+        return {
+            p
+            for p in old.keys() | self.snapshot.keys()
+            if old.get(p) != self.snapshot.get(p)
+        }
+
+    def close(self) -> None:
+        pass
+
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then the name
+
+
+class InotifySource:
+    """
+    Changed paths from Linux inotify: every directory the walk would enter
+    is watched, and directories created later are added as they appear.
+    Raises OSError when inotify is unavailable (e.g. the watch limit is
+    reached); use PollSource instead.
+    """
+
+    def __init__(self, watcher: Watcher) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self.watcher = watcher
+        root = watcher.root
+        self.fd = self._check(self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+        self.dirs: Dict[int, str] = {}
+        self.only: Optional[str] = None
+        try:
+            self.ignore_names = set(watcher.options.ignore_files)
+            if root.is_dir():
+                self._add_tree(root.as_posix())
+            else:  # one file: watch its directory, report only the file
+                self._add(root.parent.as_posix())
+                self.only = root.as_posix()
+        except OSError:
+            self.close()
+            raise
+
+    def _check(self, ret: int) -> int:
+        if ret < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return ret
+
+    def _add(self, d: str) -> None:
+        wd = self._check(
+            self.libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+        )
+        self.dirs[wd] = d
+
+    def _add_tree(self, top: str) -> None:
+        """Watch 'top' and its subdirectories, pruned like iter_files()."""
+        stack = [top]
+        while stack:
+            d = stack.pop()
+            try:
+                self._add(d)
+                with os.scandir(d) as it:
+                    stack.extend(
+                        f"{d}/{e.name}" if d != "." else e.name
+                        for e in it
+                        if e.name not in SKIP_DIRS and e.is_dir(follow_symlinks=False)
+                    )
+            except FileNotFoundError:
+                continue  # removed while we looked; its parent saw that
+
+    def wait(self, timeout: float) -> Changed:
+        """Paths named by the events that arrive within 'timeout'."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, size = _EVENT.unpack_from(data, pos)
+                raw = data[pos + _EVENT.size : pos + _EVENT.size + size]
+                pos += _EVENT.size + size
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                d = self.dirs.get(wd)
+                if d is None:
+                    continue
+                name = os.fsdecode(raw.rstrip(b"\0"))
+                if not name:  # the directory itself was deleted or moved
+                    changed.add(d)
+                    continue
+                path = name if d == "." else f"{d}/{name}"
+                if name in self.ignore_names:
+                    return None  # what is scanned may have changed anywhere
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        if name not in SKIP_DIRS:
+                            self._add_tree(path)
+                    except OSError:
+                        pass  # watch limit: its files are scanned now, not later
+                changed.add(path)
+        if self.only is not None:
+            changed &= {self.only}
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_source(watcher: Watcher, poll: bool = False, interval: float = POLL_INTERVAL):
+    """InotifySource where it works, else (or with 'poll') a PollSource."""
+    if not poll:
+        try:
+            return InotifySource(watcher)
+        except (OSError, AttributeError):  # not Linux, no libc symbol, limits
+            pass
+    return PollSource(watcher, interval)
+
+
+# ---------------- Loop ----------------
+def run(
+    watcher: Watcher,
+    source,
+    emit: Callable[[Update, float], None],
+    debounce: float = DEBOUNCE,
+    stop: Optional[threading.Event] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> None:
+    """
+    Emit the initial scan, then the changes of each rescan that changed
+    findings, as emit(update, seconds it took), until 'stop' is set (or
+    forever). Errors reloading the rules go to 'on_error' and the previous
+    rules stay in use.
+    """
+    t0 = time.perf_counter()
+    emit(watcher.scan_all(), time.perf_counter() - t0)
+    while stop is None or not stop.is_set():
+        changed = source.wait(RELOAD_CHECK)
+        try:
+            reloaded = watcher.maybe_reload()
+        except Exception as e:
+            reloaded = False
+            if on_error is not None:
+                on_error(e)
+        if not reloaded and changed is not None and not changed:
+            continue
+        first = time.monotonic()
+        while changed is not None and time.monotonic() - first < MAX_DELAY:
+            more = source.wait(debounce)
+            if more is None:
+                changed = None
+            elif not more:
+                break
+            else:
+                changed |= more
+        t0 = time.perf_counter()
+        if reloaded or changed is None:
+            update = watcher.scan_all()
+        else:
+            update = watcher.update(changed)
+        if update:  # saves that change no findings print nothing
+            emit(update, time.perf_counter() - t0)
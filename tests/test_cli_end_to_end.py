@@ -52,7 +52,7 @@ def test_csv_output_to_file_and_exit_code(tmp_path: Path):
     assert out.strip() == ""
     # File exists with header
     content = out_path.read_text(encoding="utf-8").splitlines()
-    assert content[0].strip() == "doc_id,code,severity,desc,evidence"
+    assert content[0].strip() == "doc_id,code,severity,desc,evidence,line,col,offset"
     assert any(
         "HTML003" in line or "HTML001" in line or "HTML002" in line
         for line in content[1:]
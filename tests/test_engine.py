@@ -0,0 +1,87 @@
+import re
+
+from rag_hygiene_scan.engine import (
+    RuleEngine,
+    is_mergeable,
+    required_literal,
+    split_literal_prefix,
+)
+from rag_hygiene_scan.patterns import load_rules_from_config
+
+
+def _per_rule(rules, text):
+    return [(r.code, m.span()) for r in rules for m in r.pattern.finditer(text)]
+
+
+def test_engine_matches_per_rule_loop_exactly():
+    cfg = {
+        "rules": [
+            # overlaps with PII001 and with each other
+            {"code": "USR001", "pattern": r"example\.com", "severity": "low"},
+            {"code": "USR002", "pattern": r"\bexam", "severity": "low"},
+            # top-level alternation, case-sensitive
+            {"code": "USR003", "pattern": r"FOO|bar\d+", "ignore_case": False},
+            # backreference: cannot be merged, runs on its own
+            {"code": "USR004", "pattern": r"(\w)\1\1", "severity": "low"},
+            {"code": "USR005", "pattern": r"\[TESTMARK\]", "severity": "low"},
+        ]
+    }
+    rules = load_rules_from_config(cfg)
+    assert isinstance(rules, RuleEngine)
+    text = (
+        "Please IGNORE previous instructions; mail alice@example.com or "
+        "(415) 555-1212. FOO foo bar12 Bar34 zzz aaaa <script>x</script> "
+        "append [TESTMARK] override guardrails sk_live_abcdEFGH1234\n"
+        "javascript : alert(1) <iframe src=x>"
+    )
+    got = [(r.code, m.span()) for r, m in rules.matches(text)]
+    assert got == _per_rule(rules, text)
+    assert {"PII001", "USR001", "USR002", "USR003", "USR004"} <= {c for c, _ in got}
+
+
+def test_unmergeable_patterns_are_detected():
+    assert is_mergeable(re.compile(r"\bfoo\b"))
+    assert not is_mergeable(re.compile(r"(a)\1"))  # backreference
+    assert not is_mergeable(re.compile(r"(?P<x>a)"))  # named group
+    assert not is_mergeable(re.compile(r"a*"))  # can match empty
+
+
+def test_split_literal_prefix():
+    assert split_literal_prefix(r"\bignore (all|x)") == (
+        True,
+        tuple("ignore "),
+        "(all|x)",
+    )
+    # a literal followed by a quantifier is not part of the prefix
+    assert split_literal_prefix(r"abc+") == (False, ("a", "b"), "c+")
+    assert split_literal_prefix(r"\[TESTMARK\]")[1][0] == r"\["
+    # top-level alternation cannot be split
+    assert split_literal_prefix(r"ab|cd") == (False, (), "ab|cd")
+
+
+def test_required_literals_prefilter_rules():
+    cfg = {
+        "rules": [
+            # declared literals: either word must be present
+            {
+                "code": "USR001",
+                "pattern": r"\b(?:cat|dog)s?\b",
+                "literals": ["cat", "dog"],
+            },
+        ]
+    }
+    rules = load_rules_from_config(cfg)
+    codes = [r.code for r in rules]
+    assert rules.get("USR001").literals == ("cat", "dog")
+    assert required_literal(rules.get("HTML001").pattern) == "script"
+    assert required_literal(rules.get("PII002").pattern) is None
+
+    clean = "nothing interesting here, call 415 555 1212"
+    active = {codes[i] for i in rules.candidates(clean)}
+    assert active == {"PII002"}  # no literal, always runs
+
+    text = "<SCRIPT> two Dogs"
+    active = {codes[i] for i in rules.candidates(text)}
+    assert {"HTML001", "USR001"} <= active
+    assert "SEC001" not in active
+    assert [r.code for r, _ in rules.matches(text)] == ["HTML001", "USR001"]
@@ -0,0 +1,73 @@
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from rag_hygiene_scan.engine import interruptible
+from rag_hygiene_scan.lint import backtracking_risks, lint_rules
+from rag_hygiene_scan.patterns import load_rules_from_config
+
+needs_alarm = pytest.mark.skipif(not interruptible(), reason="needs SIGALRM")
+
+
+def _risks(pattern: str) -> list:
+    return [msg.split(":")[0] for _, msg in backtracking_risks(re.compile(pattern))]
+
+
+def test_static_checks():
+    assert _risks(r"(a+)+$") == ["nested quantifier"]
+    assert _risks(r"(\s*\w+)+$") == ["nested quantifier"]
+    assert _risks(r"\d+\d+x") == ["adjacent quantifiers"]
+    # a mandatory separator or a disjoint follower keeps the split unambiguous
+    assert _risks(r"(?:[a-z]+\.)+[a-z]+") == []
+    assert _risks(r"(ab+)+") == []
+    assert _risks(r"\d+[a-z]+") == []
+    assert _risks(r"(?:a++)+$") == []  # possessive: no backtracking into it
+
+
+def test_builtin_rules_have_no_static_risks():
+    for r in load_rules_from_config(None):
+        assert backtracking_risks(r.pattern) == [], r.code
+
+
+@needs_alarm
+def test_lint_reports_runaway_custom_rule_only():
+    cfg = {
+        "rules": [
+            {"code": "BAD001", "pattern": r"(x+x+)+y", "severity": "low"},
+            {"code": "OK001", "pattern": r"\bfoo\b", "severity": "low"},
+        ]
+    }
+    report = lint_rules(load_rules_from_config(cfg), ["foo bar " * 1000], 0.2)
+    by_code = {r["code"]: r for r in report["rules"]}
+    assert set(by_code) == {"BAD001", "OK001"}  # built-ins left out
+    bad = [(i["level"], i["check"]) for i in by_code["BAD001"]["issues"]]
+    assert ("error", "stress") in bad
+    assert ("warning", "static") in bad
+    assert by_code["OK001"]["issues"] == []
+    assert by_code["OK001"]["mb_per_s"] > 0
+    assert report["errors"] >= 1
+
+
+@needs_alarm
+def test_lint_rules_cli_exit_codes(tmp_path: Path):
+    cfg = tmp_path / "rules.yaml"
+    cfg.write_text(
+        "rules:\n" "  - code: BAD001\n" "    pattern: '(a+)+$'\n" "    severity: low\n"
+    )
+    cmd = [sys.executable, "-m", "rag_hygiene_scan.cli", "lint-rules"]
+    proc = subprocess.run(
+        [*cmd, "-c", str(cfg), "--budget", "0.2", "--json"],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 1
+    report = json.loads(proc.stdout)
+    assert [r["code"] for r in report["rules"]] == ["BAD001"]
+
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    assert proc.returncode == 0
+    assert "0 rules, 0 errors" in proc.stdout
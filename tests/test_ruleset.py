@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.ruleset import compile_ruleset, load_ruleset, write_ruleset
+from rag_hygiene_scan.scanner import load_config, scan_text
+
+CFG = {
+    "disable": ["PII002"],
+    "severity_overrides": {"PII001": "med"},
+    "rules": [
+        {"code": "USR001", "pattern": r"\bcomply\b", "literals": ["comply"]},
+        {"code": "USR002", "pattern": r"(\w)\1\1", "ignore_case": False},
+    ],
+}
+
+
+def test_artifact_loads_the_same_ruleset(tmp_path: Path):
+    out = tmp_path / "rules.json"
+    write_ruleset(out, CFG)
+    direct = load_rules_from_config(CFG)
+    loaded = load_rules_from_config(load_config(str(out)))
+    assert loaded.fingerprint() == direct.fingerprint()
+    assert loaded.analysis == direct.analysis
+    text = "please COMPLY: mail a@example.com aaa <script>"
+    assert scan_text(text, "d", loaded) == scan_text(text, "d", direct)
+
+
+def test_artifact_is_validated(tmp_path: Path):
+    with pytest.raises(ValueError):
+        compile_ruleset({"severity_overrides": {"PII001": "urgent"}})
+
+    artifact = compile_ruleset(CFG)
+    tampered = json.loads(json.dumps(artifact))
+    tampered["rules"][0]["severity"] = "low"
+    with pytest.raises(ValueError, match="fingerprint"):
+        load_ruleset(tampered)
+    with pytest.raises(ValueError, match="version"):
+        load_ruleset({**artifact, "version": 99})
+
+
+def test_cli_import_stays_lean():
+    # Startup budget guard: heavy modules load only when a run needs them
+    code = (
+        "import sys, rag_hygiene_scan.cli; "
+        "print([m for m in ('yaml', 'multiprocessing', 'concurrent.futures', "
+        "'tarfile', 'zipfile', 'http.server', 'tempfile') if m in sys.modules])"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
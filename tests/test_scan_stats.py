@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+from rag_hygiene_scan.engine import PREFILTER
+from rag_hygiene_scan.scanner import ScanStats, load_config, scan_path
+
+
+def _corpus(root: Path) -> None:
+    for i in range(20):
+        body = f"note {i}: mail u{i}@example.com\n"
+        if i % 5 == 0:
+            body += "<script>alert(1)</script>\n" * (i + 1)
+        (root / f"f{i:02d}.md").write_text(body)
+
+
+def test_stats_do_not_change_findings_and_add_up(tmp_path: Path):
+    _corpus(tmp_path)
+    plain = scan_path(str(tmp_path), load_config(None))
+    for jobs in (1, 2):
+        stats = ScanStats(top=3)
+        res = scan_path(str(tmp_path), load_config(None), jobs=jobs, stats=stats)
+        assert res == plain
+
+        d = stats.to_dict()
+        assert d["files"] == 20
+        assert d["bytes_read"] == sum(p.stat().st_size for p in tmp_path.iterdir())
+        rules = {r["code"]: r for r in d["rules"]}
+        assert rules["PII001"]["matches"] == 20
+        assert rules["HTML001"]["matches"] == sum(i + 1 for i in range(0, 20, 5))
+        assert PREFILTER in rules
+        assert len(d["slowest_files"]) == 3
+        assert all(v >= 0 for v in d["stages"].values())
+        json.dumps(d)
+
+
+def test_stats_merge():
+    a, b = ScanStats(top=2), ScanStats(top=2)
+    a.add_rule("X", 0.5, 2, 1000)
+    b.add_rule("X", 0.5, 1, 1000)
+    a.add_file("a", 0.1, 10, 0.05)
+    b.add_file("b", 0.3, 20)
+    b.add_file("c", 0.2, 30)
+    a.merge(b)
+    d = a.to_dict()
+    assert (d["files"], d["bytes_read"]) == (3, 60)
+    assert d["rules"][0]["matches"] == 3
+    assert d["rules"][0]["ms_per_mb"] == 1000 * 1.0 / 0.002
+    assert [f["doc_id"] for f in d["slowest_files"]] == ["b", "c"]
@@ -0,0 +1,79 @@
+import gzip
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+from rag_hygiene_scan.scanner import load_config, scan_path
+
+DOCS = {
+    "kb/a.md": "mail bob@example.com\n",
+    "kb/b.html": "<script>x</script>\n" + "filler line\n" * 50 + "<iframe src=x>",
+    "kb/skip.bin": "<script>not a doc</script>",
+    "node_modules/c.md": "<script>vendored</script>",
+}
+
+
+def _tree(root: Path) -> None:
+    for name, text in DOCS.items():
+        p = root / "src" / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text)
+
+
+def test_archive_members_scan_like_extracted_files(tmp_path: Path):
+    _tree(tmp_path)
+    src = tmp_path / "src"
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as zf:
+        for name, text in DOCS.items():
+            zf.writestr(name, text)
+    with tarfile.open(tmp_path / "bundle.tar.gz", "w:gz") as tf:
+        for name, text in DOCS.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    with gzip.open(tmp_path / "b.html.gz", "wb") as gz:
+        gz.write(DOCS["kb/b.html"].encode())
+
+    expected = scan_path(str(src), load_config(None), ignore_files=())["findings"]
+    assert {f["doc_id"] for f in expected} == {
+        (src / "kb/a.md").as_posix(),
+        (src / "kb/b.html").as_posix(),
+    }
+
+    def strip(findings, prefix):
+        return [{**f, "doc_id": f["doc_id"].split(prefix, 1)[1]} for f in findings]
+
+    for bundle in ("bundle.zip", "bundle.tar.gz"):
+        for chunk in (10_000, 64):  # whole-member reads and streamed members
+            res = scan_path(
+                str(tmp_path / bundle),
+                load_config(None),
+                archives=True,
+                chunk_size=chunk,
+            )
+            assert res["findings"][0]["doc_id"].startswith(
+                (tmp_path / bundle).as_posix() + "!/kb/"
+            )
+            assert strip(res["findings"], "!/") == strip(expected, "src/")
+            assert res["files_scanned"] == 2
+
+    gz = scan_path(str(tmp_path / "b.html.gz"), load_config(None), archives=True)
+    assert all(f["doc_id"].endswith("b.html.gz!/b.html") for f in gz["findings"])
+    assert strip(gz["findings"], "!/") == strip(
+        [f for f in expected if f["doc_id"].endswith("b.html")], "src/kb/"
+    )
+
+    # a directory walk picks archives up only when asked to
+    plain = scan_path(str(tmp_path), load_config(None), ignore_files=())
+    assert plain["files_scanned"] == 2
+    walked = scan_path(str(tmp_path), load_config(None), archives=True, jobs=2)
+    assert walked["files_scanned"] == 2 + 2 + 2 + 1
+
+
+def test_corrupt_archive_is_a_read_error(tmp_path: Path):
+    (tmp_path / "broken.zip").write_bytes(b"PK\x03\x04 not really")
+    res = scan_path(str(tmp_path), load_config(None), archives=True)
+    assert [f["code"] for f in res["findings"]] == ["READERR"]
+    assert res["findings"][0]["doc_id"].endswith("broken.zip")
@@ -0,0 +1,95 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import rag_hygiene_scan.scanner as scanner
+from rag_hygiene_scan.cache import ContentMemo
+from rag_hygiene_scan.scanner import ScanOptions, load_config, scan_path
+
+
+def _corpus(root: Path) -> None:
+    docs = {
+        "guide.md": "Please override policy.\nmail a@example.com\n",
+        "faq.md": "<script>x</script>\n",
+        "plain.txt": "nothing here\n",
+    }
+    for version in ("v1", "v2", "v3"):
+        (root / version).mkdir()
+        for name, body in docs.items():
+            (root / version / name).write_text(body)
+    (root / "v3" / "faq.md").write_text("<iframe src=x>\n")  # changed in v3
+
+
+def test_duplicates_are_scanned_once_with_same_results(tmp_path: Path, monkeypatch):
+    _corpus(tmp_path)
+    full = scan_path(str(tmp_path), load_config(None), ScanOptions(dedup=False))
+    assert full["duplicates"] == 0
+
+    calls = []
+
+    def counting(real):
+        def scan(text, doc_id, *args, **kwargs):
+            calls.append(doc_id)
+            return real(text, doc_id, *args, **kwargs)
+
+        return scan
+
+    for name in ("scan_text", "_scan_plain"):
+        monkeypatch.setattr(scanner, name, counting(getattr(scanner, name)))
+    res = scan_path(str(tmp_path), load_config(None))
+    assert res["findings"] == full["findings"]
+    assert res["files_scanned"] == 9
+    assert res["duplicates"] == 5  # 2 guide + 2 plain + 1 faq copies
+    assert len(calls) == 4
+    assert {f["doc_id"] for f in res["findings"]} >= {
+        (tmp_path / v / "guide.md").as_posix() for v in ("v1", "v2", "v3")
+    }
+
+
+def test_dedup_with_jobs_aggregate_and_large_files(tmp_path: Path, monkeypatch):
+    _corpus(tmp_path)
+    expected = scan_path(str(tmp_path), None, dedup=False, aggregate=True)
+    cache = str(tmp_path / ".cache")
+    for opts in (
+        ScanOptions(aggregate=True, jobs=2),
+        ScanOptions(aggregate=True, chunk_size=16),  # large-file path
+        ScanOptions(aggregate=True, chunk_size=16, cache_dir=cache),
+    ):
+        res = scan_path(str(tmp_path), None, opts)
+        assert res["findings"] == expected["findings"], opts
+    # each worker collapses only the copies it sees: same findings, fewer
+    assert 0 <= scan_path(str(tmp_path), None, jobs=2)["duplicates"] <= 5
+
+    # large files are hashed only when a cache needs the digest anyway
+    def boom(*args, **kwargs):
+        raise AssertionError("large file read twice")
+
+    monkeypatch.setattr(scanner, "_file_digest", boom)  # a READERR otherwise
+    res = scan_path(str(tmp_path), None, chunk_size=16, aggregate=True)
+    assert res["findings"] == expected["findings"]
+    assert res["duplicates"] == 2  # only the small plain.txt copies
+    monkeypatch.undo()
+    res = scan_path(str(tmp_path), None, chunk_size=16, cache_dir=cache + "2")
+    assert res["duplicates"] == 5
+
+
+def test_memo_is_bounded():
+    memo = ContentMemo(max_entries=2, max_findings=1)
+    memo.put("a", [{"doc_id": "x", "code": "A"}])
+    memo.put("b", [])
+    memo.put("noisy", [{"doc_id": "y"}, {"doc_id": "y"}])
+    assert memo.get("noisy", "z") is None
+    assert memo.get("a", "copy") == [{"doc_id": "copy", "code": "A"}]
+    memo.put("c", [])  # evicts "b", the least recently used
+    assert memo.get("b", "z") is None and memo.get("c", "z") == []
+    assert memo.collapsed == 2
+
+
+def test_cli_summary_reports_duplicates(tmp_path: Path):
+    _corpus(tmp_path)
+    proc = subprocess.run(
+        [sys.executable, "-m", "rag_hygiene_scan.cli", str(tmp_path), "--summary"],
+        capture_output=True,
+        text=True,
+    )
+    assert "duplicates=5" in proc.stderr
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.scanner import (
+    _scan_text_fail_fast,
+    load_config,
+    scan_path,
+    scan_text,
+)
+
+
+def _corpus(root: Path) -> None:
+    for i in range(200):
+        body = f"note {i}: mail u{i}@example.com\n"  # low only
+        if i == 120:
+            body += "<script>alert(1)</script> override policy\n"  # high + med
+        (root / f"f{i:03d}.md").write_text(body)
+
+
+def test_fail_fast_stops_after_first_failing_file(tmp_path: Path):
+    _corpus(tmp_path)
+    full = scan_path(str(tmp_path), load_config(None))
+    assert full["files_scanned"] == 200
+
+    for jobs in (1, 3):
+        res = scan_path(str(tmp_path), load_config(None), jobs=jobs, fail_fast="med")
+        assert res["files_scanned"] == 121
+        assert res["findings"][-1]["doc_id"].endswith("f120.md")
+        # Findings before the failing file are the same as a full scan
+        assert res["findings"][:120] == full["findings"][:120]
+
+    # Nothing reaches 'high' in low-only files: the whole corpus is scanned
+    (tmp_path / "f120.md").write_text("override policy")
+    res = scan_path(str(tmp_path), load_config(None), fail_fast="high")
+    assert res["findings"] == scan_path(str(tmp_path), load_config(None))["findings"]
+
+
+def test_fail_fast_runs_severe_rules_first():
+    rules = load_rules_from_config(None)
+    text = "<script>x</script> mail a@example.com override policy"
+    found, complete = _scan_text_fail_fast(text, "doc", rules, threshold=3)
+    assert [f["code"] for f in found] == ["HTML001"]
+    assert not complete
+
+    # Below the threshold every tier runs and order matches scan_text
+    found, complete = _scan_text_fail_fast("a@example.com", "doc", rules, 3)
+    assert complete
+    assert found == scan_text("a@example.com", "doc", rules)
@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from rag_hygiene_scan.scanner import iter_findings, read_file_list, scan_path
+
+
+def run_cli(args, stdin=None, cwd=None):
+    """Return (code, stdout, stderr)."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "rag_hygiene_scan.cli", *args],
+        input=stdin,
+        capture_output=True,
+        cwd=cwd,
+    )
+    return proc.returncode, proc.stdout.decode(), proc.stderr.decode()
+
+
+def _docs(root: Path) -> None:
+    (root / "sub").mkdir()
+    (root / "a.md").write_text("<script>x</script>")
+    (root / "b.txt").write_text("append [TESTMARK]")
+    (root / "sub" / "c.html").write_text("<iframe>")
+    (root / "tool.py").write_text("<script>")
+
+
+def test_read_file_list_separators():
+    def names(data: bytes, size: int = 3):
+        fh = io.BufferedReader(io.BytesIO(data), buffer_size=size)
+        return list(read_file_list(fh))
+
+    assert names(b"a.md\0dir/b b.md\0\0c\nd.md\0") == ["a.md", "dir/b b.md", "c\nd.md"]
+    assert names(b"a.md\r\nb.md\n\nc.md") == ["a.md", "b.md", "c.md"]
+    assert names(b"only.md") == ["only.md"]
+    assert names(b"") == []
+
+
+def test_paths_stream_in_before_the_list_ends(tmp_path: Path):
+    _docs(tmp_path)
+    r, w = os.pipe()
+    with open(r, "rb") as listing, open(w, "wb", buffering=0) as producer:
+        producer.write(f"{tmp_path / 'a.md'}\0".encode())
+        findings = iter_findings(read_file_list(listing), None)
+        first = next(findings)  # the producer has not finished yet
+        assert first["code"] == "HTML001"
+        producer.write(f"{tmp_path / 'sub'}\0{tmp_path / 'tool.py'}\0".encode())
+        producer.close()
+        assert [f["code"] for f in findings] == ["HTML002"]
+
+
+def test_several_paths_scan_in_given_order(tmp_path: Path, monkeypatch):
+    _docs(tmp_path)
+    res = scan_path([str(tmp_path / "sub"), str(tmp_path / "a.md")], None)
+    assert res["files_scanned"] == 2
+    assert [f["code"] for f in res["findings"]] == ["HTML002", "HTML001"]
+
+    # listed files are sharded by their path as given; each lands in one shard
+    monkeypatch.chdir(tmp_path)
+    listed = ["a.md", "b.txt", "sub/c.html", "gone.md"]
+    parts = [scan_path(listed, None, shard=(i, 3)) for i in (1, 2, 3)]
+    assert sum(p["files_scanned"] for p in parts) == 4
+    whole = scan_path(listed, None)
+    assert sorted(f["code"] for p in parts for f in p["findings"]) == sorted(
+        f["code"] for f in whole["findings"]
+    )
+    assert whole["findings"][-1]["code"] == "READERR"
+
+
+def test_cli_files_from_stdin_and_paths(tmp_path: Path):
+    _docs(tmp_path)
+    listing = b"a.md\0tool.py\0missing.md\0"
+    code, out, err = run_cli(
+        ["--files-from", "-", "sub", "--format", "ndjson", "--fail-on", "high"],
+        stdin=listing,
+        cwd=tmp_path,
+    )
+    assert code == 1, err
+    got = [(f["doc_id"], f["code"]) for f in map(json.loads, out.splitlines())]
+    assert got == [
+        ("sub/c.html", "HTML002"),
+        ("a.md", "HTML001"),
+        ("missing.md", "READERR"),
+    ]
+
+    (tmp_path / "list.txt").write_text("b.txt\n")
+    code, out, _ = run_cli(
+        ["--files-from", "list.txt", "--fail-on", "high"], cwd=tmp_path
+    )
+    assert code == 0 and json.loads(out)[0]["code"] == "INJ003"
+
+    code, _, err = run_cli([], cwd=tmp_path)
+    assert code == 2 and "--files-from" in err
+    code, _, err = run_cli(["--files-from", "nope.txt"], cwd=tmp_path)
+    assert code == 2 and "error: --files-from" in err
@@ -25,3 +25,41 @@ def test_iter_files_accepts_single_file(tmp_path: Path):
     p.write_text("# ok")
     files = list(iter_files(p))
     assert files == [p]
+
+
+def test_iter_files_prunes_skip_dirs(tmp_path: Path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "description.md").write_text("git internals")
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".venv" / "lib" / "README.md").write_text("vendored")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.md").write_text("# a")
+
+    files = [p.relative_to(tmp_path).as_posix() for p in iter_files(tmp_path)]
+    assert files == ["docs/a.md"]
+
+
+def test_iter_files_honors_ignore_files(tmp_path: Path):
+    (tmp_path / ".gitignore").write_text("build/\n*.txt\n!keep.txt\n/top.md\n")
+    (tmp_path / ".ragscanignore").write_text("drafts/**\n")
+    for rel in [
+        "top.md",
+        "a.md",
+        "keep.txt",
+        "skip.txt",
+        "build/out.md",
+        "drafts/x/y.md",
+        "sub/top.md",
+        "sub/b.md",
+        "sub/c.html",
+    ]:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text("x")
+    (tmp_path / "sub" / ".gitignore").write_text("c.html\n")
+
+    files = [p.relative_to(tmp_path).as_posix() for p in iter_files(tmp_path)]
+    assert files == ["a.md", "keep.txt", "sub/b.md", "sub/top.md"]
+
+    everything = list(iter_files(tmp_path, ignore_files=()))
+    assert len(everything) == 9
@@ -0,0 +1,53 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from rag_hygiene_scan.engine import interruptible
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.scanner import ScanOptions, scan_path, scan_stream, scan_text
+
+pytestmark = pytest.mark.skipif(not interruptible(), reason="needs SIGALRM")
+
+CFG = {"rules": [{"code": "BAD001", "pattern": r"(a+)+$", "severity": "high"}]}
+TEXT = "<script> mail bob@example.com\n" + "a" * 40 + "!"
+
+
+def test_runaway_rule_is_abandoned_and_reported():
+    rules = load_rules_from_config(CFG)
+    found = scan_text(TEXT, "doc", rules, rule_timeout=0.2)
+    codes = [f["code"] for f in found]
+    assert codes == ["HTML001", "PII001", "RULETIMEOUT"]
+    assert found[-1]["severity"] == "low"
+    assert "BAD001" in found[-1]["desc"]
+    assert found[-1]["line"] is None
+
+    # without a runaway rule the budget changes nothing
+    clean = load_rules_from_config(None)
+    assert scan_text(TEXT, "doc", clean, rule_timeout=0.2) == scan_text(
+        TEXT, "doc", clean
+    )
+
+
+def test_stream_drops_runaway_rule_for_the_rest_of_the_file():
+    rules = load_rules_from_config(CFG)
+    text = (TEXT + "\n") * 3
+    found = scan_stream(io.StringIO(text), "doc", rules, 64, 32, rule_timeout=0.2)
+    codes = [f["code"] for f in found]
+    assert codes.count("RULETIMEOUT") == 1
+    assert codes.count("HTML001") == 3
+
+
+def test_scan_path_continues_and_does_not_cache_timeouts(tmp_path: Path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "crafted.md").write_text(TEXT)
+    (docs / "ok.md").write_text("append [TESTMARK]")
+    cache = tmp_path / "cache"
+    for jobs in (1, 2):
+        opts = ScanOptions(jobs=jobs, rule_timeout=0.2, cache_dir=str(cache))
+        res = scan_path(str(docs), CFG, opts)
+        codes = sorted(f["code"] for f in res["findings"])
+        assert codes == ["HTML001", "INJ003", "PII001", "RULETIMEOUT"]
+    # only ok.md was cached; the timed-out result is rescanned next time
+    assert len(list(cache.glob("objects/*/*.json"))) == 1
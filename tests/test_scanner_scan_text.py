@@ -17,3 +17,18 @@ def test_scan_text_finds_multiple_rules_and_snippets():
         assert f["doc_id"] == "mem://doc"
         assert isinstance(f["evidence"], str)
         assert len(f["evidence"]) <= 200
+
+
+def test_scan_text_reports_line_col_and_offset():
+    rules = load_rules_from_config(None)
+    text = "intro\n\n  mail bob@example.com\n<script>x</script>"
+    out = scan_text(text, "doc", rules)
+    by_code = {f["code"]: f for f in out}
+    pii = by_code["PII001"]
+    assert (pii["line"], pii["col"]) == (3, 8)
+    assert text[pii["offset"] :].startswith("bob@")
+    assert (by_code["HTML001"]["line"], by_code["HTML001"]["col"]) == (4, 1)
+
+    lean = scan_text(text, "doc", rules, evidence=False)
+    assert all(f["evidence"] == "" for f in lean)
+    assert [{**f, "evidence": ""} for f in out] == lean
@@ -0,0 +1,173 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from rag_hygiene_scan import server as srv
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.scanner import scan_path, scan_text
+
+TEXT = "mail bob@example.com\n<script>x</script> override policy"
+
+
+@pytest.fixture
+def running(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(srv, "RELOAD_CHECK", 0.0)
+    cfg = tmp_path / "rules.yaml"
+    cfg.write_text("disable: [PII002]\n")
+    started = []
+
+    def start(jobs=1, socket_path=None):
+        service = srv.ScanService(str(cfg), jobs=jobs, root=str(tmp_path))
+        server = srv.make_server(service, port=0, socket_path=socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((server, service))
+        return server, cfg
+
+    yield start
+    for server, service in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _call(server, path, body=None):
+    host, port = server.server_address
+    req = urllib.request.Request(
+        f"http://{host}:{port}{path}",
+        data=None if body is None else json.dumps(body).encode(),
+    )
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_serve_scans_documents_and_paths(running, tmp_path: Path, jobs):
+    server, cfg = running(jobs)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.md").write_text(TEXT)
+    docs = [{"doc_id": f"d{i}", "text": TEXT} for i in range(5)]
+    res = _call(
+        server,
+        "/scan",
+        {"documents": docs, "paths": [str(tmp_path / "docs")], "fail_on": "high"},
+    )
+    rules = load_rules_from_config({"disable": ["PII002"]})
+    expected = [f for i in range(5) for f in scan_text(TEXT, f"d{i}", rules)]
+    on_disk = scan_path(str(tmp_path / "docs"), {"disable": ["PII002"]})
+    assert res["findings"] == expected + on_disk["findings"]
+    assert res["files_scanned"] == 6 and res["exit_code"] == 1
+    assert res["counts"]["high"] == 6
+
+    stats = _call(server, "/stats")
+    assert stats["requests"] == 1 and stats["documents"] == 6
+    assert stats["latency_ms"]["p50"] > 0
+
+
+def test_serve_reloads_rules_on_config_change(running):
+    server, cfg = running()
+    before = _call(server, "/healthz")
+    cfg.write_text("disable: [PII002, PII001]\n")
+    os.utime(cfg, (time.time() + 5, time.time() + 5))
+    res = _call(server, "/scan", {"documents": [{"doc_id": "d", "text": TEXT}]})
+    assert "PII001" not in {f["code"] for f in res["findings"]}
+    after = _call(server, "/healthz")
+    assert after["rules"] == before["rules"] - 1
+    assert _call(server, "/stats")["reloads"] == 1
+
+    # a broken config keeps the previous rules
+    cfg.write_text("rules: [{code: X, pattern: '('}]\n")
+    os.utime(cfg, (time.time() + 10, time.time() + 10))
+    _call(server, "/scan", {"documents": []})
+    assert _call(server, "/healthz")["fingerprint"] == after["fingerprint"]
+    assert _call(server, "/stats")["reload_errors"] == 1
+
+
+def test_serve_rejects_bad_requests(running):
+    server, _ = running()
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _call(server, "/scan", {"documents": [{"doc_id": "x"}]})
+    assert e.value.code == 400
+
+    # a negative length is refused instead of reading until EOF
+    host, port = server.server_address
+    with socket.create_connection((host, port), timeout=10) as s:
+        s.sendall(b"POST /scan HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n")
+        assert s.recv(65536).startswith(b"HTTP/1.1 400")
+
+
+def test_serve_only_scans_paths_under_root(running, tmp_path: Path):
+    server, _ = running()
+    outside = tmp_path.parent / f"{tmp_path.name}-outside"
+    outside.mkdir()
+    (outside / "secret.md").write_text(TEXT)
+    for p in (str(outside), f"{tmp_path}/../{outside.name}", "/etc"):
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _call(server, "/scan", {"paths": [p]})
+        assert e.value.code == 400
+        assert "outside the served root" in json.loads(e.value.read())["error"]
+
+    # relative paths are taken from the root; symlinks out of it are skipped
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.md").write_text(TEXT)
+    (tmp_path / "docs" / "link.md").symlink_to(outside / "secret.md")
+    res = _call(server, "/scan", {"paths": ["docs"]})
+    assert res["files_scanned"] == 1
+    assert {Path(f["doc_id"]).name for f in res["findings"]} == {"a.md"}
+    with pytest.raises(urllib.error.HTTPError):
+        _call(server, "/scan", {"paths": ["docs/link.md"]})
+
+
+def test_serve_on_unix_socket(running, tmp_path: Path):
+    sock_path = str(tmp_path / "s.sock")
+    running(socket_path=sock_path)
+    body = json.dumps({"documents": [{"doc_id": "d", "text": TEXT}]}).encode()
+    with socket.socket(socket.AF_UNIX) as s:
+        s.connect(sock_path)
+        s.sendall(
+            b"POST /scan HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        raw = b""
+        while chunk := s.recv(65536):
+            raw += chunk
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200")
+    rules = load_rules_from_config({"disable": ["PII002"]})
+    assert json.loads(payload)["findings"] == scan_text(TEXT, "d", rules)
+
+
+def test_serve_never_removes_a_non_socket(running, tmp_path: Path):
+    keep = tmp_path / "notasock"
+    keep.write_text("precious\n")
+    service = srv.ScanService(None)
+    try:
+        with pytest.raises(FileExistsError, match="not a socket"):
+            srv.make_server(service, socket_path=str(keep))
+    finally:
+        service.close()
+    assert keep.read_text() == "precious\n"
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "rag_hygiene_scan.cli", "serve", "--socket", str(keep)],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert proc.returncode == 2 and "error: --socket" in proc.stderr
+    assert keep.read_text() == "precious\n"
+
+    # a socket left behind by a previous run is replaced
+    sock_path = tmp_path / "s.sock"
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(str(sock_path))
+    server, _ = running(socket_path=str(sock_path))
+    assert server.server_address == str(sock_path)
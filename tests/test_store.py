@@ -0,0 +1,104 @@
+import io
+import sys
+from pathlib import Path
+
+import rag_hygiene_scan.scanner as scanner
+from rag_hygiene_scan.patterns import load_rules_from_config
+from rag_hygiene_scan.scanner import load_config, scan_path, scan_stream, scan_text
+from rag_hygiene_scan.store import FindingStore, aggregate_findings, cap_findings
+
+
+def _corpus(root: Path) -> None:
+    for i in range(6):
+        body = "".join(f"line {n}: u{n}@example.com\n" for n in range(10 * i + 1))
+        (root / f"f{i}.md").write_text(body + "<script>x</script>\n")
+
+
+def test_store_reads_back_the_same_findings(tmp_path: Path):
+    _corpus(tmp_path)
+    plain = scan_path(str(tmp_path), load_config(None))["findings"]
+    res = scan_path(str(tmp_path), load_config(None), compact=True)
+    store = res["findings"]
+    assert isinstance(store, FindingStore)
+    assert len(store) == len(plain)
+    assert list(store) == plain
+    assert store[-1] == plain[-1] and store[2:5] == plain[2:5]
+
+    # strings are held once: the store is far smaller than the dicts
+    dicts = sum(sys.getsizeof(f) for f in plain)
+    assert sys.getsizeof(store._doc) * 5 < dicts
+
+    readerr = {**plain[0], "code": "READERR", "line": None, "offset": None}
+    store.append(readerr)
+    assert store[-1] == readerr
+
+
+def test_aggregate_and_cap(tmp_path: Path):
+    _corpus(tmp_path)
+    plain = scan_path(str(tmp_path), load_config(None))["findings"]
+    for jobs in (1, 2):
+        groups = scan_path(
+            str(tmp_path), load_config(None), aggregate=True, samples=2, jobs=jobs
+        )["findings"]
+        assert groups == aggregate_findings(plain, samples=2)
+    last = [g for g in groups if g["doc_id"].endswith("f5.md")]
+    pii = next(g for g in last if g["code"] == "PII001")
+    assert pii["count"] == 51 and len(pii["samples"]) == 2
+    assert pii["offset"] < pii["last_offset"]
+    assert (pii["line"], pii["col"]) == (1, 9)
+
+    capped = scan_path(str(tmp_path), load_config(None), max_per_rule=3)["findings"]
+    by_doc = {}
+    for f in plain:
+        by_doc.setdefault(f["doc_id"], []).append(f)
+    assert capped == [f for fs in by_doc.values() for f in cap_findings(fs, 3)]
+    per_doc = [f for f in capped if f["doc_id"].endswith("f5.md")]
+    assert [f["code"] for f in per_doc] == ["HTML001"] + ["PII001"] * 3
+
+
+def test_snippets_only_for_what_is_kept(tmp_path: Path, monkeypatch):
+    _corpus(tmp_path)
+    plain = scan_path(str(tmp_path), load_config(None))["findings"]
+    made = []
+    real = scanner._make_snippet
+    monkeypatch.setattr(
+        scanner, "_make_snippet", lambda *a, **k: made.append(1) or real(*a, **k)
+    )
+    # chunk_size=64 sends the larger files through the mmap and stream paths
+    for extra in ({}, {"chunk_size": 64}):
+        made.clear()
+        groups = scan_path(
+            str(tmp_path), None, aggregate=True, samples=2, dedup=False, **extra
+        )["findings"]
+        assert groups == aggregate_findings(plain, samples=2), extra
+        assert len(made) == sum(len(g["samples"]) for g in groups)
+
+        made.clear()
+        capped = scan_path(str(tmp_path), None, max_per_rule=3, dedup=False, **extra)
+        assert len(made) == len(capped["findings"]), extra
+
+
+def test_cap_and_fold_while_matching():
+    text = "".join(f"u{n}@example.com <script>{n}</script>\n" for n in range(40))
+    # USR001 has no bytes equivalent: large plain buffers stream it
+    cfg = {"rules": [{"code": "USR001", "pattern": r"[\u200b-\u200f]|/script"}]}
+    rules = load_rules_from_config(cfg)
+    full = scan_text(text, "d", rules)
+    plain = text.encode()
+    scans = {
+        "text": lambda **kw: scan_text(text, "d", rules, **kw),
+        "plain": lambda **kw: scanner._scan_plain(plain, "d", rules, **kw),
+        "mixed": lambda **kw: scanner._scan_plain(
+            plain, "d", rules, chunk_size=64, **kw
+        ),
+        "stream": lambda **kw: scan_stream(io.StringIO(text), "d", rules, 64, **kw),
+    }
+    for name, scan in scans.items():
+        assert scan(max_per_rule=2) == cap_findings(full, 2), name
+        assert scan(aggregate=True, samples=2) == aggregate_findings(full, 2), name
+        groups = scan(aggregate=True, samples=0, evidence=False)
+        assert [(g["code"], g["count"], g["samples"]) for g in groups] == [
+            ("HTML001", 40, []),
+            ("PII001", 40, []),
+            ("USR001", 40, []),
+        ], name
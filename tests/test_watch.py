@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from rag_hygiene_scan.watch import InotifySource, PollSource, Watcher, run
+
+
+def _tree(root: Path) -> None:
+    (root / "sub").mkdir()
+    (root / "a.md").write_text("<script>x</script>\n")
+    (root / "sub" / "b.md").write_text("fine\n")
+    (root / "notes.py").write_text("<script>\n")  # not scanned
+
+
+def _codes(update):
+    return {
+        Path(p).name: None if f is None else [x["code"] for x in f]
+        for p, f in update.items()
+    }
+
+
+def test_watcher_rescans_only_what_changed(tmp_path: Path):
+    _tree(tmp_path)
+    cfg = tmp_path / "rules.yaml"
+    cfg.write_text("disable: []\n")
+    watcher = Watcher(str(tmp_path), str(cfg))
+    assert _codes(watcher.scan_all()) == {"a.md": ["HTML001"]}
+    assert set(watcher.findings) == {
+        (tmp_path / "a.md").as_posix(),
+        (tmp_path / "sub" / "b.md").as_posix(),
+    }
+
+    root = tmp_path.as_posix()
+    (tmp_path / "sub" / "b.md").write_text("<iframe>\n")
+    (tmp_path / "a.md").write_text("clean now\n")
+    (tmp_path / "notes.py").write_text("<iframe>\n")
+    changed = [f"{root}/sub/b.md", f"{root}/a.md", f"{root}/notes.py"]
+    assert _codes(watcher.update(changed)) == {"b.md": ["HTML002"], "a.md": []}
+
+    (tmp_path / ".ragscanignore").write_text("sub/\n")  # now ignored: dropped
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "c.md").write_text("javascript:alert(1)\n")
+    update = watcher.update([f"{root}/sub/b.md", f"{root}/new"])
+    assert _codes(update) == {"b.md": None, "c.md": ["HTML003"]}
+
+    cfg.write_text("disable: [HTML003]\n")
+    os.utime(cfg, ns=(1, 1))  # a different mtime, however coarse the clock
+    assert watcher.maybe_reload() and not watcher.maybe_reload()
+    assert _codes(watcher.scan_all()) == {"c.md": []}
+    assert watcher.tally().total == 0
+
+
+def _sources():
+    yield "poll"
+    if sys.platform.startswith("linux"):
+        yield "inotify"
+
+
+@pytest.mark.parametrize("kind", list(_sources()))
+def test_run_emits_debounced_updates(tmp_path: Path, kind: str):
+    _tree(tmp_path)
+    cfg = tmp_path / "rules.yaml"
+    cfg.write_text("disable: []\n")
+    watcher = Watcher(str(tmp_path), str(cfg))
+    if kind == "poll":
+        source = PollSource(watcher, interval=0.05)
+    else:
+        try:
+            source = InotifySource(watcher)
+        except OSError as e:
+            pytest.skip(f"inotify unavailable: {e}")
+    updates: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    loop = threading.Thread(
+        target=run,
+        args=(watcher, source, lambda u, s: updates.put(_codes(u))),
+        kwargs={"debounce": 0.3, "stop": stop},
+    )
+    loop.start()
+    try:
+        assert updates.get(timeout=5) == {"a.md": ["HTML001"]}
+        doc = tmp_path / "sub" / "b.md"
+        for i in range(5):  # one burst of saves: one rescan
+            doc.write_text(f"draft {i}\n<iframe>\n")
+            time.sleep(0.02)
+        assert updates.get(timeout=5) == {"b.md": ["HTML002"]}
+        (tmp_path / "a.md").unlink()
+        assert updates.get(timeout=5) == {"a.md": None}
+        cfg.write_text("disable: [HTML002]\n")
+        os.utime(cfg, ns=(1, 1))
+        assert updates.get(timeout=5) == {"b.md": []}
+        assert updates.empty()
+    finally:
+        stop.set()
+        loop.join()
+        source.close()
+
+
+def test_cli_watch_prints_changes(tmp_path: Path):
+    _tree(tmp_path)
+    log = tmp_path / "stderr.log"
+    with open(log, "w") as err:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "rag_hygiene_scan.cli", "watch", str(tmp_path)]
+            + ["--poll", "--interval", "0.05", "--debounce", "0", "--format", "ndjson"],
+            stdout=subprocess.PIPE,
+            stderr=err,
+            text=True,
+        )
+    lines: queue.Queue = queue.Queue()
+    threading.Thread(
+        target=lambda: [lines.put(line) for line in proc.stdout], daemon=True
+    ).start()
+    try:
+        first = json.loads(lines.get(timeout=10))
+        assert first["path"].endswith("a.md") and not first["removed"]
+        (tmp_path / "a.md").unlink()
+        gone = json.loads(lines.get(timeout=10))
+        assert gone == {"path": first["path"], "removed": True, "findings": []}
+        for _ in range(100):  # the summary follows on stderr
+            summaries = [s for s in log.read_text().splitlines() if "summary" in s]
+            if len(summaries) == 2:
+                break
+            time.sleep(0.05)
+        assert "high=1" in summaries[0] and "high=0" in summaries[1]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)